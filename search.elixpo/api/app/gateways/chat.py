@@ -5,6 +5,7 @@ from quart import request, jsonify, Response
 from sessions.main import get_session_manager
 from chatEngine.main import get_chat_engine
 from pipeline.config import X_REQ_ID_SLICE_SIZE, LOG_MESSAGE_QUERY_TRUNCATE
+from pipeline.utils import parse_sse
 
 logger = logging.getLogger("lixsearch-api")
 
@@ -34,10 +35,10 @@ async def chat(pipeline_initialized: bool):
 
         async def event_generator():
             if use_search:
-                async for chunk in chat_engine.chat_with_search(session_id, user_message):
+                async for chunk in chat_engine.chat_with_search(session_id, user_message, stream=True):
                     yield chunk.encode('utf-8')
             else:
-                async for chunk in chat_engine.generate_contextual_response(session_id, user_message):
+                async for chunk in chat_engine.generate_contextual_response(session_id, user_message, stream=True):
                     yield chunk.encode('utf-8')
 
         return Response(
@@ -82,10 +83,10 @@ async def session_chat(session_id: str, pipeline_initialized: bool):
 
         async def event_generator():
             if use_search:
-                async for chunk in chat_engine.chat_with_search(session_id, user_message):
+                async for chunk in chat_engine.chat_with_search(session_id, user_message, stream=True):
                     yield chunk.encode('utf-8')
             else:
-                async for chunk in chat_engine.generate_contextual_response(session_id, user_message):
+                async for chunk in chat_engine.generate_contextual_response(session_id, user_message, stream=True):
                     yield chunk.encode('utf-8')
 
         return Response(
@@ -139,7 +140,7 @@ async def chat_completions(session_id: str, pipeline_initialized: bool):
 
         if stream:
             async def event_generator():
-                async for chunk in chat_engine.generate_contextual_response(session_id, user_message):
+                async for chunk in chat_engine.generate_contextual_response(session_id, user_message, stream=True):
                     yield chunk.encode('utf-8')
 
             return Response(
@@ -156,11 +157,9 @@ async def chat_completions(session_id: str, pipeline_initialized: bool):
         else:
             response_content = ""
             async for chunk in chat_engine.generate_contextual_response(session_id, user_message):
-                if chunk.startswith("event: final"):
-                    lines = chunk.split('\n')
-                    for line in lines:
-                        if line.startswith("data:"):
-                            response_content = line.replace("data:", "").strip()
+                event_type, event_data = parse_sse(chunk)
+                if event_type == "final":
+                    response_content = (event_data or "").strip()
 
             return jsonify({
                 "id": f"chatcmpl-{str(uuid.uuid4())[:X_REQ_ID_SLICE_SIZE]}",
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from quart import request, jsonify, Response
 from pipeline.searchPipeline import run_elixposearch_pipeline
 from app.utils import validate_query, validate_url, format_openai_response
+from pipeline.utils import parse_sse
 from pipeline.config import X_REQ_ID_SLICE_SIZE, REQUEST_ID_HEX_SLICE_SIZE, LOG_MESSAGE_QUERY_TRUNCATE
 import os
 
@@ -76,18 +77,8 @@ async def search(pipeline_initialized: bool):
                     chunk_str = chunk if isinstance(chunk, str) else chunk.decode('utf-8')
                     
                     try:
-                        lines = chunk_str.strip().split('\n')
-                        event_type = None
-                        event_data_lines = []
-                        
-                        for line in lines:
-                            if line.startswith('event:'):
-                                event_type = line.replace('event:', '').strip()
-                            elif line.startswith('data:'):
-                                event_data_lines.append(line.replace('data:', '', 1).lstrip())
-                        
-                        event_data = "\n".join(event_data_lines) if event_data_lines else None
-                        if event_type and event_data:
+                        event_type, event_data = parse_sse(chunk_str)
+                        if event_type and event_data is not None:
                             # Reformat as OpenAI-compatible SSE JSON
                             openai_sse = format_sse_event_openai(event_type, event_data, request_id)
                             yield openai_sse.encode('utf-8')
@@ -1,14 +1,43 @@
 """Stats gateway."""
+import asyncio
 import logging
 import uuid
 from datetime import datetime
 from quart import request, jsonify
 from sessions.main import get_session_manager
 from pipeline.config import X_REQ_ID_SLICE_SIZE
+from pipeline.utils import get_ipc_client
+from pipeline.llm_client import get_llm_client
+from functionCalls.transcriptStore import get_transcript_store
+from ragService.embeddingMemo import get_embedding_memo
 
 logger = logging.getLogger("lixsearch-api")
 
 
+async def _get_search_cache_stats():
+    try:
+        return await get_ipc_client().service("accessSearchAgents").get_search_cache_stats(timeout=2.0)
+    except Exception as e:
+        logger.warning(f"Search cache stats unavailable: {e}")
+        return None
+
+
+async def _get_vector_store_stats():
+    try:
+        return await get_ipc_client().service("CoreEmbeddingService").get_vector_store_stats(timeout=2.0)
+    except Exception as e:
+        logger.warning(f"Vector store stats unavailable: {e}")
+        return None
+
+
+async def _get_embedding_batcher_stats():
+    try:
+        return await get_ipc_client().service("CoreEmbeddingService").get_embedding_batcher_stats(timeout=2.0)
+    except Exception as e:
+        logger.warning(f"Embedding batcher stats unavailable: {e}")
+        return None
+
+
 async def get_stats():
     """Get application statistics."""
     request_id = request.headers.get("X-Request-ID", str(uuid.uuid4())[:X_REQ_ID_SLICE_SIZE])
@@ -17,10 +46,19 @@ async def get_stats():
         logger.info(f"[{request_id}] Getting stats")
         session_manager = get_session_manager()
         stats = session_manager.get_stats()
+        search_cache_stats, vector_store_stats, embedding_batcher_stats = await asyncio.gather(
+            _get_search_cache_stats(), _get_vector_store_stats(), _get_embedding_batcher_stats()
+        )
 
         return jsonify({
             "timestamp": datetime.utcnow().isoformat(),
             "sessions": stats,
+            "search_cache": search_cache_stats,
+            "vector_store": vector_store_stats,
+            "embedding_batcher": embedding_batcher_stats,
+            "llm": get_llm_client().get_stats(),
+            "transcripts": get_transcript_store().get_stats(),
+            "embedding_memo": get_embedding_memo().get_stats(),
             "request_id": request_id
         })
 
@@ -4,6 +4,7 @@ import uuid
 from quart import websocket
 from pipeline.searchPipeline import run_elixposearch_pipeline
 from pipeline.config import X_REQ_ID_SLICE_SIZE, LOG_MESSAGE_QUERY_TRUNCATE
+from pipeline.utils import parse_sse
 
 logger = logging.getLogger("lixsearch-api")
 
@@ -32,19 +33,13 @@ async def websocket_search():
                 user_image=data.get("image_url"),
                 event_id=request_id
             ):
-                lines = chunk.split('\n')
-                event_type = None
-                for line in lines:
-                    if line.startswith('event:'):
-                        event_type = line.replace('event:', '').strip()
-                    elif line.startswith('data:'):
-                        data_content = line.replace('data:', '').strip()
-                        if event_type:
-                            await websocket.send_json({
-                                "event": event_type,
-                                "data": data_content,
-                                "request_id": request_id
-                            })
+                event_type, data_content = parse_sse(chunk)
+                if event_type and data_content is not None:
+                    await websocket.send_json({
+                        "event": event_type,
+                        "data": data_content,
+                        "request_id": request_id
+                    })
 
     except Exception as e:
         logger.error(f"[{request_id}] WS error: {e}", exc_info=True)
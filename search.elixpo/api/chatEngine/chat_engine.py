@@ -1,14 +1,14 @@
 from loguru import logger
 from typing import List, Dict, Optional, AsyncGenerator
 import asyncio
-import requests
 import random
-from pipeline.config import POLLINATIONS_ENDPOINT, LOG_MESSAGE_PREVIEW_TRUNCATE
+from pipeline.config import LOG_MESSAGE_PREVIEW_TRUNCATE
+from pipeline.llm_client import get_llm_client
+from pipeline.utils import format_sse
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-POLLINATIONS_TOKEN = os.getenv("TOKEN")
 MODEL = os.getenv("MODEL")
 class ChatEngine:
     
@@ -49,23 +49,13 @@ class ChatEngine:
                 "top_p": 1,
                 "max_tokens": 2000,
                 "seed": random.randint(1000, 9999),
-                "stream": False,
             }
-            
-            response = await asyncio.to_thread(
-                requests.post,
-                POLLINATIONS_ENDPOINT,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {POLLINATIONS_TOKEN}"
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            assistant_response = data["choices"][0]["message"]["content"]
+            completion = get_llm_client().stream(payload, deadline=60.0)
+            async for delta in completion:
+                if stream:
+                    yield self._format_sse("final-part", delta)
+            assistant_response = completion.message["content"]
+            logger.info(f"[Chat {session_id}] LLM ttft={completion.ttft or 0:.2f}s total={completion.elapsed or 0:.2f}s")
             
             rag_engine = self.retrieval_system.get_rag_engine(session_id)
             self.session_manager.add_message_to_history(
@@ -76,7 +66,8 @@ class ChatEngine:
             )
             
             yield self._format_sse("info", "<TASK>SUCCESS</TASK>")
-            yield self._format_sse("final", assistant_response)
+            # When streaming, the text already went out as final-part events
+            yield self._format_sse("final", "" if stream else assistant_response)
             
             logger.info(f"[Chat {session_id}] Response generated")
         
@@ -88,7 +79,8 @@ class ChatEngine:
         self,
         session_id: str,
         user_message: str,
-        search_query: Optional[str] = None
+        search_query: Optional[str] = None,
+        stream: bool = False
     ) -> AsyncGenerator[str, None]:
         
         session = self.session_manager.get_session(session_id)
@@ -106,7 +98,7 @@ class ChatEngine:
             from commons.searching_based import webSearch
             from searching.fetch_full_text import fetch_full_text
             
-            search_results = webSearch(final_search_query)
+            search_results = await webSearch(final_search_query)
             if isinstance(search_results, list):
                 fetch_urls = search_results[:5]
             else:
@@ -133,7 +125,7 @@ class ChatEngine:
         except Exception as e:
             logger.warning(f"[Chat {session_id}] Search phase error: {e}")
         
-        async for chunk in self.generate_contextual_response(session_id, user_message, use_rag=True):
+        async for chunk in self.generate_contextual_response(session_id, user_message, use_rag=True, stream=stream):
             yield chunk
     
     def _build_messages(self, conversation_history: List[Dict], session_id: Optional[str] = None) -> List[Dict]:
@@ -161,7 +153,5 @@ class ChatEngine:
     
     @staticmethod
     def _format_sse(event: str, data: str) -> str:
-        lines = data.splitlines()
-        data_str = ''.join(f"data: {line}\n" for line in lines)
-        return f"event: {event}\n{data_str}\n\n"
+        return format_sse(event, data)
 
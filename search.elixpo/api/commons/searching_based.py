@@ -1,32 +1,20 @@
 import re
 from loguru import logger
-from .main import _init_ipc_manager, search_service as get_search_service
 import asyncio
-from searching.fetch_full_text import fetch_full_text
-from pipeline.config import LOG_MESSAGE_QUERY_TRUNCATE, ERROR_MESSAGE_TRUNCATE, ERROR_CONTEXT_TRUNCATE
+from searching.asyncFetcher import AsyncFetcher, get_async_fetcher
+from pipeline.utils import get_ipc_client
+from pipeline.config import LOG_MESSAGE_QUERY_TRUNCATE, ERROR_MESSAGE_TRUNCATE, ERROR_CONTEXT_TRUNCATE, FETCH_DEADLINE_SECONDS
 
 
-def webSearch(query: str):
-    initialized = _init_ipc_manager()
-    
-    if not initialized:
-        logger.warning("[Utility] IPC initialization failed - web search unavailable")
-        return []
-    
-    # Import here to get the updated search_service from commons.main
-    from .main import search_service
-    
-    if search_service is None:
-        logger.error("[Utility] Search service is None despite IPC init success - this indicates a registration issue")
-        return []
-    
+async def webSearch(query: str) -> list:
+    search_service = get_ipc_client().service("accessSearchAgents")
     try:
-        logger.debug(f"[Utility] Calling web_search on service {type(search_service).__name__}")
-        urls = search_service.web_search(query)
-        logger.debug(f"[Utility] Web search returned {len(urls)} results for: {query[:LOG_MESSAGE_QUERY_TRUNCATE]}")
+        logger.debug("[Utility] Calling web_search over RPC")
+        urls = await search_service.web_search(query)
+        logger.debug(f"[Utility] Web search returned {len(urls) if urls else 0} results for: {query[:LOG_MESSAGE_QUERY_TRUNCATE]}")
         return urls if urls else []
-    except AttributeError as e:
-        logger.error(f"[Utility] Search service missing web_search method: {e}")
+    except (ConnectionError, FileNotFoundError) as e:
+        logger.warning(f"[Utility] IPC unavailable - web search unavailable: {e}")
         return []
     except Exception as e:
         logger.error(f"[Utility] Web search failed: {type(e).__name__}: {str(e)[:ERROR_CONTEXT_TRUNCATE]}")
@@ -34,30 +22,14 @@ def webSearch(query: str):
 
 
 async def imageSearch(query: str, max_images: int = 10) -> list:
-    initialized = _init_ipc_manager()
-    
-    if not initialized:
-        logger.warning("[Utility] IPC initialization failed - image search unavailable")
-        return []
-    
-    # Import here to get the updated search_service from commons.main
-    from .main import search_service
-    
-    if search_service is None:
-        logger.error("[Utility] Search service is None despite IPC init success - this indicates a registration issue")
-        return []
-    
+    search_service = get_ipc_client().service("accessSearchAgents")
     try:
-        logger.debug(f"[Utility] Calling image_search on service {type(search_service).__name__}")
-        loop = asyncio.get_event_loop()
-        urls = await loop.run_in_executor(
-            None,
-            lambda: search_service.image_search(query, max_images=max_images)
-        )
+        logger.debug("[Utility] Calling image_search over RPC")
+        urls = await search_service.image_search(query, max_images=max_images)
         logger.debug(f"[Utility] Image search returned {len(urls) if urls else 0} results for: {query[:LOG_MESSAGE_QUERY_TRUNCATE]}")
         return urls if urls else []
-    except AttributeError as e:
-        logger.error(f"[Utility] Search service missing image_search method: {e}")
+    except (ConnectionError, FileNotFoundError) as e:
+        logger.warning(f"[Utility] IPC unavailable - image search unavailable: {e}")
         return []
     except Exception as e:
         logger.error(f"[Utility] Image search failed: {type(e).__name__}: {str(e)[:ERROR_CONTEXT_TRUNCATE]}")
@@ -78,21 +50,38 @@ def preprocess_text(text):
     return meaningful_sentences
 
 
-def fetch_url_content_parallel(queries, urls, max_workers=10, request_id: str = None) -> str:
+def _format_fetched_content(url: str, text_content: str) -> str:
+    clean_text = str(text_content).encode('unicode_escape').decode('utf-8')
+    clean_text = clean_text.replace('\\n', ' ').replace('\\r', ' ').replace('\\t', ' ')
+    clean_text = ''.join(c for c in clean_text if c.isprintable())
+    logger.debug(f"[Utility] Fetched {len(clean_text)} chars from {url}")
+    return f"URL: {url}\n{clean_text.strip()}"
+
+
+async def fetch_url_content_parallel_async(queries, urls, request_id: str = None, deadline: float = FETCH_DEADLINE_SECONDS) -> str:
+    fetcher = get_async_fetcher()
     results = []
-    for url in urls:
-        try:
-            text_content = fetch_full_text(url, request_id=request_id)
-            
-            clean_text = str(text_content).encode('unicode_escape').decode('utf-8')
-            clean_text = clean_text.replace('\\n', ' ').replace('\\r', ' ').replace('\\t', ' ')
-            clean_text = ''.join(c for c in clean_text if c.isprintable())
-            results.append(f"URL: {url}\n{clean_text.strip()}")
-            logger.debug(f"[Utility] Fetched {len(clean_text)} chars from {url}")
-        except Exception as e:
-            logger.error(f"[Utility] Failed fetching {url}: {e}")
+    async for url, text_content in fetcher.fetch_as_completed(urls, deadline=deadline):
+        results.append(_format_fetched_content(url, text_content))
 
     combined_text = "\n".join(results)
+    logger.info(f"[Utility] Fetched {len(results)}/{len(urls)} URLs in parallel, total: {len(combined_text)} chars")
+    
+    return combined_text
+
+
+def fetch_url_content_parallel(queries, urls, max_workers=10, request_id: str = None) -> str:
+    async def _run():
+        fetcher = AsyncFetcher(max_concurrency=max_workers)
+        try:
+            results = []
+            async for url, text_content in fetcher.fetch_as_completed(urls, deadline=FETCH_DEADLINE_SECONDS):
+                results.append(_format_fetched_content(url, text_content))
+            return "\n".join(results)
+        finally:
+            await fetcher.aclose()
+
+    combined_text = asyncio.run(_run())
     logger.info(f"[Utility] Fetched all URLs in parallel, total: {len(combined_text)} chars")
     
     return combined_text
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+from commons.minimal import normalize_url
+from pipeline.config import URL_CONTENT_CACHE_TTL_SECONDS, URL_CONTENT_CACHE_MAX_ENTRIES
+
+
+class UrlContentCache:
+    """Short-lived LRU of extracted page text, keyed by normalized URL.
+
+    Shared by the fetcher and the ingester in a process so a page is
+    downloaded and parsed once per TTL window.
+    """
+
+    def __init__(self, ttl_seconds: int = URL_CONTENT_CACHE_TTL_SECONDS, max_entries: int = URL_CONTENT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, word_limit: Optional[int] = None) -> Optional[str]:
+        key = normalize_url(url)
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            text, cached_limit, expires_at = entry
+            if expires_at <= time.time() or (word_limit is not None and cached_limit < word_limit and text.endswith("...")):
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        if word_limit is not None and cached_limit > word_limit:
+            words = text.split()
+            if len(words) > word_limit:
+                text = " ".join(words[:word_limit]) + "..."
+        logger.debug(f"[UrlContentCache] HIT for {key}")
+        return text
+
+    def set(self, url: str, text: str, word_limit: int) -> None:
+        if not text:
+            return
+        key = normalize_url(url)
+        with self.lock:
+            self._entries[key] = (text, word_limit, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+url_content_cache = UrlContentCache()
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from loguru import logger
+import numpy as np
+from pipeline.config import BASE_CACHE_DIR, AUDIO_CACHE_FORMAT, AUDIO_CACHE_BITRATE, AUDIO_CACHE_MAX_BYTES
+
+SAMPLE_RATE = 16000
+READ_CHUNK_BYTES = 1 << 16
+
+_CODECS = {
+    "opus": ["-c:a", "libopus", "-application", "voip", "-b:a", AUDIO_CACHE_BITRATE],
+    "flac": ["-c:a", "flac", "-compression_level", "8"],
+}
+
+
+def _ffmpeg_args(src: str, encode_to: Optional[str], fmt: str) -> List[str]:
+    args = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-i", src,
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"]
+    if encode_to:
+        args += ["-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), *_CODECS[fmt], "-f", fmt, "-y", encode_to]
+    return args
+
+
+async def decode_to_pcm(src: str, encode_to: Optional[str] = None, fmt: str = AUDIO_CACHE_FORMAT) -> np.ndarray:
+    """Stream ``src`` through ffmpeg into 16 kHz mono float32, optionally writing a compact copy in the same pass."""
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_args(src, encode_to, fmt),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stderr = asyncio.ensure_future(proc.stderr.read())
+    pcm = bytearray()
+    try:
+        while True:
+            chunk = await proc.stdout.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            pcm += chunk
+        returncode = await proc.wait()
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    error = (await stderr).decode(errors="replace").strip()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {returncode}: {error[-300:]}")
+    usable = len(pcm) - len(pcm) % 2
+    return np.frombuffer(memoryview(pcm)[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class AudioCache:
+    """Size-bounded LRU of per-video audio kept as 16 kHz mono Opus/FLAC under ``BASE_CACHE_DIR``."""
+
+    def __init__(self, cache_dir: str = BASE_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES, fmt: str = AUDIO_CACHE_FORMAT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        found = []
+        for name in os.listdir(cache_dir):
+            video_id, ext = os.path.splitext(name)
+            path = os.path.join(cache_dir, name)
+            if ext == f".{fmt}" and os.path.isfile(path):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, video_id, stat.st_size))
+        for _, video_id, size in sorted(found):
+            self._entries[video_id] = size
+        self._evict()
+
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.{self.fmt}")
+
+    def __contains__(self, video_id: str) -> bool:
+        with self.lock:
+            return video_id in self._entries
+
+    def get(self, video_id: str) -> Optional[str]:
+        path = self.path_for(video_id)
+        with self.lock:
+            if video_id not in self._entries or not os.path.exists(path):
+                self._entries.pop(video_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(video_id)
+            self.hits += 1
+        os.utime(path)
+        return path
+
+    def put(self, video_id: str, path: str) -> str:
+        """Move a finished encode into the cache and evict least recently used entries over budget."""
+        final_path = self.path_for(video_id)
+        os.replace(path, final_path)
+        with self.lock:
+            self._entries[video_id] = os.path.getsize(final_path)
+            self._entries.move_to_end(video_id)
+            self._evict()
+        return final_path
+
+    def _evict(self) -> None:
+        total = sum(self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            video_id, size = self._entries.popitem(last=False)
+            total -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(video_id))
+            except FileNotFoundError:
+                pass
+            logger.info(f"[AudioCache] Evicted {video_id} ({size / 1e6:.1f} MB)")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "format": self.fmt,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AudioCache()
+    return _cache
@@ -1,22 +1,16 @@
-import requests
 import base64
 import asyncio
 from dotenv import load_dotenv
 import os
-import requests
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pipeline.config import IMAGE_SEARCH_QUERY_WORDS_LIMIT
+from pipeline.llm_client import get_llm_client
 
 load_dotenv()
 
 async def generate_prompt_from_image(imgURL: str) -> str:
-    imageBase64 = image_url_to_base64(imgURL)   
-    api_url = "https://gen.pollinations.ai/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {os.getenv('TOKEN')}"
-        }
+    imageBase64 = await image_url_to_base64(imgURL)
 
     instruction = """TASK: Generate a single-line search query for the provided image.
 
@@ -57,9 +51,7 @@ NOW GENERATE ONLY THE SEARCH QUERY FOR THIS IMAGE - NO OTHER TEXT:"""
         "max_tokens": 300
     }
 
-    response = requests.post(api_url, headers=headers, json=data)
-    response.raise_for_status()
-    result = response.json()
+    result = await get_llm_client().complete(data, timeout=60.0)
     content = result["choices"][0]["message"]["content"].strip()
     meta_patterns = [
         r"^the user wants.*?query[:\s]+",
@@ -103,12 +95,7 @@ NOW GENERATE ONLY THE SEARCH QUERY FOR THIS IMAGE - NO OTHER TEXT:"""
 
 
 async def replyFromImage(imgURL: str, query: str) -> str:
-    imageBase64 = image_url_to_base64(imgURL)  
-    api_url = "https://gen.pollinations.ai/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {os.getenv('TOKEN')}"
-        }
+    imageBase64 = await image_url_to_base64(imgURL)
 
     instruction = """You are a jolly assistant! First, analyze the image and understand what it is conveying, while strictly following NSFW guidelines (do not describe or respond to inappropriate content). Then, read the user's query and provide a friendly, helpful answer based on the image and the query. Keep your tone light and cheerful!
 Prioritize:
@@ -143,15 +130,12 @@ Avoid vague words. Be descriptive but concise. Don't assume, only describe what'
         "max_tokens": 250
     }
 
-    response = requests.post(api_url, headers=headers, json=data)
-    response.raise_for_status()
-    result = response.json()
+    result = await get_llm_client().complete(data, timeout=60.0)
     return result["choices"][0]["message"]["content"].strip()
 
-def image_url_to_base64(image_url):
-    response = requests.get(image_url)
-    response.raise_for_status()
-    return base64.b64encode(response.content).decode('utf-8')
+async def image_url_to_base64(image_url):
+    content = await get_llm_client().fetch_bytes(image_url)
+    return base64.b64encode(content).decode('utf-8')
 
 
 
@@ -1,70 +1,31 @@
 import os
-from pipeline.config import BASE_CACHE_DIR, AUDIO_TRANSCRIBE_SIZE, ERROR_MESSAGE_TRUNCATE
+from pipeline.config import ERROR_MESSAGE_TRUNCATE, TRANSCRIPT_CAPTION_TIMEOUT_SECONDS, TRANSCRIPT_AUDIO_PREFETCH_AFTER_SECONDS
 from pytubefix import AsyncYouTube
-from pydub import AudioSegment
-from multiprocessing.managers import BaseManager
 from loguru import logger
-import torch
 import asyncio
 import re
 import time
-from urllib.parse import urlparse, parse_qs
-from typing import Optional
-from faster_whisper import WhisperModel
-
-class ModelManager(BaseManager): 
-    pass
-
-ModelManager.register("CoreEmbeddingService", callable=object)
-
-core_service = None
-_ipc_ready = False
-_ipc_initialized = False
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-logger.info(f"[YoutubeDetails] Loading faster-whisper model {AUDIO_TRANSCRIBE_SIZE} on {device}")
-whisper_model = WhisperModel(AUDIO_TRANSCRIBE_SIZE, device=device, compute_type="auto")
-
-def _init_ipc_manager(max_retries: int = 3, retry_delay: float = 1.0):
-    global core_service, _ipc_ready, _ipc_initialized
-    if _ipc_initialized:
-        return _ipc_ready
-    _ipc_initialized = True
-    for attempt in range(max_retries):
-        try:
-            manager = ModelManager(address=("localhost", 5010), authkey=b"ipcService")
-            manager.connect()
-            core_service = manager.CoreEmbeddingService()
-            _ipc_ready = True
-            logger.info("[YoutubeDetails] IPC connection established with CoreEmbeddingService")
-            return True
-        except Exception as e:
-            if attempt < max_retries - 1:
-                logger.warning(f"[YoutubeDetails] IPC connection failed (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
-            else:
-                logger.debug(f"[YoutubeDetails] IPC server not available - running in standalone mode")
-                _ipc_ready = False
-                return False
-    _ipc_ready = False
-    return False
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from pipeline.utils import get_ipc_client
+from searching.asyncFetcher import get_async_fetcher
+from functionCalls.transcriptStore import get_transcript_store, parse_caption_track
+from functionCalls.transcriptionEngine import get_transcription_engine
+from functionCalls.audioCache import get_audio_cache, decode_to_pcm, SAMPLE_RATE
+import numpy as np
+
+ProgressCallback = Callable[[int, int, List[Tuple[float, float, str]]], None]
 
 async def youtubeMetadata(url: str):
-    if not _init_ipc_manager() or core_service is None:
-        logger.warning("[YoutubeDetails] IPC service not available for YouTube metadata")
-        return None
     try:
-        metadata = await asyncio.to_thread(core_service.get_youtube_metadata, url)
-        return metadata
+        return await get_ipc_client().service("accessSearchAgents").get_youtube_metadata(url)
+    except (ConnectionError, FileNotFoundError) as e:
+        logger.warning(f"[YoutubeDetails] IPC service not available for YouTube metadata: {e}")
+        return None
     except Exception as e:
         logger.error(f"[YoutubeDetails] Error fetching YouTube metadata: {e}")
         return None
 
-def ensure_cache_dir(video_id):
-    path = os.path.join(BASE_CACHE_DIR, video_id)
-    os.makedirs(path, exist_ok=True)
-    return path
-
 def get_youtube_video_id(url):
     print("[INFO] Getting Youtube video ID")
     parsed_url = urlparse(url)
@@ -84,34 +45,157 @@ def get_youtube_video_id(url):
             return video_id
     return None
 
-async def download_audio(url):
+def _remove_quietly(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+async def download_audio(url) -> str:
+    """Download the smallest usable audio stream into the cache dir and return its path, without decoding it."""
     video_id = get_youtube_video_id(url)
-    cache_folder = ensure_cache_dir(video_id)
-    wav_path = os.path.join(cache_folder, f"{video_id}.wav")
-    if os.path.exists(wav_path):
-        logger.info(f"[Download] Using cached audio: {wav_path}")
-        return wav_path
-    
+    cache = get_audio_cache()
     yt = AsyncYouTube(url, use_oauth=True, allow_oauth_cache=True)
     streams = await yt.streams()
     audio_streams = streams.filter(only_audio=True)
     preferred_codecs = ["opus", "aac", "mp4a.40.2", "vorbis"]
     audio_streams = [s for s in audio_streams if s.audio_codec in preferred_codecs]
-    audio_stream = max(audio_streams, key=lambda s: int(s.abr.replace("kbps", "")))
+    audio_stream = min(audio_streams, key=lambda s: int(s.abr.replace("kbps", "")))
     extension = audio_stream.mime_type.split("/")[1]
-    tmp_path = os.path.join(cache_folder, f"{video_id}.{extension}")
-    audio_stream.download(output_path=os.path.dirname(tmp_path), filename=os.path.basename(tmp_path))
-    audio = AudioSegment.from_file(tmp_path, format=extension)
-    audio.export(wav_path, format="wav")
-    os.remove(tmp_path)
-    logger.info(f"[Download] Audio saved to {wav_path}")
-    return wav_path
+    download_path = os.path.join(cache.cache_dir, f"{video_id}.download.{extension}")
+    download = asyncio.ensure_future(asyncio.to_thread(
+        audio_stream.download, output_path=cache.cache_dir, filename=os.path.basename(download_path)
+    ))
+    try:
+        await asyncio.shield(download)
+    except asyncio.CancelledError:
+        # The download thread keeps writing after a cancel; clean up once it stops
+        download.add_done_callback(lambda _: _remove_quietly(download_path))
+        raise
+    except Exception:
+        _remove_quietly(download_path)
+        raise
+    return download_path
+
+def discard_download(download: "asyncio.Future[str]") -> None:
+    """Drop a prefetched download that turned out not to be needed."""
+    if not download.done():
+        download.cancel()
+    elif not download.cancelled() and download.exception() is None:
+        _remove_quietly(download.result())
+
+async def load_audio(url, download: Optional[Awaitable[str]] = None) -> np.ndarray:
+    """Return the video's audio as 16 kHz mono float32, decoding the compact cache copy when present.
+
+    ``download`` is an already started ``download_audio`` to use instead of
+    starting a new one.
+    """
+    video_id = get_youtube_video_id(url)
+    cache = get_audio_cache()
+    cached_path = cache.get(video_id)
+    if cached_path:
+        if download is not None:
+            discard_download(asyncio.ensure_future(download))
+        logger.info(f"[Download] Using cached audio: {cached_path}")
+        return await decode_to_pcm(cached_path)
+    
+    download_path = await (download if download is not None else download_audio(url))
+    encoded_path = f"{cache.path_for(video_id)}.part"
+    try:
+        audio = await decode_to_pcm(download_path, encode_to=encoded_path, fmt=cache.fmt)
+        cached_path = cache.put(video_id, encoded_path)
+    finally:
+        _remove_quietly(download_path, encoded_path)
+    logger.info(f"[Download] Decoded {len(audio) / SAMPLE_RATE:.0f}s of audio, cached as {cached_path} "
+                f"({os.path.getsize(cached_path) / 1e6:.1f} MB)")
+    return audio
+
+def _caption_url_as_json3(caption_url: str) -> str:
+    parts = urlparse(caption_url)
+    query = parse_qs(parts.query, keep_blank_values=True)
+    query["fmt"] = ["json3"]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+async def fetch_caption_segments(url: str) -> List[Tuple[float, float, str]]:
+    try:
+        caption_url = await get_ipc_client().service("accessSearchAgents").get_transcript_url(
+            url, timeout=TRANSCRIPT_CAPTION_TIMEOUT_SECONDS
+        )
+    except (ConnectionError, FileNotFoundError) as e:
+        logger.warning(f"[Captions] IPC service not available for caption lookup: {e}")
+        return []
+    except Exception as e:
+        logger.warning(f"[Captions] Caption lookup failed for {url}: {e}")
+        return []
+    if not caption_url:
+        logger.info(f"[Captions] No caption track found for {url}")
+        return []
+
+    try:
+        response = await get_async_fetcher().client.get(_caption_url_as_json3(caption_url))
+        response.raise_for_status()
+        segments = parse_caption_track(response.text)
+    except Exception as e:
+        logger.warning(f"[Captions] Failed to fetch caption track for {url}: {e}")
+        return []
+    logger.info(f"[Captions] Parsed {len(segments)} caption segments for {url}")
+    return segments
+
+async def whisper_segments(url: str, beam_size: int = 5, vad_filter: bool = False,
+                           on_progress: Optional[ProgressCallback] = None, download: Optional[Awaitable[str]] = None):
+    audio = await load_audio(url, download=download)
+    engine = get_transcription_engine()
+    logger.info(f"[Transcribe] Using faster-whisper on {engine.device} with {engine.workers} worker(s), beam_size={beam_size}")
+    return await engine.transcribe(audio, beam_size=beam_size, vad_filter=vad_filter, on_segments=on_progress)
+
+async def get_transcript(url: str, video_id: str, beam_size: int = 5, vad_filter: bool = False,
+                         on_progress: Optional[ProgressCallback] = None) -> Dict:
+    store = get_transcript_store()
+    start_time = time.perf_counter()
+    entry = await asyncio.to_thread(store.get, video_id)
+    if entry is not None:
+        store.record("cache", time.perf_counter() - start_time)
+        logger.info(f"[Transcribe] Transcript cache HIT for {video_id} ({entry['source']})")
+        entry["served_from"] = "cache"
+        return entry
+
+    # Captions first; whisper only runs when the video has none. If the caption
+    # lookup is slow, the raw audio download (no decode, no whisper) is started
+    # behind it so the fallback does not begin from scratch.
+    captions = asyncio.ensure_future(fetch_caption_segments(url))
+    download = None
+    try:
+        done, _ = await asyncio.wait({captions}, timeout=TRANSCRIPT_AUDIO_PREFETCH_AFTER_SECONDS)
+        if not done and video_id not in get_audio_cache():
+            logger.info(f"[Transcribe] Caption lookup still running for {video_id}, prefetching audio")
+            download = asyncio.ensure_future(download_audio(url))
+        segments = await captions
+        if segments:
+            source, language, duration = "captions", None, None
+        else:
+            pending, download = download, None
+            segments, info = await whisper_segments(url, beam_size=beam_size, vad_filter=vad_filter,
+                                                    on_progress=on_progress, download=pending)
+            source, language, duration = "whisper", info.language, info.duration
+    finally:
+        captions.cancel()
+        if download is not None:
+            discard_download(download)
+
+    if segments:
+        entry = await asyncio.to_thread(store.put, video_id, source, segments, language, duration)
+    else:
+        entry = {"video_id": video_id, "source": source, "language": language,
+                 "duration": duration, "text": "", "segments": []}
+    store.record(entry["source"], time.perf_counter() - start_time)
+    entry["served_from"] = entry["source"]
+    return entry
 
 async def transcribe_audio(
     url: str,
     full_transcript: bool = False,
     query: Optional[str] = None,
-    timeout: float = 300.0
+    timeout: float = 300.0,
+    on_progress: Optional[ProgressCallback] = None
 ) -> str:
     start_time = time.perf_counter()
     video_id = get_youtube_video_id(url)
@@ -121,39 +205,13 @@ async def transcribe_audio(
     
     try:
         logger.info(f"[Transcribe] Starting transcription for video {video_id}")
-        
-        if _init_ipc_manager() and core_service is not None:
-            try:
-                logger.info(f"[Transcribe] Using IPC CoreEmbeddingService for transcription")
-                audio_path = await download_audio(url)
-                transcription = await asyncio.to_thread(
-                    core_service.transcribe_audio, 
-                    audio_path
-                )
-                metadata = await youtubeMetadata(url)
-                elapsed = time.perf_counter() - start_time
-                logger.info(f"[Transcribe] IPC transcription completed in {elapsed:.2f}s")
-                if metadata:
-                    transcription = f"{transcription}\n\n[Source: {metadata}]"
-                return transcription
-            except Exception as e:
-                logger.warning(f"[Transcribe] IPC transcription failed: {e}. Falling back to local faster-whisper")
-        
-        logger.info(f"[Transcribe] Using local faster-whisper model on {device}")
-        audio_path = await download_audio(url)
-        
-        segments, info = await asyncio.to_thread(
-            whisper_model.transcribe,
-            audio_path,
-            language="en",
-            beam_size=5
+        entry, metadata = await asyncio.wait_for(
+            asyncio.gather(get_transcript(url, video_id, on_progress=on_progress), youtubeMetadata(url)),
+            timeout=timeout
         )
-        
-        transcription = " ".join([segment.text for segment in segments])
-        
-        metadata = await youtubeMetadata(url)
+        transcription = entry["text"]
         elapsed = time.perf_counter() - start_time
-        logger.info(f"[Transcribe] Local transcription completed in {elapsed:.2f}s")
+        logger.info(f"[Transcribe] Transcript for {video_id} served from {entry['served_from']} in {elapsed:.2f}s")
         
         if metadata:
             transcription = f"{transcription}\n\n[Source: {metadata}]"
@@ -182,30 +240,18 @@ async def transcribe_long(
     
     try:
         logger.info(f"[TranscribeLong] Starting long-form transcription for video {video_id}")
-        audio_path = await download_audio(url)
-        
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
-        logger.info(f"[TranscribeLong] Using faster-whisper on {device} with beam_size={beam_size}")
-        segments, info = await asyncio.to_thread(
-            whisper_model.transcribe,
-            audio_path,
-            language="en",
-            beam_size=beam_size,
-            vad_filter=True
+        entry, metadata = await asyncio.gather(
+            get_transcript(url, video_id, beam_size=beam_size, vad_filter=True),
+            youtubeMetadata(url)
         )
         
-        transcription = " ".join([segment.text for segment in segments])
-        
-        metadata = await youtubeMetadata(url)
-        
         elapsed = time.perf_counter() - start_time
         logger.info(f"[TranscribeLong] Transcription completed in {elapsed:.2f}s")
         
-        response = f"{transcription}\n\n---\n**Transcription Stats:**\n"
-        response += f"- Duration: {info.duration:.1f}s\n"
-        response += f"- Language: {info.language}\n"
+        response = f"{entry['text']}\n\n---\n**Transcription Stats:**\n"
+        response += f"- Duration: {entry['duration'] or 0:.1f}s\n"
+        response += f"- Language: {entry['language'] or 'unknown'}\n"
+        response += f"- Transcript source: {entry['source']}\n"
         response += f"- Processing time: {elapsed:.2f}s\n"
         
         if metadata:
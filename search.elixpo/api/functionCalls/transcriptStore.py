@@ -0,0 +1,176 @@
+from collections import deque
+from pathlib import Path
+import html
+import json
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+import numpy as np
+from pipeline.config import TRANSCRIPT_STORE_PATH
+
+Segment = Tuple[float, float, str]
+
+TRANSCRIPT_SOURCES = ("cache", "captions", "whisper")
+
+
+def parse_caption_track(body: str) -> List[Segment]:
+    """Parse a YouTube timedtext response (json3, srv3 or classic XML) into ``(start, end, text)`` segments."""
+    body = body.lstrip()
+    if not body:
+        return []
+    segments: List[Segment] = []
+    if body.startswith("{"):
+        for event in json.loads(body).get("events", []):
+            text = "".join(seg.get("utf8", "") for seg in event.get("segs", []) or []).replace("\n", " ").strip()
+            if not text:
+                continue
+            start = event.get("tStartMs", 0) / 1000.0
+            segments.append((start, start + event.get("dDurationMs", 0) / 1000.0, text))
+        return segments
+
+    root = ET.fromstring(body)
+    for node in root.iter():
+        if node.tag == "text":
+            start = float(node.get("start", 0))
+            end = start + float(node.get("dur", 0))
+        elif node.tag == "p":
+            start = int(node.get("t", 0)) / 1000.0
+            end = start + int(node.get("d", 0)) / 1000.0
+        else:
+            continue
+        text = html.unescape(" ".join("".join(node.itertext()).split()))
+        if text:
+            segments.append((start, end, text))
+    return segments
+
+
+def segments_to_text(segments: List[Segment]) -> str:
+    return " ".join(text.strip() for _, _, text in segments if text.strip())
+
+
+class TranscriptStore:
+    """Persistent per-video transcript cache (zlib text + segment timestamps) in SQLite WAL.
+
+    Also keeps the per-source latency and hit counters reported by /api/stats.
+    """
+
+    def __init__(self, db_path: str = TRANSCRIPT_STORE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                language TEXT,
+                duration REAL,
+                text BLOB NOT NULL,
+                segments BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self._latencies: Dict[str, deque] = {source: deque(maxlen=512) for source in TRANSCRIPT_SOURCES}
+        self._counts: Dict[str, int] = {source: 0 for source in TRANSCRIPT_SOURCES}
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT source, language, duration, text, segments FROM transcripts WHERE video_id = ?",
+                (video_id,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        source, language, duration, text_blob, segments_blob = row
+        try:
+            return {
+                "video_id": video_id,
+                "source": source,
+                "language": language,
+                "duration": duration,
+                "text": zlib.decompress(text_blob).decode("utf-8"),
+                "segments": [tuple(s) for s in json.loads(zlib.decompress(segments_blob))],
+            }
+        except Exception as e:
+            logger.warning(f"[TranscriptStore] Dropping unreadable transcript for {video_id}: {e}")
+            self.delete(video_id)
+            return None
+
+    def put(self, video_id: str, source: str, segments: List[Segment], language: Optional[str] = None,
+            duration: Optional[float] = None) -> Dict:
+        text = segments_to_text(segments)
+        if duration is None and segments:
+            duration = max(end for _, end, _ in segments)
+        segments = [(round(start, 2), round(end, 2), seg_text) for start, end, seg_text in segments]
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO transcripts (video_id, source, language, duration, text, segments, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, source, language, duration, zlib.compress(text.encode("utf-8"), 6),
+                     zlib.compress(json.dumps(segments, separators=(",", ":")).encode("utf-8"), 6), time.time())
+                )
+        logger.info(f"[TranscriptStore] Stored {source} transcript for {video_id} ({len(segments)} segments)")
+        return {"video_id": video_id, "source": source, "language": language, "duration": duration,
+                "text": text, "segments": segments}
+
+    def delete(self, video_id: str) -> None:
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+
+    def record(self, source: str, seconds: float) -> None:
+        with self.lock:
+            self._counts[source] += 1
+            self._latencies[source].append(seconds)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            rows = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(text) + LENGTH(segments)), 0) FROM transcripts").fetchone()
+            lookups = self.hits + self.misses
+            sources = {}
+            for source in TRANSCRIPT_SOURCES:
+                samples = np.asarray(self._latencies[source], dtype=np.float64)
+                sources[source] = {
+                    "count": self._counts[source],
+                    "latency_p50_s": round(float(np.percentile(samples, 50)), 4) if samples.size else None,
+                    "latency_p95_s": round(float(np.percentile(samples, 95)), 4) if samples.size else None,
+                }
+            return {
+                "entries": rows[0],
+                "stored_bytes": rows[1],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "sources": sources,
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_store: Optional[TranscriptStore] = None
+_store_lock = threading.Lock()
+
+
+def get_transcript_store() -> TranscriptStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TranscriptStore()
+    return _store
@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Tuple, Union
+from loguru import logger
+import numpy as np
+from pipeline.config import (AUDIO_TRANSCRIBE_SIZE, TRANSCRIBE_WORKERS, TRANSCRIBE_CHUNK_SECONDS,
+                             TRANSCRIBE_MAX_CHUNK_SECONDS, TRANSCRIBE_MIN_SILENCE_SECONDS)
+from functionCalls.audioCache import SAMPLE_RATE, decode_to_pcm
+
+FRAME_SECONDS = 0.03
+
+Segment = Tuple[float, float, str]
+
+
+class TranscriptionInfo(NamedTuple):
+    language: Optional[str]
+    duration: float
+
+
+def detect_device() -> str:
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, target_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                     max_seconds: float = TRANSCRIBE_MAX_CHUNK_SECONDS,
+                     min_silence_seconds: float = TRANSCRIBE_MIN_SILENCE_SECONDS) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` sample ranges cut in the middle of pauses, close to ``target_seconds`` long.
+
+    Frame RMS against an adaptive floor stands in for a VAD; when a window has
+    no pause long enough the cut falls on its quietest frame.
+    """
+    total = len(audio)
+    max_len = int(max_seconds * sample_rate)
+    if total <= max_len:
+        return [(0, total)] if total else []
+
+    frame = int(FRAME_SECONDS * sample_rate)
+    n_frames = total // frame
+    rms = np.sqrt(np.mean(np.square(audio[:n_frames * frame].reshape(n_frames, frame), dtype=np.float64), axis=1))
+    floor, peak = np.percentile(rms, 15), np.percentile(rms, 95)
+    silent = rms <= floor + 0.05 * (peak - floor)
+
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    min_run = max(1, int(min_silence_seconds / FRAME_SECONDS))
+    long_runs = (run_ends - run_starts) >= min_run
+    cut_points = ((run_starts[long_runs] + run_ends[long_runs]) // 2) * frame
+
+    target_len = int(target_seconds * sample_rate)
+    ranges = []
+    start = 0
+    while total - start > max_len:
+        window = cut_points[(cut_points >= start + target_len // 2) & (cut_points <= start + max_len)]
+        if window.size:
+            cut = int(window[np.argmin(np.abs(window - (start + target_len)))])
+        else:
+            lo, hi = (start + target_len // 2) // frame, min(n_frames, (start + max_len) // frame)
+            cut = int((lo + np.argmin(rms[lo:hi])) * frame)
+        ranges.append((start, cut))
+        start = cut
+    ranges.append((start, total))
+    return ranges
+
+
+_worker_model = None
+
+
+def _init_worker(model_size: str, device: str, cpu_threads: int) -> None:
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, device=device, compute_type="auto", cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(audio: np.ndarray, offset: float, beam_size: int, language: Optional[str],
+                      vad_filter: bool) -> Tuple[List[Segment], Optional[str]]:
+    segments, info = _worker_model.transcribe(audio, language=language, beam_size=beam_size, vad_filter=vad_filter,
+                                              condition_on_previous_text=False)
+    return [(offset + s.start, offset + s.end, s.text.strip()) for s in segments], info.language
+
+
+class TranscriptionEngine:
+    """Splits audio at pauses and transcribes the chunks in parallel on a whisper process pool.
+
+    Each worker process loads its own model on first use, so nothing is
+    loaded until the first transcription. On GPU a single worker is used.
+    """
+
+    def __init__(self, workers: int = TRANSCRIBE_WORKERS, model_size: str = AUDIO_TRANSCRIBE_SIZE,
+                 chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS, max_chunk_seconds: float = TRANSCRIBE_MAX_CHUNK_SECONDS):
+        self.model_size = model_size
+        self.chunk_seconds = chunk_seconds
+        self.max_chunk_seconds = max_chunk_seconds
+        self.device = detect_device()
+        cores = os.cpu_count() or 1
+        self.workers = 1 if self.device == "cuda" else max(1, workers or cores)
+        self.cpu_threads = max(1, cores // self.workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"[TranscriptionEngine] Starting {self.workers} whisper worker(s) "
+                            f"({self.model_size} on {self.device}, {self.cpu_threads} thread(s) each)")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_size, self.device, self.cpu_threads),
+                )
+            return self._executor
+
+    def _reset_pool(self, broken: Optional[ProcessPoolExecutor]) -> None:
+        with self._lock:
+            if broken is not None and self._executor is broken:
+                logger.warning("[TranscriptionEngine] Worker pool broke (a worker died); starting a fresh one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def stream(self, audio_path: str, beam_size: int = 5, language: Optional[str] = "en",
+                     vad_filter: bool = False) -> AsyncIterator[Tuple[int, int, List[Segment], Optional[str]]]:
+        audio = await decode_to_pcm(audio_path)
+        async for item in self.stream_audio(audio, beam_size, language, vad_filter):
+            yield item
+
+    async def stream_audio(self, audio: np.ndarray, beam_size: int = 5, language: Optional[str] = "en",
+                           vad_filter: bool = False) -> AsyncIterator[Tuple[int, int, List[Segment], Optional[str]]]:
+        """Yield ``(chunks_done, chunks_total, segments, language)`` in audio order while later chunks keep running.
+
+        If a worker dies (e.g. OOM) the pool is replaced and the unfinished
+        chunks are resubmitted once before the error is raised.
+        """
+        ranges = split_on_silence(audio, SAMPLE_RATE, self.chunk_seconds, self.max_chunk_seconds)
+        logger.info(f"[TranscriptionEngine] {len(audio) / SAMPLE_RATE:.1f}s of audio in {len(ranges)} chunk(s)")
+        loop = asyncio.get_running_loop()
+        pool: Optional[ProcessPoolExecutor] = None
+        futures: List[asyncio.Future] = []
+        retried = False
+        index = 0
+        try:
+            while index < len(ranges):
+                try:
+                    if len(futures) == index:
+                        pool = self._pool()
+                        for start, end in ranges[index:]:
+                            futures.append(loop.run_in_executor(pool, _transcribe_chunk, audio[start:end], start / SAMPLE_RATE,
+                                                                beam_size, language, vad_filter))
+                    segments, detected = await futures[index]
+                except BrokenProcessPool:
+                    if retried:
+                        raise
+                    retried = True
+                    self._reset_pool(pool)
+                    for future in futures[index:]:
+                        future.cancel()
+                    del futures[index:]
+                    continue
+                index += 1
+                yield index, len(ranges), segments, detected
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def transcribe(self, audio: Union[str, np.ndarray], beam_size: int = 5, language: Optional[str] = "en", vad_filter: bool = False,
+                         on_segments: Optional[Callable[[int, int, List[Segment]], None]] = None
+                         ) -> Tuple[List[Segment], TranscriptionInfo]:
+        if isinstance(audio, str):
+            audio = await decode_to_pcm(audio)
+        segments: List[Segment] = []
+        detected_language = language
+        async for done, total, chunk_segments, detected in self.stream_audio(audio, beam_size, language, vad_filter):
+            segments.extend(chunk_segments)
+            detected_language = detected_language or detected
+            if on_segments is not None:
+                on_segments(done, total, chunk_segments)
+        return segments, TranscriptionInfo(detected_language, len(audio) / SAMPLE_RATE)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_engine: Optional[TranscriptionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_transcription_engine() -> TranscriptionEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TranscriptionEngine()
+    return _engine
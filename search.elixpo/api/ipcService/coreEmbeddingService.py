@@ -1,10 +1,12 @@
 from loguru import logger 
-from ragService.embeddingService import EmbeddingService
+from ragService.embeddingService import get_embedding_service
+from ragService.embeddingBatcher import EmbeddingBatcher
+from ragService.embeddingMemo import MemoizedEmbedder, get_embedding_memo
 from ragService.vectorStore import VectorStore
 from ragService.semanticCache import SemanticCache
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from pipeline.config import EMBEDDING_MODEL, EMBEDDINGS_DIR, SEMANTIC_CACHE_TTL_SECONDS, SEMANTIC_CACHE_SIMILARITY_THRESHOLD, AUDIO_TRANSCRIBE_SIZE, RETRIEVAL_TOP_K, PERSIST_VECTOR_STORE_INTERVAL, REQUEST_ID_HEX_SLICE_SIZE
+from pipeline.config import EMBEDDING_MODEL, EMBEDDINGS_DIR, SEMANTIC_CACHE_TTL_SECONDS, SEMANTIC_CACHE_SIMILARITY_THRESHOLD, AUDIO_TRANSCRIBE_SIZE, RETRIEVAL_TOP_K, PERSIST_VECTOR_STORE_INTERVAL, REQUEST_ID_HEX_SLICE_SIZE, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_WAIT_MS, EMBEDDING_BATCH_MAX_TEXTS, EMBEDDING_QUEUE_MAX_DEPTH
 from ragService.retrievalPipeline import RetrievalPipeline
 import torch
 import threading
@@ -21,14 +23,21 @@ class CoreEmbeddingService:
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"[CORE {CoreEmbeddingService._instance_id}] Using device: {self.device}")
         
-        self.embedding_service = EmbeddingService(model_name=EMBEDDING_MODEL)
+        self.embedding_service = get_embedding_service(EMBEDDING_MODEL)
+        self.embedding_batcher = EmbeddingBatcher(
+            self.embedding_service,
+            max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+            max_texts=EMBEDDING_BATCH_MAX_TEXTS,
+            max_queue_depth=EMBEDDING_QUEUE_MAX_DEPTH,
+            encode_batch_size=EMBEDDING_BATCH_SIZE
+        )
         self.vector_store = VectorStore(embeddings_dir=EMBEDDINGS_DIR)
         self.semantic_cache = SemanticCache(
             ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
             similarity_threshold=SEMANTIC_CACHE_SIMILARITY_THRESHOLD
         )
         self.retrieval_pipeline = RetrievalPipeline(
-            self.embedding_service,
+            MemoizedEmbedder(self.embedding_batcher, EMBEDDING_MODEL),
             self.vector_store
         )
         
@@ -75,9 +84,25 @@ class CoreEmbeddingService:
                 "error": str(e)
             }
     
-    def retrieve(self, query: str, top_k: int = RETRIEVAL_TOP_K) -> Dict:
+    def ingest_text(self, url: str, text: str) -> Dict:
         try:
-            results = self.retrieval_pipeline.retrieve(query, top_k=top_k)
+            chunk_count = self.retrieval_pipeline.ingest_text(url, text, max_words=3000)
+            return {
+                "success": True,
+                "url": url,
+                "chunks_ingested": chunk_count
+            }
+        except Exception as e:
+            logger.error(f"[CORE] Failed to ingest text for {url}: {e}")
+            return {
+                "success": False,
+                "url": url,
+                "error": str(e)
+            }
+    
+    def retrieve(self, query: str, top_k: int = RETRIEVAL_TOP_K, query_embedding: Optional[List[float]] = None) -> Dict:
+        try:
+            results = self.retrieval_pipeline.retrieve(query, top_k=top_k, query_embedding=query_embedding)
             return {
                 "query": query,
                 "results": results,
@@ -92,12 +117,14 @@ class CoreEmbeddingService:
                 "error": str(e)
             }
     
-    def build_retrieval_context(self, query: str, session_memory: str = "", top_k: int = RETRIEVAL_TOP_K) -> Dict:
+    def build_retrieval_context(self, query: str, session_memory: str = "", top_k: int = RETRIEVAL_TOP_K,
+                                query_embedding: Optional[List[float]] = None) -> Dict:
         try:
             context = self.retrieval_pipeline.build_context(
                 query,
                 top_k=top_k,
-                session_memory=session_memory
+                session_memory=session_memory,
+                query_embedding=query_embedding
             )
             return {
                 "success": True,
@@ -121,15 +148,23 @@ class CoreEmbeddingService:
         self.semantic_cache.set(url, query_emb, response)
     
     def get_vector_store_stats(self) -> Dict:
-        return self.vector_store.get_stats()
+        return {
+            **self.vector_store.get_stats(),
+            "ingest": self.retrieval_pipeline.get_stats(),
+            "embedding_memo": get_embedding_memo().get_stats()
+        }
     
     def get_semantic_cache_stats(self) -> Dict:
         return self.semantic_cache.get_stats()
     
+    def get_embedding_batcher_stats(self) -> Dict:
+        return self.embedding_batcher.get_stats()
+    
     def _persist_worker(self) -> None:
         while True:
             try:
                 time.sleep(PERSIST_VECTOR_STORE_INTERVAL)
+                self.vector_store.run_maintenance()
                 self.vector_store.persist_to_disk()
             except Exception as e:
                 logger.error(f"[CORE] Persist worker error: {e}")
@@ -2,29 +2,41 @@ import warnings
 import os
 import logging
 import sys
+import threading
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from multiprocessing.managers import BaseManager
 from loguru import logger
 from ipcService.coreEmbeddingService import CoreEmbeddingService
 from ipcService.searchPortManager import accessSearchAgents, _ensure_background_loop, run_async_on_bg_loop, agent_pool, shutdown_graceful
+from ipcService.rpc import RPCServer
 
 warnings.filterwarnings('ignore', message='Can\'t initialize NVML')
 os.environ['CHROMA_TELEMETRY_DISABLED'] = '1'
 logging.getLogger('chromadb').setLevel(logging.ERROR)
 
-if __name__ == "__main__":
-    class ModelManager(BaseManager):
-        pass
 
-    ModelManager.register("CoreEmbeddingService", CoreEmbeddingService)
-    ModelManager.register("accessSearchAgents", accessSearchAgents)
+def build_rpc_services(core_service, search_agents):
+    """Methods reachable over the RPC socket. Coroutines run on the background loop, the rest on the RPC executor."""
+    core_methods = ("ingest_url", "ingest_text", "retrieve", "build_retrieval_context", "get_semantic_cache",
+                    "set_semantic_cache", "get_vector_store_stats", "get_semantic_cache_stats", "get_embedding_batcher_stats")
+    return {
+        "CoreEmbeddingService": {name: getattr(core_service, name) for name in core_methods},
+        "accessSearchAgents": {
+            "health_check": search_agents.health_check,
+            "web_search": search_agents._async_web_search,
+            "image_search": search_agents._async_image_search,
+            "get_youtube_metadata": search_agents._async_get_youtube_metadata,
+            "get_transcript_url": search_agents._async_get_youtube_transcript_url,
+            "get_agent_pool_status": search_agents._async_get_agent_pool_status,
+            "get_search_cache_stats": search_agents._async_get_search_cache_stats,
+        },
+    }
+
+
+if __name__ == "__main__":
     core_service = CoreEmbeddingService()
     search_agents = accessSearchAgents()
-    manager = ModelManager(address=("localhost", 5010), authkey=b"ipcService")
-    server = manager.get_server()
-    logger.info("[MAIN] Core service started on port 5010...")
     logger.info(f"[MAIN] Vector store stats: {core_service.get_vector_store_stats()}")
 
     try:
@@ -33,12 +45,21 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"[MAIN] Failed to initialize agent pool: {e}")
 
+    rpc_server = RPCServer(build_rpc_services(core_service, search_agents))
+    run_async_on_bg_loop(rpc_server.start())
+    logger.info("[MAIN] Core service started")
+
     try:
-        server.serve_forever()
+        # The RPC server runs on the background loop; the main thread only waits for a shutdown signal
+        threading.Event().wait()
     except KeyboardInterrupt:
         logger.info("[MAIN] Shutdown signal received...")
     except Exception as e:
         logger.error(f"[MAIN] Server error: {e}")
     finally:
+        try:
+            run_async_on_bg_loop(rpc_server.stop())
+        except Exception as e:
+            logger.warning(f"[MAIN] RPC server stop failed: {e}")
         shutdown_graceful()
         logger.info("[MAIN] Shutdown complete")
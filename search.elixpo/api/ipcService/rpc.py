@@ -0,0 +1,259 @@
+import abc
+import asyncio
+import inspect
+import itertools
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import msgpack
+import numpy as np
+from loguru import logger
+from pipeline.config import IPC_SOCKET_PATH, IPC_RPC_POOL_SIZE, IPC_RPC_TIMEOUT_SECONDS, IPC_RPC_EXECUTOR_WORKERS
+
+# Frame: 4-byte big-endian length + msgpack body.
+# Request:  [msg_id, service, method, args, kwargs, timeout_seconds]
+# Response: [msg_id, error, result] where error is None or [type_name, message]
+_HEADER = struct.Struct(">I")
+_MAX_FRAME = 64 * 1024 * 1024
+
+
+class RPCError(Exception):
+    def __init__(self, type_name: str, message: str):
+        super().__init__(f"{type_name}: {message}")
+        self.type_name = type_name
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _pack(message) -> bytes:
+    body = msgpack.packb(message, default=_default, use_bin_type=True)
+    return _HEADER.pack(len(body)) + body
+
+
+class _FramedProtocol(asyncio.Protocol, abc.ABC):
+    """Splits the byte stream into msgpack frames; subclasses handle each decoded message."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.Transport] = None
+        self._buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self._buffer += data
+        buffer = self._buffer
+        offset = 0
+        while len(buffer) - offset >= _HEADER.size:
+            (length,) = _HEADER.unpack_from(buffer, offset)
+            if length > _MAX_FRAME:
+                self.transport.close()
+                return
+            end = offset + _HEADER.size + length
+            if len(buffer) < end:
+                break
+            message = msgpack.unpackb(buffer[offset + _HEADER.size:end], raw=False)
+            offset = end
+            self.message_received(message)
+        if offset:
+            del buffer[:offset]
+
+    @abc.abstractmethod
+    def message_received(self, message):
+        """Handle one decoded frame."""
+
+    def send(self, message) -> bool:
+        if self.transport is None or self.transport.is_closing():
+            return False
+        self.transport.write(_pack(message))
+        return True
+
+
+async def _with_deadline(loop: asyncio.AbstractEventLoop, future: asyncio.Future, timeout: Optional[float]):
+    # Cheaper than asyncio.wait_for, which wraps every call in an extra task.
+    if timeout is None:
+        return await future
+    handle = loop.call_later(timeout, future.cancel)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        if handle.cancelled() or loop.time() < handle.when():
+            raise
+        raise asyncio.TimeoutError() from None
+    finally:
+        handle.cancel()
+
+
+class RPCServer:
+    """Serves whitelisted service methods over a Unix domain socket.
+
+    Coroutine functions are awaited on the server loop; plain functions run
+    on a thread pool so a slow embedding call never blocks other requests.
+    """
+
+    def __init__(self, services: Dict[str, Dict[str, Callable]], path: str = IPC_SOCKET_PATH,
+                 executor_workers: int = IPC_RPC_EXECUTOR_WORKERS):
+        self.services = services
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="rpc")
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.calls = 0
+        self.errors = 0
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_unix_server(lambda: _ServerProtocol(self), path=self.path)
+        os.chmod(self.path, 0o600)
+        logger.info(f"[RPC] Serving {', '.join(self.services)} on {self.path}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def dispatch(self, request, protocol: "_ServerProtocol"):
+        msg_id, service, method, args, kwargs, timeout = request
+        self.calls += 1
+        try:
+            func = self.services.get(service, {}).get(method)
+            if func is None:
+                raise AttributeError(f"{service}.{method} is not exposed")
+            loop = asyncio.get_running_loop()
+            if inspect.iscoroutinefunction(func):
+                call = asyncio.ensure_future(func(*args, **kwargs))
+            else:
+                call = loop.run_in_executor(self.executor, lambda: func(*args, **kwargs))
+            response = [msg_id, None, await _with_deadline(loop, call, timeout)]
+        except Exception as e:
+            self.errors += 1
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"{service}.{method} exceeded {timeout}s deadline")
+            logger.warning(f"[RPC] {service}.{method} failed: {type(e).__name__}: {e}")
+            response = [msg_id, [type(e).__name__, str(e)], None]
+        try:
+            protocol.send(response)
+        except TypeError as e:
+            protocol.send([msg_id, ["TypeError", str(e)], None])
+
+
+class _ServerProtocol(_FramedProtocol):
+    def __init__(self, server: RPCServer):
+        super().__init__()
+        self.server = server
+        self.tasks = set()
+
+    def message_received(self, message):
+        task = asyncio.ensure_future(self.server.dispatch(message, self))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def connection_lost(self, exc):
+        for task in self.tasks:
+            task.cancel()
+
+
+class _ClientProtocol(_FramedProtocol):
+    def __init__(self):
+        super().__init__()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.closed = False
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.transport is not None and not self.transport.is_closing()
+
+    def message_received(self, message):
+        msg_id, err, result = message
+        future = self.pending.pop(msg_id, None)
+        if future is None or future.done():
+            return
+        if err is not None:
+            future.set_exception(RPCError(*err))
+        else:
+            future.set_result(result)
+
+    def connection_lost(self, exc):
+        self.closed = True
+        error = ConnectionError(f"RPC connection lost: {exc}" if exc else "RPC connection closed")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+
+class RPCClient:
+    """Pooled, multiplexed client for :class:`RPCServer`. Bound to one event loop."""
+
+    def __init__(self, path: str = IPC_SOCKET_PATH, pool_size: int = IPC_RPC_POOL_SIZE,
+                 default_timeout: float = IPC_RPC_TIMEOUT_SECONDS):
+        self.path = path
+        self.pool_size = pool_size
+        self.default_timeout = default_timeout
+        self._connections: List[Optional[_ClientProtocol]] = [None] * pool_size
+        self._connect_locks = [asyncio.Lock() for _ in range(pool_size)]
+        self._ids = itertools.count(1)
+        self._next = itertools.cycle(range(pool_size))
+
+    async def _connect(self, slot: int) -> _ClientProtocol:
+        async with self._connect_locks[slot]:
+            conn = self._connections[slot]
+            if conn is None or not conn.alive:
+                _, conn = await asyncio.get_running_loop().create_unix_connection(_ClientProtocol, self.path)
+                self._connections[slot] = conn
+        return conn
+
+    async def call(self, service: str, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        timeout = self.default_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        slot = next(self._next)
+        conn = self._connections[slot]
+        if conn is None or not conn.alive:
+            conn = await _with_deadline(loop, asyncio.ensure_future(self._connect(slot)), timeout)
+        msg_id = next(self._ids)
+        future = loop.create_future()
+        conn.pending[msg_id] = future
+        try:
+            conn.send([msg_id, service, method, list(args), kwargs, timeout])
+            return await _with_deadline(loop, future, timeout)
+        finally:
+            conn.pending.pop(msg_id, None)
+
+    def service(self, name: str) -> "ServiceProxy":
+        return ServiceProxy(self, name)
+
+    async def close(self):
+        for conn in self._connections:
+            if conn is not None and conn.transport is not None:
+                conn.transport.close()
+        self._connections = [None] * self.pool_size
+
+
+class ServiceProxy:
+    """``await proxy.method(*args, timeout=..., **kwargs)`` forwards to ``RPCClient.call``."""
+
+    def __init__(self, client: RPCClient, name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def _call(*args, timeout: Optional[float] = None, **kwargs):
+            return await self._client.call(self._name, method, *args, timeout=timeout, **kwargs)
+
+        return _call
@@ -3,15 +3,18 @@ from loguru import logger
 import random
 import asyncio
 import threading 
+from contextlib import asynccontextmanager
 import numpy as np
 from playwright.async_api import async_playwright
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
+from collections import deque
 import atexit
 import time
-from pipeline.config import MAX_LINKS_TO_TAKE, isHeadless, MAX_IMAGES_TO_INCLUDE, LOG_MESSAGE_QUERY_TRUNCATE
+from pipeline.config import MAX_LINKS_TO_TAKE, isHeadless, MAX_IMAGES_TO_INCLUDE, LOG_MESSAGE_QUERY_TRUNCATE, MODEL_POOL_SIZE, MODEL_MAX_TABS, SEARCH_AGENT_CONCURRENT_TABS, SEARCH_SERP_MODE, SEARCH_FAST_TIMEOUT_MS
 import shutil
 import os
 import json
+from ipcService.searchResultCache import SearchResultCache
 
 _event_loop = None
 _event_loop_thread = None
@@ -45,6 +48,58 @@ async def handle_accept_popup(page):
         logger.warning(f"[POPUP] No accept popup found: {e}")
 
 
+class SerpModeStats:
+    def __init__(self):
+        self.queries = 0
+        self.empty = 0
+        self.fallbacks = 0
+        self.time_to_links = deque(maxlen=500)
+        self.bytes_transferred = deque(maxlen=500)
+
+    def record(self, time_to_links: float, transferred: int, found: bool):
+        self.queries += 1
+        if found:
+            self.time_to_links.append(time_to_links)
+        else:
+            self.empty += 1
+        self.bytes_transferred.append(transferred)
+
+    def summary(self):
+        times = sorted(self.time_to_links)
+        return {
+            "queries": self.queries,
+            "empty": self.empty,
+            "fallbacks": self.fallbacks,
+            "time_to_links_p50": round(times[len(times) // 2], 3) if times else None,
+            "time_to_links_p95": round(times[int(len(times) * 0.95)], 3) if times else None,
+            "avg_bytes": int(sum(self.bytes_transferred) / len(self.bytes_transferred)) if self.bytes_transferred else 0,
+        }
+
+
+serp_metrics = {"fast": SerpModeStats(), "human": SerpModeStats()}
+
+_BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+
+def _site_of(host: str) -> str:
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 and not host.replace(".", "").isdigit() else host
+
+
+def _fast_serp_router(search_url: str):
+    first_party = _site_of(urlparse(search_url).hostname or "")
+
+    async def _route(route):
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _site_of(host) != first_party:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return _route
+
+
 class searchPortManager:
     def __init__(self, start_port=10000, end_port=19999):
         self.start_port = start_port
@@ -89,108 +144,181 @@ class searchPortManager:
 
 
 
+class _AgentSlot:
+    def __init__(self, agent, index: int, max_concurrent_tabs: int):
+        self.agent = agent
+        self.index = index
+        self.max_concurrent_tabs = max_concurrent_tabs
+        self.tabs_used = 0
+        self.active = 0
+        self.rotating = False
+
+
 class SearchAgentPool:
-    def __init__(self, pool_size=1, max_tabs_per_agent=20):
+    """Browser contexts per agent type, each serving up to ``max_concurrent_tabs`` tabs at once.
+
+    Requests are admitted FIFO through a semaphore sized to the total tab
+    capacity. Once a context has served ``max_tabs_per_agent`` tabs it is
+    swapped for a warm standby and closed in the background after its open
+    tabs finish, so no request waits on a Chromium launch.
+    """
+
+    def __init__(self, pool_size=MODEL_POOL_SIZE, max_tabs_per_agent=MODEL_MAX_TABS, max_concurrent_tabs=SEARCH_AGENT_CONCURRENT_TABS):
         self.pool_size = pool_size
         self.max_tabs_per_agent = max_tabs_per_agent
-        self.text_agents = []
-        self.image_agents = []
-        self.text_agent_tabs = []
-        self.image_agent_tabs = []
+        self.max_concurrent_tabs = max_concurrent_tabs
+        self.agent_factories = {"text": YahooSearchAgentText, "image": YahooSearchAgentImage}
+        self.slots = {"text": [], "image": []}
+        self.standby = {"text": None, "image": None}
+        self.restarts = {"text": 0, "image": 0}
+        self._admission = {}
+        self._waiting = {"text": 0, "image": 0}
+        self._standby_tasks = {}
+        self._background_tasks = set()
         self.lock = asyncio.Lock()
         self.initialized = False
-    
+
+    @property
+    def text_agents(self):
+        return [slot.agent for slot in self.slots["text"]]
+
+    @property
+    def image_agents(self):
+        return [slot.agent for slot in self.slots["image"]]
+
+    async def _start_agent(self, kind: str):
+        agent = self.agent_factories[kind]()
+        await agent.start()
+        return agent
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
     async def initialize_pool(self):
-        if self.initialized:
-            return
-        
-        logger.info(f"[POOL] Cold-starting {self.pool_size} text and image agents...")
-
-        for i in range(self.pool_size):
-            agent = YahooSearchAgentText()
-            await agent.start()
-            self.text_agents.append(agent)
-            self.text_agent_tabs.append(0)
-            logger.info(f"[POOL] Text agent {i} ready for cold start (max {self.max_tabs_per_agent} tabs)")
-        
-        for i in range(self.pool_size):
-            agent = YahooSearchAgentImage()
-            await agent.start()
-            self.image_agents.append(agent)
-            self.image_agent_tabs.append(0)
-            logger.info(f"[POOL] Image agent {i} ready for cold start (max {self.max_tabs_per_agent} tabs)")
-        
-        self.initialized = True
-        logger.info(f"[POOL] Cold start complete - agents ready for immediate use")
-    
-    async def get_text_agent(self):
         async with self.lock:
-            min_tabs = min(self.text_agent_tabs)
-            agent_idx = self.text_agent_tabs.index(min_tabs)
-            
-            if self.text_agent_tabs[agent_idx] >= self.max_tabs_per_agent:
-                logger.info(f"[POOL] Restarting text agent {agent_idx} after {self.text_agent_tabs[agent_idx]} tabs")
-                try:
-                    await self.text_agents[agent_idx].close()
-                except Exception as e:
-                    logger.error(f"[POOL] Error closing old text agent: {e}")
-                
-                new_agent = YahooSearchAgentText()
-                await new_agent.start()
-                self.text_agents[agent_idx] = new_agent
-                self.text_agent_tabs[agent_idx] = 0
-                logger.info(f"[POOL] Text agent {agent_idx} restarted and ready")
-
-            logger.info(f"[POOL] Using text agent {agent_idx} (will open tab #{self.text_agent_tabs[agent_idx] + 1})")
-            return self.text_agents[agent_idx], agent_idx
-    
-    async def get_image_agent(self):
-        async with self.lock:
-            min_tabs = min(self.image_agent_tabs)
-            agent_idx = self.image_agent_tabs.index(min_tabs)
-            
-            if self.image_agent_tabs[agent_idx] >= self.max_tabs_per_agent:
-                logger.info(f"[POOL] Restarting image agent {agent_idx} after {self.image_agent_tabs[agent_idx]} tabs")
-                try:
-                    await self.image_agents[agent_idx].close()
-                except Exception as e:
-                    logger.error(f"[POOL] Error closing old image agent: {e}")
-                
-                new_agent = YahooSearchAgentImage()
-                await new_agent.start()
-                self.image_agents[agent_idx] = new_agent
-                self.image_agent_tabs[agent_idx] = 0
-                logger.info(f"[POOL] Image agent {agent_idx} restarted and ready")
-            
-            logger.info(f"[POOL] Using image agent {agent_idx} (will open tab #{self.image_agent_tabs[agent_idx] + 1})")
-            return self.image_agents[agent_idx], agent_idx
-    
-    def increment_tab_count(self, agent_type: str, agent_idx: int):
-        if agent_type == "text":
-            self.text_agent_tabs[agent_idx] += 1
-            logger.info(f"[POOL] Text agent {agent_idx} now has {self.text_agent_tabs[agent_idx]} tabs")
-        elif agent_type == "image":
-            self.image_agent_tabs[agent_idx] += 1
-            logger.info(f"[POOL] Image agent {agent_idx} now has {self.image_agent_tabs[agent_idx]} tabs")
-    
+            if self.initialized:
+                return
+            logger.info(f"[POOL] Cold-starting {self.pool_size} text and image agents ({self.max_concurrent_tabs} concurrent tabs each)...")
+            for kind in ("text", "image"):
+                agents = await asyncio.gather(*[self._start_agent(kind) for _ in range(self.pool_size)])
+                self.slots[kind] = [_AgentSlot(agent, i, self.max_concurrent_tabs) for i, agent in enumerate(agents)]
+                self._admission[kind] = asyncio.Semaphore(self.pool_size * self.max_concurrent_tabs)
+                self._ensure_standby(kind)
+                logger.info(f"[POOL] {len(agents)} {kind} agent(s) ready (max {self.max_tabs_per_agent} tabs per agent)")
+            self.initialized = True
+            logger.info(f"[POOL] Cold start complete - agents ready for immediate use")
+
+    def _ensure_standby(self, kind: str):
+        if self.standby[kind] is not None:
+            return
+        task = self._standby_tasks.get(kind)
+        if task is not None and not task.done():
+            return
+
+        async def _warm():
+            try:
+                self.standby[kind] = await self._start_agent(kind)
+                logger.info(f"[POOL] Warm standby {kind} agent ready")
+                for slot in self.slots[kind]:
+                    if slot.tabs_used >= self.max_tabs_per_agent and not slot.rotating:
+                        self._rotate(kind, slot)
+                        break
+            except Exception as e:
+                logger.error(f"[POOL] Failed to warm standby {kind} agent: {e}")
+
+        self._standby_tasks[kind] = self._spawn(_warm())
+
+    def _rotate(self, kind: str, slot: _AgentSlot):
+        standby = self.standby[kind]
+        if standby is None:
+            self._ensure_standby(kind)
+            return
+        self.standby[kind] = None
+        slot.rotating = True
+        replacement = _AgentSlot(standby, slot.index, self.max_concurrent_tabs)
+        self.slots[kind][slot.index] = replacement
+        self.restarts[kind] += 1
+        logger.info(f"[POOL] Swapped {kind} agent {slot.index} for warm standby after {slot.tabs_used} tabs")
+        self._spawn(self._retire(kind, slot))
+        self._ensure_standby(kind)
+
+    async def _retire(self, kind: str, slot: _AgentSlot):
+        while slot.active > 0:
+            await asyncio.sleep(0.1)
+        try:
+            await slot.agent.close()
+        except Exception as e:
+            logger.error(f"[POOL] Error closing retired {kind} agent {slot.index}: {e}")
+
+    @asynccontextmanager
+    async def lease(self, kind: str):
+        if not self.initialized:
+            logger.info(f"[POOL] Agent pool not initialized, initializing for {kind} lease...")
+            await self.initialize_pool()
+        admission = self._admission[kind]
+        self._waiting[kind] += 1
+        try:
+            await admission.acquire()
+        finally:
+            self._waiting[kind] -= 1
+        slot = None
+        try:
+            slot = min(
+                (s for s in self.slots[kind] if s.active < s.max_concurrent_tabs),
+                key=lambda s: (s.active, s.tabs_used)
+            )
+            slot.active += 1
+            slot.tabs_used += 1
+            if slot.tabs_used >= self.max_tabs_per_agent:
+                self._rotate(kind, slot)
+            logger.info(f"[POOL] Leased {kind} agent {slot.index} (tab #{slot.tabs_used}, {slot.active} active)")
+            yield slot.agent
+        finally:
+            if slot is not None:
+                slot.active -= 1
+            admission.release()
+
+    async def close_all(self):
+        for task in list(self._background_tasks):
+            task.cancel()
+        agents = [slot.agent for kind in self.slots for slot in self.slots[kind]]
+        agents += [agent for agent in self.standby.values() if agent is not None]
+        for agent in agents:
+            try:
+                await agent.close()
+            except Exception as e:
+                logger.warning(f"[SHUTDOWN] Error closing agent: {e}")
+        self.slots = {"text": [], "image": []}
+        self.standby = {"text": None, "image": None}
+        self.initialized = False
+
     async def get_status(self):
-        async with self.lock:
-            return {
-                "initialized": self.initialized,
-                "pool_size": self.pool_size,
-                "max_tabs_per_agent": self.max_tabs_per_agent,
-                "text_agents": {
-                    "count": len(self.text_agents),
-                    "tabs": self.text_agent_tabs.copy()
-                },
-                "image_agents": {
-                    "count": len(self.image_agents),
-                    "tabs": self.image_agent_tabs.copy()
+        return {
+            "initialized": self.initialized,
+            "pool_size": self.pool_size,
+            "max_tabs_per_agent": self.max_tabs_per_agent,
+            "max_concurrent_tabs": self.max_concurrent_tabs,
+            "serp_metrics": {mode: stats.summary() for mode, stats in serp_metrics.items()},
+            **{
+                f"{kind}_agents": {
+                    "count": len(slots),
+                    "tabs": [slot.tabs_used for slot in slots],
+                    "active_tabs": [slot.active for slot in slots],
+                    "waiting": self._waiting[kind],
+                    "standby_ready": self.standby[kind] is not None,
+                    "restarts": self.restarts[kind],
                 }
+                for kind, slots in self.slots.items()
             }
+        }
 
 
 class YahooSearchAgentText:
+    SEARCH_URL = "https://search.yahoo.com/search?p={query}&fr=yfp-t&fr2=p%3Afp%2Cm%3Asb&fp=1"
+
     def __init__(self, custom_port=None):
         self.playwright = None
         self.context = None
@@ -238,7 +366,16 @@ class YahooSearchAgentText:
                 port_manager.release_port(self.custom_port)
             raise
 
-    async def search(self, query, max_links=MAX_LINKS_TO_TAKE, agent_idx=None):
+    async def search(self, query, max_links=MAX_LINKS_TO_TAKE, mode=SEARCH_SERP_MODE):
+        if mode == "fast":
+            results = await self._search_serp(query, max_links, fast=True)
+            if results:
+                return results
+            serp_metrics["fast"].fallbacks += 1
+            logger.warning(f"[SEARCH] Fast SERP returned no links for '{query[:LOG_MESSAGE_QUERY_TRUNCATE]}...', retrying in human mode")
+        return await self._search_serp(query, max_links, fast=False)
+
+    async def _search_serp(self, query, max_links, fast):
         blacklist = [
             "yahoo.com/preferences",
             "yahoo.com/account",
@@ -247,20 +384,34 @@ class YahooSearchAgentText:
         ]
         results = []
         page = None
+        mode = "fast" if fast else "human"
+        bytes_tasks = []
+        started = time.perf_counter()
         try:
             self.tab_count += 1
-            logger.info(f"[SEARCH] Opening tab #{self.tab_count} on port {self.custom_port} for query: '{query[:LOG_MESSAGE_QUERY_TRUNCATE]}...'")
+            logger.info(f"[SEARCH] Opening {mode} tab #{self.tab_count} on port {self.custom_port} for query: '{query[:LOG_MESSAGE_QUERY_TRUNCATE]}...'")
             
             page = await self.context.new_page()
-            search_url = f"https://search.yahoo.com/search?p={quote(query)}&fr=yfp-t&fr2=p%3Afp%2Cm%3Asb&fp=1"
-            await page.goto(search_url, timeout=50000)
+            search_url = self.SEARCH_URL.format(query=quote(query))
+            page.on("requestfinished", lambda req: bytes_tasks.append(asyncio.ensure_future(req.sizes())))
 
-            await handle_accept_popup(page)
+            if fast:
+                await page.route("**/*", _fast_serp_router(search_url))
+                await page.goto(search_url, timeout=SEARCH_FAST_TIMEOUT_MS, wait_until="domcontentloaded")
+                try:
+                    await page.wait_for_selector("div.compTitle > a", timeout=SEARCH_FAST_TIMEOUT_MS)
+                except Exception:
+                    await handle_accept_popup(page)
+                    await page.wait_for_selector("div.compTitle > a", timeout=SEARCH_FAST_TIMEOUT_MS)
+            else:
+                await page.goto(search_url, timeout=50000)
 
-            await page.mouse.move(random.randint(100, 500), random.randint(100, 500))
-            await page.wait_for_timeout(random.randint(1000, 2000))
+                await handle_accept_popup(page)
+
+                await page.mouse.move(random.randint(100, 500), random.randint(100, 500))
+                await page.wait_for_timeout(random.randint(1000, 2000))
 
-            await page.wait_for_selector("div.compTitle > a", timeout=55000)
+                await page.wait_for_selector("div.compTitle > a", timeout=55000)
 
             link_elements = await page.query_selector_all("div.compTitle > a")
             for link in link_elements:
@@ -271,13 +422,16 @@ class YahooSearchAgentText:
                     results.append(href)
 
             logger.info(f"[SEARCH] Tab #{self.tab_count} returned {len(results)} results for '{query[:LOG_MESSAGE_QUERY_TRUNCATE]}...' on port {self.custom_port}")
-            
-            if agent_idx is not None:
-                agent_pool.increment_tab_count("text", agent_idx)
-        
+
         except Exception as e:
             logger.error(f"❌ Yahoo search failed on tab #{self.tab_count}, port {self.custom_port}: {e}")
         finally:
+            time_to_links = time.perf_counter() - started
+            transferred = 0
+            for sizes in await asyncio.gather(*bytes_tasks, return_exceptions=True):
+                if isinstance(sizes, dict):
+                    transferred += sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+            serp_metrics[mode].record(time_to_links, transferred, bool(results))
             if page:
                 try:
                     await page.close()
@@ -287,7 +441,7 @@ class YahooSearchAgentText:
         
         return results
 
-    async def youtube_transcript_url(self, url, agent_idx=None):
+    async def youtube_transcript_url(self, url):
         page = None
         try:
             self.tab_count += 1
@@ -322,9 +476,7 @@ class YahooSearchAgentText:
             await page.wait_for_timeout(6000)
             logger.info(f"[SEARCH] Tab #{self.tab_count} has found transcript fetch url of  the video url {url}  on port {self.custom_port}")
             
-            if agent_idx is not None:
-                agent_pool.increment_tab_count("text", agent_idx)
-        
+
         except Exception as e:
             logger.error(f"❌ Yahoo search failed on tab #{self.tab_count}, port {self.custom_port}: {e}")
         finally:
@@ -337,7 +489,7 @@ class YahooSearchAgentText:
         
         return transcript_url
 
-    async def youtube_metadata(self, url, agent_idx=None):
+    async def youtube_metadata(self, url):
         blacklist = [
             "yahoo.com/preferences",
             "yahoo.com/account",
@@ -370,9 +522,7 @@ class YahooSearchAgentText:
 
             logger.info(f"[SEARCH] Tab #{self.tab_count} has found video with the url {url}  on port {self.custom_port}")
             
-            if agent_idx is not None:
-                agent_pool.increment_tab_count("text", agent_idx)
-        
+
         except Exception as e:
             logger.error(f"❌ Yahoo search failed on tab #{self.tab_count}, port {self.custom_port}: {e}")
         finally:
@@ -406,6 +556,8 @@ class YahooSearchAgentText:
 
 
 class YahooSearchAgentImage:
+    SEARCH_URL = "https://images.search.yahoo.com/search/images?p={query}"
+
     def __init__(self, custom_port=None):
         self.playwright = None
         self.context = None
@@ -454,7 +606,7 @@ class YahooSearchAgentImage:
                 port_manager.release_port(self.custom_port)
             raise
 
-    async def search_images(self, query, max_images=MAX_IMAGES_TO_INCLUDE, agent_idx=None):
+    async def search_images(self, query, max_images=MAX_IMAGES_TO_INCLUDE):
         results = []
         os.makedirs(self.save_dir, exist_ok=True)
         page = None
@@ -463,7 +615,7 @@ class YahooSearchAgentImage:
             logger.info(f"[IMAGE-SEARCH] Opening tab #{self.tab_count} on port {self.custom_port} for query: '{query[:LOG_MESSAGE_QUERY_TRUNCATE]}...'")
             
             page = await self.context.new_page()
-            search_url = f"https://images.search.yahoo.com/search/images?p={quote(query)}"
+            search_url = self.SEARCH_URL.format(query=quote(query))
             print(f"[IMAGE SEARCH] Navigating to: {search_url}")
             await page.goto(search_url, timeout=50000)
             
@@ -556,61 +708,34 @@ class accessSearchAgents:
         }
     
     async def _async_web_search(self, query):
-        if not agent_pool.initialized:
-            logger.info("[accessSearchAgents] Agent pool not initialized, initializing now...")
-            await agent_pool.initialize_pool()
-        
-        agent, agent_idx = await agent_pool.get_text_agent()
-        results = await agent.search(query, max_links=MAX_LINKS_TO_TAKE, agent_idx=agent_idx)
-        return results
+        async def _fetch():
+            async with agent_pool.lease("text") as agent:
+                return await agent.search(query, max_links=MAX_LINKS_TO_TAKE)
+        return await search_result_cache.get_or_fetch("web", query, _fetch)
     
     async def _async_get_youtube_metadata(self, url):
-        if not agent_pool.initialized:
-            logger.info("[accessSearchAgents] Agent pool not initialized, initializing for YouTube metadata...")
-            await agent_pool.initialize_pool()
-        
-        agent, agent_idx = await agent_pool.get_text_agent()
-        results = await agent.youtube_metadata(url, agent_idx=agent_idx)
-        return results
+        async with agent_pool.lease("text") as agent:
+            return await agent.youtube_metadata(url)
     
     async def _async_get_youtube_transcript_url(self, url):
-        if not agent_pool.initialized:
-            logger.info("[accessSearchAgents] Agent pool not initialized, initializing for YouTube transcript...")
-            await agent_pool.initialize_pool()
-        
-        agent, agent_idx = await agent_pool.get_text_agent()
-        results = await agent.youtube_transcript_url(url, agent_idx=agent_idx)
-        return results
+        async with agent_pool.lease("text") as agent:
+            return await agent.youtube_transcript_url(url)
     
     async def _async_image_search(self, query, max_images=10):
-        if not agent_pool.initialized:
-            logger.info("[accessSearchAgents] Agent pool not initialized, initializing for image search...")
-            await agent_pool.initialize_pool()
-        
-        agent, agent_idx = await agent_pool.get_image_agent()
-        results = await agent.search_images(query, max_images, agent_idx=agent_idx)
-        if results:
-            return json.dumps({f"yahoo_source_{i}": [url] for i, url in enumerate(results)})
-        else:
-            return json.dumps({})
+        async def _fetch():
+            async with agent_pool.lease("image") as agent:
+                results = await agent.search_images(query, max_images)
+            if results:
+                return json.dumps({f"yahoo_source_{i}": [url] for i, url in enumerate(results)})
+            else:
+                return json.dumps({})
+        return await search_result_cache.get_or_fetch(f"image:{max_images}", query, _fetch, cacheable=lambda value: value != "{}")
     
     async def _async_get_agent_pool_status(self):
         return await agent_pool.get_status()
 
-    def web_search(self, query):
-        return run_async_on_bg_loop(self._async_web_search(query))
-    
-    def get_youtube_metadata(self, url):
-        return run_async_on_bg_loop(self._async_get_youtube_metadata(url))
-    
-    def image_search(self, query, max_images=10):
-        return run_async_on_bg_loop(self._async_image_search(query, max_images))
-    
-    def get_transcript_url(self, url):
-        return run_async_on_bg_loop(self._async_get_youtube_transcript_url(url))
-    
-    def get_agent_pool_status(self):
-        return run_async_on_bg_loop(self._async_get_agent_pool_status())
+    async def _async_get_search_cache_stats(self):
+        return search_result_cache.get_stats()
 
 
 def get_port_status():
@@ -651,23 +776,7 @@ def run_async_on_bg_loop(coro):
 
 
 async def _close_all_agents():
-    text_agents = list(agent_pool.text_agents)
-    image_agents = list(agent_pool.image_agents)
-    for a in text_agents:
-        try:
-            await a.close()
-        except Exception as e:
-            logger.warning(f"[SHUTDOWN] Error closing text agent: {e}")
-    for a in image_agents:
-        try:
-            await a.close()
-        except Exception as e:
-            logger.warning(f"[SHUTDOWN] Error closing image agent: {e}")
-    agent_pool.text_agents.clear()
-    agent_pool.image_agents.clear()
-    agent_pool.text_agent_tabs.clear()
-    agent_pool.image_agent_tabs.clear()
-    agent_pool.initialized = False
+    await agent_pool.close_all()
 
 
 def shutdown_graceful(timeout=5):
@@ -710,5 +819,6 @@ atexit.register(shutdown_graceful)
 
 
 port_manager = searchPortManager(start_port=10000, end_port=19999)
-agent_pool = SearchAgentPool(pool_size=1, max_tabs_per_agent=20)
+search_result_cache = SearchResultCache()
+agent_pool = SearchAgentPool(pool_size=MODEL_POOL_SIZE, max_tabs_per_agent=MODEL_MAX_TABS, max_concurrent_tabs=SEARCH_AGENT_CONCURRENT_TABS)
 
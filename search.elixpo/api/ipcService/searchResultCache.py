@@ -0,0 +1,113 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from loguru import logger
+from pipeline.config import SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_STALE_SECONDS, SEARCH_CACHE_MAX_ENTRIES
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WS_RE.sub(" ", query.strip().lower()).strip(" ?!.")
+
+
+class SearchResultCache:
+    """Cross-request TTL/LRU cache for browser search results.
+
+    Lives on the IPC background loop. Entries younger than ``ttl_seconds``
+    are served as-is; entries up to ``stale_seconds`` past that are served
+    while one background refresh runs. Concurrent misses for the same key
+    share a single in-flight fetch.
+    """
+
+    def __init__(self, ttl_seconds: int = SEARCH_CACHE_TTL_SECONDS, stale_seconds: int = SEARCH_CACHE_STALE_SECONDS,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.saved_seconds = 0.0
+
+    async def get_or_fetch(self, namespace: str, query: str, fetch: Callable[[], Awaitable[Any]],
+                           cacheable: Callable[[Any], bool] = bool) -> Any:
+        key = (namespace, normalize_query(query))
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            value, fetched_at, fetch_seconds = entry
+            age = now - fetched_at
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self.saved_seconds += fetch_seconds
+                if age < self.ttl_seconds:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self.refreshes += 1
+                        self._start_fetch(key, fetch, cacheable)
+                logger.debug(f"[SearchCache] {'HIT' if age < self.ttl_seconds else 'STALE'} {namespace}:{key[1][:60]}")
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            started = time.perf_counter()
+            value = await asyncio.shield(task)
+            self.saved_seconds += max(0.0, self._fetch_seconds(key) - (time.perf_counter() - started))
+            return value
+
+        self.misses += 1
+        return await asyncio.shield(self._start_fetch(key, fetch, cacheable))
+
+    def _fetch_seconds(self, key) -> float:
+        entry = self._entries.get(key)
+        return entry[2] if entry else 0.0
+
+    def _start_fetch(self, key, fetch, cacheable) -> asyncio.Task:
+        async def _run():
+            started = time.perf_counter()
+            try:
+                value = await fetch()
+                if cacheable(value):
+                    self._entries[key] = (value, time.time(), time.perf_counter() - started)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        def _log_failure(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"[SearchCache] Fetch failed for {key[0]}:{key[1][:60]}: {task.exception()}")
+
+        task = asyncio.ensure_future(_run())
+        task.add_done_callback(_log_failure)
+        self._inflight[key] = task
+        return task
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced_waiters": self.coalesced,
+            "background_refreshes": self.refreshes,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self.hits + self.stale_hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+        }
@@ -4,18 +4,52 @@ MAX_IMAGES_TO_INCLUDE = 10
 MAX_LINKS_TO_TAKE = 6
 MIN_LINKS_TO_TAKE = 3
 AUDIO_TRANSCRIBE_SIZE = "small"
+TRANSCRIBE_WORKERS = 0
+TRANSCRIBE_CHUNK_SECONDS = 60
+TRANSCRIBE_MAX_CHUNK_SECONDS = 90
+TRANSCRIBE_MIN_SILENCE_SECONDS = 0.3
 BASE_CACHE_DIR = "./data/audio_cache"
+AUDIO_CACHE_FORMAT = "opus"
+AUDIO_CACHE_BITRATE = "24k"
+AUDIO_CACHE_MAX_BYTES = 1_000_000_000
+TRANSCRIPT_STORE_PATH = "./data/cache/transcripts.db"
+TRANSCRIPT_CAPTION_TIMEOUT_SECONDS = 90
+TRANSCRIPT_AUDIO_PREFETCH_AFTER_SECONDS = 3
+
+FETCH_MAX_CONCURRENCY = 20
+FETCH_PER_HOST_CONCURRENCY = 4
+FETCH_TIMEOUT_SECONDS = 10
+FETCH_MAX_BYTES = 2_000_000
+FETCH_WORD_HEADROOM = 2
+FETCH_DEADLINE_SECONDS = 12
+FETCH_TOOL_GRACE_SECONDS = 3
+HTML_EXTRACTOR_BACKEND = "selectolax"
 
 isHeadless = True
 POLLINATIONS_ENDPOINT = "https://gen.pollinations.ai/v1/chat/completions"
 
 MAX_SESSIONS = 1000
 SESSION_TTL_MINUTES = 30
+SESSION_INDEX_SPILL_DIR = "./data/session_index"
+SESSION_INDEX_SPILL_IDLE_MINUTES = 10
+SESSION_REAPER_INTERVAL_SECONDS = 60
+SESSION_MEMORY_BUDGET_BYTES = 512 * 1024 * 1024
+SESSION_SNAPSHOT_DIR = "./data/sessions"
 
 RAG_CONTEXT_REFRESH = True
 
 MODEL_POOL_SIZE = 1
 MODEL_MAX_TABS = 20
+SEARCH_AGENT_CONCURRENT_TABS = 4
+SEARCH_SERP_MODE = "fast"
+SEARCH_FAST_TIMEOUT_MS = 15000
+SEARCH_CACHE_TTL_SECONDS = 900
+SEARCH_CACHE_STALE_SECONDS = 3600
+SEARCH_CACHE_MAX_ENTRIES = 2048
+IPC_SOCKET_PATH = "/tmp/lixsearch-ipc.sock"
+IPC_RPC_POOL_SIZE = 4
+IPC_RPC_TIMEOUT_SECONDS = 60
+IPC_RPC_EXECUTOR_WORKERS = 16
 MODEL_CACHE_CLEANUP_MINUTES = 30
 MODEL_CACHE_MAX_AGE_MINUTES = 60
 
@@ -23,6 +57,13 @@ LLM_MODEL = "gemini-fast"
 LLM_MAX_TOKENS = 3000
 LLM_TEMPERATURE = 0.7
 LLM_TOP_P = 1.0
+LLM_STREAM_RESPONSES = True
+LLM_STREAM_READ_TIMEOUT = 60
+LLM_STREAM_PROBE_CHARS = 200
+LLM_MAX_CONCURRENCY = 16
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF_SECONDS = 0.5
+LLM_CONNECT_TIMEOUT = 10
 
 SEARCH_MAX_RESULTS = 8
 YOUTUBE_MAX_VIDEOS = 2
@@ -46,6 +87,11 @@ EMBEDDINGS_DIR = "./data/embeddings"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384
 EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_BATCH_MAX_WAIT_MS = 5
+EMBEDDING_BATCH_MAX_TEXTS = 64
+EMBEDDING_QUEUE_MAX_DEPTH = 1024
+EMBEDDING_MEMO_TTL_SECONDS = 120
+EMBEDDING_MEMO_MAX_ENTRIES = 2048
 
 CHUNK_SIZE = 600
 CHUNK_OVERLAP = 60
@@ -53,12 +99,32 @@ CHUNK_OVERLAP = 60
 SEMANTIC_CACHE_DIR = "./data/cache"
 SEMANTIC_CACHE_TTL_SECONDS = 3600
 SEMANTIC_CACHE_SIMILARITY_THRESHOLD = 0.90
+SEMANTIC_CACHE_COMPACTION_INTERVAL = 600
+
+URL_CONTENT_CACHE_TTL_SECONDS = 600
+URL_CONTENT_CACHE_MAX_ENTRIES = 512
+
 X_REQ_ID_SLICE_SIZE = 12
 
 RETRIEVAL_TOP_K = 5
+RAG_HYBRID_CANDIDATES = 20
+RAG_RRF_K = 60
+RAG_BM25_MAX_DF_RATIO = 0.25
+RAG_RETRIEVAL_BUDGET_MS = 150
+RAG_RERANK_ENABLED = False
+RAG_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RAG_RERANK_TOP_N = 20
 SESSION_SUMMARY_THRESHOLD = 6
 
 PERSIST_VECTOR_STORE_INTERVAL = 300
+VECTOR_STORE_URL_TTL_SECONDS = 21600
+VECTOR_STORE_WRITE_COALESCE_MS = 20
+VECTOR_STORE_WRITE_MAX_CHUNKS = 512
+VECTOR_STORE_MAX_AGE_SECONDS = 604800
+VECTOR_STORE_MAX_CHUNKS = 200000
+VECTOR_STORE_COMPACTION_BATCH = 500
+VECTOR_STORE_MAINTENANCE_BUDGET_SECONDS = 30
+VECTOR_STORE_SIZE_HISTORY = 288
 
 CONVERSATION_CACHE_DIR = "./data/cache/conversation"
 CACHE_WINDOW_SIZE = 10
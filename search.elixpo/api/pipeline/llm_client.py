@@ -0,0 +1,353 @@
+import os
+import json
+import time
+import random
+import asyncio
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import httpx
+from loguru import logger
+from pipeline.config import (POLLINATIONS_ENDPOINT, LLM_STREAM_READ_TIMEOUT, LLM_STREAM_PROBE_CHARS, LLM_MAX_CONCURRENCY,
+                             LLM_MAX_RETRIES, LLM_RETRY_BACKOFF_SECONDS, LLM_CONNECT_TIMEOUT)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError, httpx.PoolTimeout)
+
+
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield the data payload of each server-sent event, joining multi-line data fields."""
+    data_lines: List[str] = []
+    async for line in lines:
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+class ToolCallAccumulator:
+    """Merges streamed ``delta.tool_calls`` fragments into complete OpenAI tool calls."""
+
+    def __init__(self):
+        self._calls: Dict[int, Dict] = {}
+        self._last_index = -1
+
+    def __bool__(self) -> bool:
+        return bool(self._calls)
+
+    def feed(self, deltas: List[Dict]) -> None:
+        for delta in deltas:
+            index = delta.get("index")
+            if index is None:
+                # Some upstreams send whole calls without an index; a new id starts a new call
+                last = self._calls.get(self._last_index)
+                starts_new = last is None or (delta.get("id") and delta["id"] != last["id"])
+                index = self._last_index + 1 if starts_new else self._last_index
+            self._last_index = max(self._last_index, index)
+            call = self._calls.setdefault(index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+            if delta.get("id"):
+                call["id"] = delta["id"]
+            if delta.get("type"):
+                call["type"] = delta["type"]
+            function = delta.get("function") or {}
+            if function.get("name"):
+                call["function"]["name"] += function["name"]
+            if function.get("arguments"):
+                call["function"]["arguments"] += function["arguments"]
+
+    def tool_calls(self) -> List[Dict]:
+        return [self._calls[i] for i in sorted(self._calls)]
+
+
+class ChatCompletionStream:
+    """Streams one chat completion; iterate for content deltas, then read ``message``.
+
+    ``deadline`` bounds the whole response, ``read_timeout`` the gap between chunks.
+    Failures before the first delta are retried by the owning :class:`LLMClient`.
+    """
+
+    def __init__(self, llm: "LLMClient", payload: Dict, deadline: float, read_timeout: float = LLM_STREAM_READ_TIMEOUT):
+        self.llm = llm
+        self.payload = {**payload, "stream": True}
+        self.deadline = deadline
+        self.read_timeout = read_timeout
+        self.content: List[str] = []
+        self.reasoning: List[str] = []
+        self.tool_calls = ToolCallAccumulator()
+        self.finish_reason: Optional[str] = None
+        self.ttft: Optional[float] = None
+        self.elapsed: Optional[float] = None
+
+    @property
+    def message(self) -> Dict:
+        message = {"role": "assistant", "content": "".join(self.content)}
+        if self.reasoning:
+            message["reasoning_content"] = "".join(self.reasoning)
+        if self.tool_calls:
+            message["tool_calls"] = self.tool_calls.tool_calls()
+        return message
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        llm = self.llm
+        started = time.perf_counter()
+        stop_at = time.monotonic() + self.deadline
+        timeout = httpx.Timeout(self.read_timeout, connect=min(self.read_timeout, LLM_CONNECT_TIMEOUT))
+        async with llm.slot():
+            try:
+                for attempt in range(llm.max_retries + 1):
+                    try:
+                        async with llm.http.stream("POST", llm.endpoint, json=self.payload, headers=llm.headers(), timeout=timeout) as response:
+                            if response.status_code >= 400:
+                                await response.aread()
+                                if response.status_code in RETRYABLE_STATUS and attempt < llm.max_retries:
+                                    await llm.backoff(attempt, response, stop_at)
+                                    continue
+                                response.raise_for_status()
+                            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                                # Upstream ignored stream=True and answered in one JSON body
+                                await response.aread()
+                                choice = response.json()["choices"][0]
+                                self._apply(choice.get("message") or {}, choice.get("finish_reason"))
+                                self.ttft = time.perf_counter() - started
+                                if self.content:
+                                    yield "".join(self.content)
+                                break
+                            async for data in iter_sse_data(response.aiter_lines()):
+                                if time.monotonic() > stop_at:
+                                    raise asyncio.TimeoutError(f"LLM stream exceeded {self.deadline}s deadline")
+                                if data == "[DONE]":
+                                    break
+                                try:
+                                    chunk = json.loads(data)
+                                except json.JSONDecodeError:
+                                    logger.warning(f"[LLM] Skipping malformed stream chunk: {data[:100]}")
+                                    continue
+                                for choice in chunk.get("choices") or []:
+                                    text = self._apply(choice.get("delta") or {}, choice.get("finish_reason"))
+                                    if text:
+                                        if self.ttft is None:
+                                            self.ttft = time.perf_counter() - started
+                                        yield text
+                            break
+                    except RETRYABLE_ERRORS as e:
+                        # Only safe to retry while nothing has reached the caller
+                        if self.ttft is not None or self.tool_calls or attempt >= llm.max_retries:
+                            raise
+                        logger.warning(f"[LLM] Stream attempt {attempt + 1} failed: {type(e).__name__}: {e}")
+                        await llm.backoff(attempt, None, stop_at)
+            except BaseException as e:
+                llm.record_error(e)
+                raise
+        self.elapsed = time.perf_counter() - started
+        llm.record_latency(self.elapsed, self.ttft)
+
+    def _apply(self, delta: Dict, finish_reason: Optional[str]) -> str:
+        if finish_reason:
+            self.finish_reason = finish_reason
+        if delta.get("tool_calls"):
+            self.tool_calls.feed(delta["tool_calls"])
+        if delta.get("reasoning_content"):
+            self.reasoning.append(delta["reasoning_content"])
+        text = delta.get("content") or ""
+        if text:
+            self.content.append(text)
+        return text
+
+
+class StreamGate:
+    """Holds back the first ``probe_chars`` of a stream until ``reject`` has seen them.
+
+    Once the probe passes, buffered and later text flows through; if it fails, or
+    tool calls start arriving, nothing more is released and the caller falls back
+    to sending the finished message in one piece.
+    """
+
+    def __init__(self, reject: Callable[[str], bool], probe_chars: int = LLM_STREAM_PROBE_CHARS):
+        self.reject = reject
+        self.probe_chars = probe_chars
+        self.released = ""
+        self._buffer = ""
+        self._state = "probing"
+
+    @property
+    def closed(self) -> bool:
+        return self._state == "closed"
+
+    def feed(self, text: str, tool_calls_seen: bool = False) -> str:
+        if self._state == "closed":
+            return ""
+        if tool_calls_seen:
+            self._state = "closed"
+            return ""
+        if self._state == "open":
+            self.released += text
+            return text
+        self._buffer += text
+        if len(self._buffer) < self.probe_chars:
+            return ""
+        if self.reject(self._buffer):
+            self._state = "closed"
+            return ""
+        self._state = "open"
+        out, self._buffer = self._buffer, ""
+        self.released += out
+        return out
+
+
+class LLMClient:
+    """Shared Pollinations client: pooled HTTP/2 connections, bounded concurrency,
+    jittered retries on transient failures, and latency/in-flight metrics."""
+
+    def __init__(self, endpoint: str = POLLINATIONS_ENDPOINT, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 max_retries: int = LLM_MAX_RETRIES, backoff_seconds: float = LLM_RETRY_BACKOFF_SECONDS):
+        self.endpoint = endpoint
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_concurrency = max_concurrency
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.http = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_concurrency * 2, max_keepalive_connections=max_concurrency, keepalive_expiry=60.0),
+        )
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.retries = 0
+        self.errors: Dict[str, int] = {}
+        self._latencies: deque = deque(maxlen=1024)
+        self._ttfts: deque = deque(maxlen=1024)
+
+    @staticmethod
+    def headers() -> Dict:
+        return {"Content-Type": "application/json", "Authorization": f"Bearer {os.getenv('TOKEN')}"}
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    async def backoff(self, attempt: int, response: Optional[httpx.Response], stop_at: float) -> None:
+        self.retries += 1
+        delay = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        remaining = stop_at - time.monotonic()
+        if delay >= remaining:
+            raise asyncio.TimeoutError("No time left to retry LLM request")
+        status = response.status_code if response is not None else "transport error"
+        logger.warning(f"[LLM] Retrying after {status} in {delay:.2f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+        await asyncio.sleep(delay)
+
+    def record_latency(self, seconds: float, ttft: Optional[float] = None) -> None:
+        self._latencies.append(seconds)
+        if ttft is not None:
+            self._ttfts.append(ttft)
+
+    def record_error(self, error: BaseException) -> None:
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            return
+        if isinstance(error, httpx.HTTPStatusError):
+            kind = f"http_{error.response.status_code}"
+        else:
+            kind = type(error).__name__
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    async def complete(self, payload: Dict, timeout: float, endpoint: Optional[str] = None) -> Dict:
+        """POST a non-streaming chat completion and return the decoded JSON body."""
+        started = time.perf_counter()
+        stop_at = time.monotonic() + timeout
+        async with self.slot():
+            try:
+                for attempt in range(self.max_retries + 1):
+                    remaining = stop_at - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError(f"LLM request exceeded {timeout}s")
+                    try:
+                        response = await asyncio.wait_for(
+                            self.http.post(endpoint or self.endpoint, json={**payload, "stream": False}, headers=self.headers(),
+                                           timeout=httpx.Timeout(remaining, connect=min(remaining, LLM_CONNECT_TIMEOUT))),
+                            timeout=remaining,
+                        )
+                    except RETRYABLE_ERRORS as e:
+                        if attempt >= self.max_retries:
+                            raise
+                        logger.warning(f"[LLM] Attempt {attempt + 1} failed: {type(e).__name__}: {e}")
+                        await self.backoff(attempt, None, stop_at)
+                        continue
+                    if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                        await self.backoff(attempt, response, stop_at)
+                        continue
+                    response.raise_for_status()
+                    data = response.json()
+                    self.record_latency(time.perf_counter() - started)
+                    return data
+            except BaseException as e:
+                self.record_error(e)
+                raise
+
+    def stream(self, payload: Dict, deadline: float) -> ChatCompletionStream:
+        return ChatCompletionStream(self, payload, deadline)
+
+    async def fetch_bytes(self, url: str, timeout: float = LLM_CONNECT_TIMEOUT * 2) -> bytes:
+        """Download a small asset (e.g. an image for a vision prompt) over the pooled connections."""
+        response = await self.http.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+
+    def get_stats(self) -> Dict:
+        def pct(values, q):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "latency_p50_s": pct(self._latencies, 0.5),
+            "latency_p95_s": pct(self._latencies, 0.95),
+            "latency_p99_s": pct(self._latencies, 0.99),
+            "ttft_p50_s": pct(self._ttfts, 0.5),
+            "ttft_p99_s": pct(self._ttfts, 0.99),
+        }
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMClient]" = weakref.WeakKeyDictionary()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the LLM client bound to the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = LLMClient()
+        _clients[loop] = client
+    return client
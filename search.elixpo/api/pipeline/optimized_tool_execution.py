@@ -1,15 +1,16 @@
 from loguru import logger 
-from commons.minimal import cleanQuery
+from commons.minimal import cleanQuery, normalize_url
+from commons.urlContentCache import url_content_cache
 from pipeline.tools import tools
 from functionCalls.getTimeZone import get_local_time
 from functionCalls.getImagePrompt import generate_prompt_from_image, replyFromImage
 import asyncio
 import time
 import json
-from commons.searching_based import fetch_url_content_parallel, webSearch, imageSearch
+from commons.searching_based import fetch_url_content_parallel_async, webSearch, imageSearch
 from commons.minimal import cleanQuery
 from functionCalls.getYoutubeDetails import transcribe_audio, youtubeMetadata
-from pipeline.utils import get_model_server, cached_web_search_key
+from pipeline.utils import get_ipc_client, cached_web_search_key
 from pipeline.config import MAX_IMAGES_TO_INCLUDE, LOG_MESSAGE_QUERY_TRUNCATE, LOG_MESSAGE_PREVIEW_TRUNCATE, ERROR_MESSAGE_TRUNCATE, REQUEST_ID_HEX_SLICE_SIZE
 
 async def optimized_tool_execution(function_name: str, function_args: dict, memoized_results: dict, emit_event_func):
@@ -85,8 +86,9 @@ Sources: {cache_metadata.get('sources', 'N/A')}"""
             if cache_key in memoized_results["web_searches"]:
                 logger.info(f"Using cached web search for: {search_query}")
                 yield memoized_results["web_searches"][cache_key]
+                return
             logger.info(f"Performing optimized web search for: {search_query}")
-            tool_result = webSearch(search_query)
+            tool_result = await webSearch(search_query)
             source_urls = tool_result
             memoized_results["web_searches"][cache_key] = tool_result
             if "current_search_urls" not in memoized_results:
@@ -182,7 +184,29 @@ Sources: {cache_metadata.get('sources', 'N/A')}"""
             try:
                 url = function_args.get("url")
                 search_query = memoized_results.get("search_query", "")
-                result = await transcribe_audio(url, full_transcript=False, query=search_query)
+                progress = asyncio.Queue()
+                transcription = asyncio.ensure_future(transcribe_audio(
+                    url, full_transcript=False, query=search_query,
+                    on_progress=lambda done, total, segments: progress.put_nowait((done, total, segments))
+                ))
+                try:
+                    while not transcription.done():
+                        next_progress = asyncio.ensure_future(progress.get())
+                        await asyncio.wait({transcription, next_progress}, return_when=asyncio.FIRST_COMPLETED)
+                        if not next_progress.done():
+                            next_progress.cancel()
+                            break
+                        done, total, segments = next_progress.result()
+                        progress_event = emit_event_func("INFO", f"<TASK>Transcribing Video ({done}/{total})</TASK>")
+                        if progress_event:
+                            yield progress_event
+                        partial_text = " ".join(text for _, _, text in segments if text)
+                        partial_event = emit_event_func("transcript-part", partial_text) if partial_text else None
+                        if partial_event:
+                            yield partial_event
+                    result = await transcription
+                finally:
+                    transcription.cancel()
                 transcript_text = f"YouTube Transcript:\n{result if result else '[No transcript available]'}"
                 memoized_results["youtube_transcripts"][url] = transcript_text
                 yield transcript_text
@@ -204,18 +228,21 @@ Sources: {cache_metadata.get('sources', 'N/A')}"""
                 if isinstance(queries, str):
                     queries = [queries]
                 parallel_results = await asyncio.wait_for(
-                    asyncio.to_thread(fetch_url_content_parallel, queries, [url]),
+                    fetch_url_content_parallel_async(queries, [url]),
                     timeout=15.0
                 )
                 
-                try:
-                    model_server = get_model_server()
-                    core_service = model_server.CoreEmbeddingService()
-                    ingest_result = await asyncio.to_thread(core_service.ingest_url, url)
-                    chunks_count = ingest_result.get('chunks_ingested', 0)
-                    logger.info(f"[Pipeline] Ingested {chunks_count} chunks from {url} into vector store")
-                except Exception as e:
-                    logger.warning(f"[Pipeline] Failed to ingest content to vector store: {e}")
+                page_text = url_content_cache.get(url)
+                if page_text:
+                    try:
+                        core_service = get_ipc_client().service("CoreEmbeddingService")
+                        ingest_result = await core_service.ingest_text(url, page_text)
+                        chunks_count = ingest_result.get('chunks_ingested', 0)
+                        if ingest_result.get("success"):
+                            memoized_results.setdefault("ingested_urls", set()).add(normalize_url(url))
+                        logger.info(f"[Pipeline] Ingested {chunks_count} chunks from {url} into vector store")
+                    except Exception as e:
+                        logger.warning(f"[Pipeline] Failed to ingest content to vector store: {e}")
                 
                 yield parallel_results if parallel_results else "[No content fetched from URL]"
             except asyncio.TimeoutError:
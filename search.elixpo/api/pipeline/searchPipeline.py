@@ -5,6 +5,7 @@ import logging
 import os
 import asyncio
 from pipeline.lixsearch import run_elixposearch_pipeline
+from pipeline.utils import parse_sse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("elixpo")
@@ -22,23 +23,18 @@ if __name__ == "__main__":
         answer = None
         try:
             async for event_chunk in async_generator:
-                if event_chunk and "event: final" in event_chunk:
-                    lines = event_chunk.split('\n')
-                    for line in lines:
-                        if line.startswith('data: '):
-                            if answer is None:
-                                answer = line[6:]
-                            else:
-                                answer += line[6:]
-                    break
-                elif event_chunk and "event: final-part" in event_chunk:
-                    lines = event_chunk.split('\n')
-                    for line in lines:
-                        if line.startswith('data: '):
-                            if answer is None:
-                                answer = line[6:]
-                            else:
-                                answer += line[6:]
+                if not event_chunk:
+                    continue
+                if event_id is None:
+                    answer = event_chunk
+                    continue
+                event_type, event_data = parse_sse(event_chunk)
+                if event_type == "final-reset":
+                    answer = None
+                elif event_type in ("final-part", "final"):
+                    answer = (answer or "") + (event_data or "")
+                    if event_type == "final":
+                        break
         except Exception as e:
             logger.error(f"Error during async generator iteration: {e}", exc_info=True)
             answer = "Failed to get answer due to an error."
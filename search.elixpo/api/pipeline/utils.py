@@ -1,27 +1,22 @@
-from multiprocessing.managers import BaseManager   
+import asyncio
+import weakref
 from functools import lru_cache
 from loguru import logger
+from ipcService.rpc import RPCClient
 
 
 
-class ModelServerClient(BaseManager):
-    pass
-ModelServerClient.register('CoreEmbeddingService')
-ModelServerClient.register('accessSearchAgents')
+_ipc_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RPCClient]" = weakref.WeakKeyDictionary()
 
-_model_server = None
-
-def get_model_server():
-    global _model_server
-    if _model_server is None:
-        try:
-            _model_server = ModelServerClient(address=("localhost", 5010), authkey=b"ipcService")
-            _model_server.connect()
-            logger.info("[SearchPipeline] Connected to model_server via IPC")
-        except Exception as e:
-            logger.error(f"[SearchPipeline] Failed to connect to model_server: {e}")
-            raise
-    return _model_server
+def get_ipc_client() -> RPCClient:
+    """Return the model_server RPC client bound to the running event loop. Connections open lazily on first call."""
+    loop = asyncio.get_running_loop()
+    client = _ipc_clients.get(loop)
+    if client is None:
+        client = RPCClient()
+        _ipc_clients[loop] = client
+        logger.info(f"[SearchPipeline] RPC client created for {client.path}")
+    return client
 
 
 @lru_cache(maxsize=100)
@@ -29,7 +24,20 @@ def cached_web_search_key(query: str) -> str:
     return f"web_search_{hash(query)}"
 
 def format_sse(event: str, data: str) -> str:
-    lines = data.splitlines()
-    data_str = ''.join(f"data: {line}\n" for line in lines)
+    # split("\n") rather than splitlines() so token deltas keep trailing newlines
+    data_str = ''.join(f"data: {line}\n" for line in data.split("\n"))
     return f"event: {event}\n{data_str}\n\n"
 
+
+def parse_sse(chunk: str):
+    """Inverse of format_sse: return (event, data) with data whitespace preserved."""
+    event_type = None
+    data_lines = []
+    for line in chunk.rstrip("\n").split("\n"):
+        if line.startswith("event:"):
+            event_type = line[6:].strip()
+        elif line.startswith("data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    return event_type, ("\n".join(data_lines) if data_lines else None)
+
@@ -0,0 +1,266 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from pipeline.config import RAG_BM25_MAX_DF_RATIO
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[._\-/]")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+herself him himself his how i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without English stopwords. Compound tokens such
+    as ``v2.3.1`` or ``ERR_CONNECTION_RESET`` are kept whole and also emitted
+    as their parts, so both the exact identifier and its pieces match."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in _SPLIT_RE.split(token) if part and part not in STOPWORDS)
+    return tokens
+
+
+class _IndexState:
+    """One generation of the index. The writer appends to it in place and
+    only publishes a slot (``size``) or a posting tuple once its data is
+    written, so readers can score against it without a lock. Compaction
+    builds a fresh state and swaps it in whole."""
+
+    def __init__(self, capacity: int = 1024):
+        self.doc_ids: List[str] = []
+        self.slots: Dict[str, int] = {}
+        self.lengths = np.zeros(capacity, dtype=np.float32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.live = 0
+        self.total_length = 0.0
+        # term -> (slots int32, term frequencies float32, count)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+
+    def reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed > self.lengths.shape[0]:
+            capacity = max(needed, self.lengths.shape[0] * 2)
+            lengths = np.zeros(capacity, dtype=np.float32)
+            alive = np.zeros(capacity, dtype=bool)
+            lengths[:self.size] = self.lengths[:self.size]
+            alive[:self.size] = self.alive[:self.size]
+            self.lengths, self.alive = lengths, alive
+
+    def append_postings(self, term: str, slots: List[int], tfs: List[int]) -> None:
+        current = self.postings.get(term)
+        m = len(slots)
+        if current is None:
+            term_slots, term_tfs, n = np.empty(m, dtype=np.int32), np.empty(m, dtype=np.float32), 0
+        else:
+            term_slots, term_tfs, n = current
+            if n + m > term_slots.shape[0]:
+                capacity = max(n + m, term_slots.shape[0] * 2)
+                grown_slots, grown_tfs = np.empty(capacity, dtype=np.int32), np.empty(capacity, dtype=np.float32)
+                grown_slots[:n], grown_tfs[:n] = term_slots[:n], term_tfs[:n]
+                term_slots, term_tfs = grown_slots, grown_tfs
+        term_slots[n:n + m] = slots
+        term_tfs[n:n + m] = tfs
+        self.postings[term] = (term_slots, term_tfs, n + m)
+
+
+class BM25Index:
+    """Incrementally updated inverted index scored with Okapi BM25.
+
+    Postings are numpy arrays of document slots and term frequencies, so a
+    query is a handful of vectorised gathers and one ``bincount`` rather
+    than a Python loop per posting. Searches never take ``self.lock``; it
+    only serialises writers. Removed documents are tombstoned and the index
+    is compacted once they exceed ``compact_ratio`` of the slots. Terms in
+    more than ``max_df_ratio`` of the documents carry almost no IDF and are
+    skipped at query time unless nothing rarer matched.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_df_ratio: float = RAG_BM25_MAX_DF_RATIO,
+                 compact_ratio: float = 0.25, compact_min: int = 1000):
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._state = _IndexState()
+        self._removed_while_loading: Optional[Set[str]] = None
+        self.compactions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._state.live
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._state.slots
+
+    @property
+    def loading(self) -> bool:
+        return self._removed_while_loading is not None
+
+    def add(self, doc_id: str, text: str) -> None:
+        self.add_many([(doc_id, text)])
+
+    def add_many(self, docs: Iterable[Tuple[str, str]]) -> None:
+        tokenized = [(doc_id, Counter(tokenize(text))) for doc_id, text in docs]
+        if tokenized:
+            with self.lock:
+                self._add_tokenized(tokenized)
+
+    def load(self, pages: Iterable[Iterable[Tuple[str, str]]]) -> int:
+        """Bulk-build from ``pages`` of ``(doc_id, text)`` while the writer keeps
+        adding and removing. Ids the writer already holds are skipped, and so
+        are ids it removed during the load, so a page read before a delete
+        cannot bring the document back."""
+        with self.lock:
+            self._removed_while_loading = set()
+        loaded = 0
+        try:
+            for page in pages:
+                tokenized = [(doc_id, Counter(tokenize(text))) for doc_id, text in page]
+                with self.lock:
+                    skip = self._removed_while_loading
+                    tokenized = [(doc_id, counts) for doc_id, counts in tokenized
+                                 if doc_id not in skip and doc_id not in self._state.slots]
+                    self._add_tokenized(tokenized)
+                loaded += len(tokenized)
+        finally:
+            with self.lock:
+                self._removed_while_loading = None
+        return loaded
+
+    def _add_tokenized(self, tokenized: List[Tuple[str, Counter]]) -> None:
+        state = self._state
+        stale = [doc_id for doc_id, _ in tokenized if doc_id in state.slots]
+        if stale:
+            self._tombstone(stale)
+        state.reserve(len(tokenized))
+        by_term: Dict[str, Tuple[List[int], List[int]]] = {}
+        slot = state.size
+        for doc_id, counts in tokenized:
+            length = sum(counts.values())
+            state.lengths[slot] = length
+            state.alive[slot] = True
+            state.doc_ids.append(doc_id)
+            state.slots[doc_id] = slot
+            state.total_length += length
+            for term, tf in counts.items():
+                entry = by_term.get(term)
+                if entry is None:
+                    entry = by_term[term] = ([], [])
+                entry[0].append(slot)
+                entry[1].append(tf)
+            slot += 1
+        state.live += slot - state.size
+        state.size = slot
+        for term, (slots, tfs) in by_term.items():
+            state.append_postings(term, slots, tfs)
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        with self.lock:
+            doc_ids = list(doc_ids)
+            if self._removed_while_loading is not None:
+                self._removed_while_loading.update(doc_ids)
+            removed = self._tombstone(doc_ids)
+            state = self._state
+            dead = state.size - state.live
+            if dead >= self.compact_min and dead > self.compact_ratio * state.size:
+                self._compact()
+        return removed
+
+    def _tombstone(self, doc_ids: Iterable[str]) -> int:
+        state = self._state
+        removed = 0
+        for doc_id in doc_ids:
+            slot = state.slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            state.alive[slot] = False
+            state.total_length -= float(state.lengths[slot])
+            state.live -= 1
+            removed += 1
+        return removed
+
+    def _compact(self) -> None:
+        old = self._state
+        size = old.size
+        alive = old.alive[:size]
+        remap = np.cumsum(alive, dtype=np.int32) - 1
+        state = _IndexState(capacity=max(1024, old.live * 2))
+        keep = np.flatnonzero(alive)
+        state.doc_ids = [old.doc_ids[i] for i in keep]
+        state.slots = {doc_id: i for i, doc_id in enumerate(state.doc_ids)}
+        state.lengths[:len(keep)] = old.lengths[keep]
+        state.alive[:len(keep)] = True
+        state.size = state.live = len(keep)
+        state.total_length = float(state.lengths[:len(keep)].sum())
+        for term, (slots, tfs, n) in old.postings.items():
+            slots, tfs = slots[:n], tfs[:n]
+            mask = alive[slots]
+            if mask.any():
+                kept = remap[slots[mask]]
+                state.postings[term] = (kept, tfs[mask], kept.shape[0])
+        self._state = state
+        self.compactions += 1
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        terms = set(tokenize(query))
+        state = self._state
+        size, live = state.size, state.live
+        if not terms or live == 0 or top_k <= 0:
+            return []
+        lengths, alive = state.lengths[:size], state.alive[:size]
+        avg_length = max(state.total_length / live, 1e-6)
+
+        matched = []
+        for term in terms:
+            posting = state.postings.get(term)
+            if posting is not None:
+                matched.append(posting)
+        if not matched:
+            return []
+        max_df = max(1.0, self.max_df_ratio * live)
+        selected = [posting for posting in matched if posting[2] <= max_df]
+        if not selected:
+            selected = [min(matched, key=lambda posting: posting[2])]
+
+        all_slots, all_scores = [], []
+        for term_slots, term_tfs, n in selected:
+            slots, tfs = term_slots[:n], term_tfs[:n]
+            in_range = slots < size
+            if not in_range.all():
+                slots, tfs = slots[in_range], tfs[in_range]
+            idf = np.log1p((live - n + 0.5) / (n + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[slots] / avg_length)
+            all_slots.append(slots)
+            all_scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+        scores = np.bincount(np.concatenate(all_slots), weights=np.concatenate(all_scores), minlength=size)[:size]
+        scores[~alive] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.shape[0] > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(state.doc_ids[i], float(scores[i])) for i in candidates]
+
+    def get_stats(self) -> Dict:
+        state = self._state
+        return {
+            "documents": state.live,
+            "terms": len(state.postings),
+            "tombstones": state.size - state.live,
+            "compactions": self.compactions,
+            "avg_doc_length": round(state.total_length / state.live, 1) if state.live else 0.0,
+            "loading": self.loading,
+        }
@@ -0,0 +1,140 @@
+from collections import deque
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import Dict, List, Union
+from loguru import logger
+import numpy as np
+from ragService.embeddingService import EmbeddingService
+
+
+class _EmbedRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embed calls into one model.encode batch.
+
+    Drop-in for EmbeddingService.embed/embed_single: callers block on their own
+    future while a single worker thread drains the queue for up to
+    ``max_wait_ms`` (or until ``max_texts`` are collected) and slices the
+    batch result back to each caller.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService, max_wait_ms: float = 5.0, max_texts: int = 64,
+                 max_queue_depth: int = 1024, encode_batch_size: int = 32, submit_timeout: float = 30.0):
+        self.embedding_service = embedding_service
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_texts = max_texts
+        self.encode_batch_size = encode_batch_size
+        self.submit_timeout = submit_timeout
+        self._queue: "queue.Queue[_EmbedRequest]" = queue.Queue(maxsize=max_queue_depth)
+        self._carry: List[_EmbedRequest] = []
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._texts = 0
+        self._max_batch = 0
+        self._rejected = 0
+        self._failed_batches = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+
+        self._worker = threading.Thread(target=self._run, name="EmbeddingBatcher", daemon=True)
+        self._worker.start()
+        logger.info(f"[EmbeddingBatcher] Started (max_wait={max_wait_ms}ms, max_texts={max_texts}, max_queue_depth={max_queue_depth})")
+
+    def embed(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return self.embedding_service.embed(texts, batch_size=batch_size)
+        request = _EmbedRequest(list(texts))
+        try:
+            self._queue.put(request, timeout=self.submit_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise RuntimeError("Embedding queue is full")
+        return request.future.result()
+
+    def embed_single(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    def _collect(self) -> List[_EmbedRequest]:
+        batch = self._carry or [self._queue.get()]
+        self._carry = []
+        total = sum(len(r.texts) for r in batch)
+        deadline = time.perf_counter() + self.max_wait
+        while total < self.max_texts:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if total + len(request.texts) > self.max_texts:
+                self._carry = [request]
+                break
+            batch.append(request)
+            total += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch = self._collect()
+                self._process(batch)
+            except Exception as e:
+                # Callers wait on their futures without a timeout, so every dequeued request must settle
+                texts = sum(len(request.texts) for request in batch)
+                logger.error(f"[EmbeddingBatcher] Batch of {texts} texts failed: {e}")
+                with self._stats_lock:
+                    self._failed_batches += 1
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _process(self, batch: List[_EmbedRequest]) -> None:
+        started = time.perf_counter()
+        texts = [text for request in batch for text in request.texts]
+        embeddings = self.embedding_service.embed(texts, batch_size=self.encode_batch_size)
+        if len(embeddings) != len(texts):
+            raise RuntimeError(f"Embedding returned {len(embeddings)} vectors for {len(texts)} texts")
+        offset = 0
+        for request in batch:
+            request.future.set_result(embeddings[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+        with self._stats_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._texts += len(texts)
+            self._max_batch = max(self._max_batch, len(texts))
+            self._batch_sizes.append(len(texts))
+            self._wait_ms.extend((started - r.enqueued_at) * 1000 for r in batch)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            waits = np.array(self._wait_ms) if self._wait_ms else np.zeros(1)
+            sizes = np.array(self._batch_sizes) if self._batch_sizes else np.zeros(1)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "requests": self._requests,
+                "batches": self._batches,
+                "texts": self._texts,
+                "rejected": self._rejected,
+                "failed_batches": self._failed_batches,
+                "avg_batch_size": round(float(sizes.mean()), 2),
+                "max_batch_size": self._max_batch,
+                "wait_ms_p50": round(float(np.percentile(waits, 50)), 2),
+                "wait_ms_p99": round(float(np.percentile(waits, 99)), 2),
+            }
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Union
+from loguru import logger
+import numpy as np
+from pipeline.config import EMBEDDING_MEMO_TTL_SECONDS, EMBEDDING_MEMO_MAX_ENTRIES
+
+
+def text_key(model_name: str, text: str) -> str:
+    return hashlib.blake2b(f"{model_name}\n{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RequestEmbeddingScope:
+    """Vectors and counters for one request; lives in a ContextVar so every
+    stage running in the request's task (or threads started from it with
+    ``asyncio.to_thread``) shares it."""
+
+    __slots__ = ("vectors", "computed", "saved")
+
+    def __init__(self):
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.computed = 0
+        self.saved = 0
+
+    def get_stats(self) -> Dict:
+        return {"forward_passes": self.computed, "forward_passes_saved": self.saved}
+
+
+_request_scope: ContextVar[Optional[RequestEmbeddingScope]] = ContextVar("embedding_request_scope", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Give the current context a fresh per-request memo for the duration of the block."""
+    scope = RequestEmbeddingScope()
+    token = _request_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        try:
+            _request_scope.reset(token)
+        except ValueError:
+            # An async generator closed from another task exits in a different context
+            _request_scope.set(None)
+
+
+class EmbeddingMemo:
+    """Process-wide LRU of text hash -> normalised embedding with a short TTL."""
+
+    def __init__(self, ttl_seconds: float = EMBEDDING_MEMO_TTL_SECONDS, max_entries: int = EMBEDDING_MEMO_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self.lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+class MemoizedEmbedder:
+    """Drop-in for EmbeddingService/EmbeddingBatcher that answers
+    ``embed_single`` from the request scope, then the process memo, and only
+    runs the model on a miss. ``embed`` (document batches) passes through."""
+
+    def __init__(self, embedding_service, model_name: str, memo: Optional[EmbeddingMemo] = None):
+        self.embedding_service = embedding_service
+        self.model_name = model_name
+        self.memo = memo or get_embedding_memo()
+
+    def __getattr__(self, name):
+        return getattr(self.embedding_service, name)
+
+    def embed(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        return self.embedding_service.embed(texts, batch_size=batch_size)
+
+    def embed_single(self, text: str) -> np.ndarray:
+        key = text_key(self.model_name, text)
+        scope = _request_scope.get()
+        if scope is not None and key in scope.vectors:
+            scope.saved += 1
+            return scope.vectors[key]
+        vector = self.memo.get(key)
+        if vector is None:
+            vector = np.asarray(self.embedding_service.embed_single(text), dtype=np.float32)
+            vector.setflags(write=False)
+            self.memo.put(key, vector)
+            if scope is not None:
+                scope.computed += 1
+        elif scope is not None:
+            scope.saved += 1
+        if scope is not None:
+            scope.vectors[key] = vector
+        return vector
+
+
+_memo: Optional[EmbeddingMemo] = None
+_memo_lock = threading.Lock()
+
+
+def get_embedding_memo() -> EmbeddingMemo:
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                _memo = EmbeddingMemo()
+                logger.info(f"[EmbeddingMemo] Process memo ready (ttl={_memo.ttl_seconds}s, max_entries={_memo.max_entries})")
+    return _memo
@@ -3,32 +3,36 @@ from loguru import logger
 from sentence_transformers import SentenceTransformer
 import torch
 import threading
-from typing import List, Union
+from typing import Dict, List, Union
 import warnings
-import os 
-from loguru import logger
+import os
 import logging
 
 warnings.filterwarnings('ignore', message='Can\'t initialize NVML')
 os.environ['CHROMA_TELEMETRY_DISABLED'] = '1'
 logging.getLogger('chromadb').setLevel(logging.ERROR)
 
+_shared_services: Dict[str, "EmbeddingService"] = {}
+_shared_services_lock = threading.Lock()
+
+
 class EmbeddingService:
     def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"):
+        self.model_name = model_name
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"[EmbeddingService] Loading model on {self.device}...")
-        
+
         self.model = SentenceTransformer(model_name)
         self.model = self.model.to(self.device)
-        
+
         self.lock = threading.Lock()
         logger.info(f"[EmbeddingService] Model loaded: {model_name}")
-    
+
     def embed(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
         with self.lock:
             if isinstance(texts, str):
                 texts = [texts]
-            
+
             embeddings = self.model.encode(
                 texts,
                 batch_size=batch_size,
@@ -37,9 +41,9 @@ class EmbeddingService:
                 show_progress_bar=False,
                 device=self.device
             )
-            
+
             return embeddings
-    
+
     def embed_single(self, text: str) -> np.ndarray:
         with self.lock:
             embedding = self.model.encode(
@@ -51,3 +55,16 @@ class EmbeddingService:
             )
             return embedding
 
+
+def get_embedding_service(model_name: str) -> EmbeddingService:
+    """Return the process-wide EmbeddingService for ``model_name``, loading it on first use."""
+    service = _shared_services.get(model_name)
+    if service is not None:
+        return service
+    with _shared_services_lock:
+        service = _shared_services.get(model_name)
+        if service is None:
+            service = EmbeddingService(model_name=model_name)
+            _shared_services[model_name] = service
+            logger.info(f"[EmbeddingService] Registered shared model: {model_name}")
+        return service
@@ -0,0 +1,165 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+from pipeline.config import (RAG_RERANK_ENABLED, RAG_RERANK_MODEL, RAG_RERANK_TOP_N, RAG_HYBRID_CANDIDATES,
+                             RAG_RRF_K, RAG_RETRIEVAL_BUDGET_MS)
+
+_STAGES = ("dense_ms", "lexical_ms", "fusion_ms", "rerank_ms", "total_ms")
+
+
+def _result_id(result: Dict) -> str:
+    return result.get("id") or result["metadata"].get("chunk_id")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RAG_RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: each list contributes ``1 / (k + rank)`` per id."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Small CPU cross-encoder, loaded on a background thread so the first
+    requests are not blocked; until it is ready, retrieval skips reranking.
+    Keeps a moving average of the per-pair cost for budget planning."""
+
+    def __init__(self, model_name: str = RAG_RERANK_MODEL):
+        self.model_name = model_name
+        self.model = None
+        self.ms_per_pair = 5.0
+        self.lock = threading.Lock()
+        self._loader = threading.Thread(target=self._load, name="reranker-loader", daemon=True)
+        self._loader.start()
+
+    def _load(self) -> None:
+        try:
+            from sentence_transformers import CrossEncoder
+            self.model = CrossEncoder(self.model_name, device="cpu", max_length=256)
+            logger.info(f"[Reranker] Loaded {self.model_name}")
+        except Exception as e:
+            logger.warning(f"[Reranker] Could not load {self.model_name}, reranking disabled: {e}")
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        self._loader.join(timeout)
+        return self.ready
+
+    def rerank(self, query: str, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        with self.lock:
+            scores = self.model.predict([(query, text) for text in texts], show_progress_bar=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.ms_per_pair = 0.8 * self.ms_per_pair + 0.2 * elapsed_ms / max(1, len(texts))
+        return np.asarray(scores, dtype=np.float32)
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    global _reranker
+    if not RAG_RERANK_ENABLED:
+        return None
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                _reranker = CrossEncoderReranker()
+    return _reranker
+
+
+class HybridRetriever:
+    """Dense + BM25 retrieval over the vector store, fused with reciprocal
+    rank fusion and optionally reranked by a cross-encoder.
+
+    Both first stages always run; the rerank only covers as many fused
+    candidates as fit in what is left of ``budget_ms``. Each result keeps its
+    per-stage scores under ``stage_scores``; ``score`` is the final ranking
+    score (rerank logit when reranked, otherwise the fused score).
+    """
+
+    def __init__(self, vector_store, reranker: Optional[CrossEncoderReranker] = None,
+                 candidates: int = RAG_HYBRID_CANDIDATES, rerank_top_n: int = RAG_RERANK_TOP_N,
+                 rrf_k: int = RAG_RRF_K, budget_ms: float = RAG_RETRIEVAL_BUDGET_MS):
+        self.vector_store = vector_store
+        self.reranker = reranker if reranker is not None else get_reranker()
+        self.candidates = candidates
+        self.rerank_top_n = rerank_top_n
+        self.rrf_k = rrf_k
+        self.budget_ms = budget_ms
+        self._stats_lock = threading.Lock()
+        self.searches = 0
+        self.reranked_searches = 0
+        self.stage_totals = dict.fromkeys(_STAGES, 0.0)
+
+    def search(self, query: str, query_embedding: np.ndarray, top_k: int = 5) -> Tuple[List[Dict], Dict]:
+        """Return ``(results, timings)``; results have the same shape as ``VectorStore.search``."""
+        started = time.perf_counter()
+        timings = dict.fromkeys(_STAGES, 0.0)
+        candidates = max(self.candidates, top_k)
+
+        dense = self.vector_store.search(query_embedding, top_k=candidates)
+        mark = time.perf_counter()
+        timings["dense_ms"] = (mark - started) * 1000
+
+        lexical = self.vector_store.lexical_search(query, top_k=candidates)
+        timings["lexical_ms"] = (time.perf_counter() - mark) * 1000
+        mark = time.perf_counter()
+
+        by_id: Dict[str, Dict] = {}
+        for stage, results in (("dense", dense), ("lexical", lexical)):
+            for result in results:
+                doc_id = _result_id(result)
+                entry = by_id.setdefault(doc_id, {"id": doc_id, "metadata": result["metadata"], "stage_scores": {}})
+                entry["stage_scores"][stage] = result["score"]
+        fused = reciprocal_rank_fusion([[_result_id(r) for r in dense], [_result_id(r) for r in lexical]], k=self.rrf_k)
+        ranked = []
+        for doc_id, score in fused:
+            entry = by_id[doc_id]
+            entry["stage_scores"]["fused"] = score
+            entry["score"] = score
+            ranked.append(entry)
+        timings["fusion_ms"] = (time.perf_counter() - mark) * 1000
+
+        if self.reranker is not None and self.reranker.ready and len(ranked) > 1:
+            remaining_ms = self.budget_ms - (time.perf_counter() - started) * 1000
+            n = min(self.rerank_top_n, len(ranked), int(remaining_ms / self.reranker.ms_per_pair))
+            if n > 1:
+                mark = time.perf_counter()
+                head = ranked[:n]
+                try:
+                    scores = self.reranker.rerank(query, [entry["metadata"]["text"] for entry in head])
+                    for entry, score in zip(head, scores):
+                        entry["stage_scores"]["rerank"] = float(score)
+                        entry["score"] = float(score)
+                    order = np.argsort(-scores, kind="stable")
+                    ranked = [head[i] for i in order] + ranked[n:]
+                    timings["rerank_ms"] = (time.perf_counter() - mark) * 1000
+                except Exception as e:
+                    logger.warning(f"[HybridRetriever] Rerank failed, keeping fused order: {e}")
+
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.searches += 1
+            self.reranked_searches += 1 if timings["rerank_ms"] else 0
+            for stage, value in timings.items():
+                self.stage_totals[stage] += value
+        return ranked[:top_k], {stage: round(value, 3) for stage, value in timings.items()}
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "searches": self.searches,
+                "reranked_searches": self.reranked_searches,
+                "reranker_ready": bool(self.reranker and self.reranker.ready),
+                "budget_ms": self.budget_ms,
+                **{f"avg_{stage}": round(total / self.searches, 3) if self.searches else None
+                   for stage, total in self.stage_totals.items()},
+            }
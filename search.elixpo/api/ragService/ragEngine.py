@@ -5,7 +5,7 @@ from sessions.sessionData import SessionData
 from ragService.semanticCache import SemanticCache
 import numpy as np
 from loguru import logger
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 from pipeline.config import LOG_MESSAGE_PREVIEW_TRUNCATE
 
 
@@ -32,10 +32,14 @@ class RAGEngine:
         self,
         query: str,
         url: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        query_embedding: Optional[Union[np.ndarray, List[float]]] = None
     ) -> Dict:
         try:
-            query_embedding = self.embedding_service.embed_single(query)
+            if query_embedding is None:
+                query_embedding = self.embedding_service.embed_single(query)
+            else:
+                query_embedding = np.asarray(query_embedding, dtype=np.float32)
             
             if url:
                 cached_response = self.semantic_cache.get(url, query_embedding)
@@ -51,8 +55,8 @@ class RAGEngine:
             # CRITICAL FIX #8: Try session data first, then global vector store
             session_content = self._get_session_content_context(query_embedding, top_k)
             
-            # Get global vector store results
-            results = self.vector_store.search(query_embedding, top_k=top_k)
+            # Get global vector store results (dense + BM25, fused and reranked)
+            results, timings = self.retrieval_pipeline.hybrid.search(query, query_embedding, top_k=top_k)
             context_texts = [r["metadata"]["text"] for r in results]
             sources = list(set([r["metadata"]["url"] for r in results]))
             
@@ -80,6 +84,7 @@ class RAGEngine:
                 "sources": sources,
                 "chunk_count": len(results),
                 "scores": [r["score"] for r in results],
+                "timings": timings,
                 "query_embedding": query_embedding.tolist() if isinstance(query_embedding, np.ndarray) else query_embedding
             }
             
@@ -115,8 +120,8 @@ class RAGEngine:
             }
     
     
-    def get_full_context(self, query: str, top_k: int = 5) -> Dict:
-        retrieval_result = self.retrieve_context(query, top_k=top_k)
+    def get_full_context(self, query: str, top_k: int = 5, query_embedding: Optional[Union[np.ndarray, List[float]]] = None) -> Dict:
+        retrieval_result = self.retrieve_context(query, top_k=top_k, query_embedding=query_embedding)
         
         return {
             "query": query,
@@ -179,29 +184,23 @@ class RAGEngine:
             return ""
     
     def _get_session_content_context(self, query_embedding: np.ndarray, top_k: int = 5) -> Dict:
-        """CRITICAL FIX #8: Get relevant content from session's fetched URLs using ChromaDB."""
+        """CRITICAL FIX #8: Get relevant content from session's fetched URLs using its in-memory index."""
         if not self.session_data or not hasattr(self.session_data, 'processed_content'):
             return {"texts": [], "sources": [], "combined": ""}
         
         try:
-            # If session has its own ChromaDB collection, use it for retrieval
-            if hasattr(self.session_data, 'chroma_collection') and self.session_data.chroma_collection:
-                results = self.session_data.chroma_collection.query(
-                    query_embeddings=[query_embedding.tolist() if isinstance(query_embedding, np.ndarray) else query_embedding],
-                    n_results=min(top_k, self.session_data.chroma_collection.count())
-                )
-                
+            if hasattr(self.session_data, 'content_index') and len(self.session_data.content_index) > 0:
                 content_texts = []
                 sources = []
                 
-                if results["documents"] and len(results["documents"]) > 0:
-                    for document, metadata in zip(results["documents"][0], results["metadatas"][0]):
-                        content_texts.append(document[:500])
-                        if "url" in metadata:
-                            sources.append(metadata["url"])
+                for url, _ in self.session_data.search_content(query_embedding, top_k):
+                    content = self.session_data.processed_content.get(url, "")
+                    if content:
+                        content_texts.append(content[:500])
+                        sources.append(url)
                 
                 combined = "\n\n[Session Content]\n".join(content_texts) if content_texts else ""
-                logger.info(f"[RAG] Retrieved {len(content_texts)} session content chunks from ChromaDB")
+                logger.info(f"[RAG] Retrieved {len(content_texts)} session content chunks from session index")
                 
                 return {
                     "texts": content_texts,
@@ -209,7 +208,7 @@ class RAGEngine:
                     "combined": combined
                 }
             else:
-                # Fallback: use simple similarity matching without ChromaDB
+                # Fallback: no embedded session content, use fetch order
                 content_texts = []
                 sources = []
                 
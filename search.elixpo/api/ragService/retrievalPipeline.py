@@ -1,71 +1,128 @@
 from ragService.embeddingService import EmbeddingService
-from ragService.vectorStore import VectorStore
-import requests
+from ragService.embeddingBatcher import EmbeddingBatcher
+from ragService.vectorStore import VectorStore, chunk_id_for, content_hash
+from ragService.hybridRetriever import HybridRetriever
 from loguru import logger
-from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import List, Dict
+import threading
+import time
+import numpy as np
+from typing import List, Dict, Optional, Union
 from commons.minimal import chunk_text, clean_text
+from searching.fetch_full_text import fetch_full_text
+from pipeline.config import VECTOR_STORE_URL_TTL_SECONDS
 
 class RetrievalPipeline:
-    def __init__(self, embedding_service: EmbeddingService, vector_store: VectorStore):
+    def __init__(self, embedding_service: Union[EmbeddingService, EmbeddingBatcher], vector_store: VectorStore,
+                 url_ttl_seconds: int = VECTOR_STORE_URL_TTL_SECONDS):
         self.embedding_service = embedding_service
         self.vector_store = vector_store
+        self.url_ttl_seconds = url_ttl_seconds
+        self.hybrid = HybridRetriever(vector_store)
+        self._stats_lock = threading.Lock()
+        self.urls_skipped = 0
+        self.unchanged_documents = 0
+        self.embeddings_computed = 0
+        self.embeddings_skipped = 0
+    
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
     
     def ingest_url(self, url: str, max_words: int = 3000) -> int:
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, timeout=20, headers=headers)
-            response.raise_for_status()
-            
-            content_type = response.headers.get('Content-Type', '').lower()
-            if 'text/html' not in content_type:
-                logger.warning(f"[Retrieval] Skipping non-HTML: {url}")
+            entry = self.vector_store.get_url_entry(url)
+            if entry and time.time() - entry["ingested_at"] < self.url_ttl_seconds:
+                self._count(urls_skipped=1, embeddings_skipped=entry["chunks"])
+                logger.info(f"[Retrieval] {url} ingested {time.time() - entry['ingested_at']:.0f}s ago, skipping fetch")
+                return entry["chunks"]
+            text = fetch_full_text(url, total_word_count_limit=max_words)
+            if not text:
+                logger.warning(f"[Retrieval] No content fetched from {url}")
                 return 0
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.extract()
-            
-            text = soup.get_text()
+            return self.ingest_text(url, text, max_words=max_words)
+        
+        except Exception as e:
+            logger.error(f"[Retrieval] Failed to ingest {url}: {e}")
+            return 0
+    
+    def ingest_text(self, url: str, text: str, max_words: int = 3000) -> int:
+        try:
             text = clean_text(text)
             
             words = text.split()
             if len(words) > max_words:
                 text = " ".join(words[:max_words])
             
-            chunks = chunk_text(text, chunk_size=600, overlap=60)
+            doc_hash = content_hash(text)
+            entry = self.vector_store.get_url_entry(url)
+            if entry and entry["content_hash"] == doc_hash:
+                self.vector_store.record_url(url, doc_hash, entry["chunks"])
+                self._count(unchanged_documents=1, embeddings_skipped=entry["chunks"])
+                logger.info(f"[Retrieval] {url} unchanged since last ingest, skipping embedding")
+                return entry["chunks"]
             
-            embeddings = self.embedding_service.embed(chunks, batch_size=32)
+            chunks = chunk_text(text, chunk_size=600, overlap=60)
+            if not chunks:
+                return 0
             
-            chunk_dicts = [
-                {
-                    "url": url,
-                    "chunk_id": i,
-                    "text": chunk,
-                    "embedding": embeddings[i],
-                    "timestamp": datetime.now().isoformat()
-                }
-                for i, chunk in enumerate(chunks)
-            ]
+            ids = [chunk_id_for(url, chunk) for chunk in chunks]
+            existing = self.vector_store.existing_ids(ids)
+            first_index = {}
+            for i, chunk_id in enumerate(ids):
+                first_index.setdefault(chunk_id, i)
+            missing = [i for chunk_id, i in first_index.items() if chunk_id not in existing]
             
-            self.vector_store.add_chunks(chunk_dicts)
-            logger.info(f"[Retrieval] Ingested {len(chunks)} chunks from {url}")
+            if missing:
+                embeddings = self.embedding_service.embed([chunks[i] for i in missing], batch_size=32)
+                
+                chunk_dicts = [
+                    {
+                        "id": ids[i],
+                        "url": url,
+                        "chunk_id": i,
+                        "text": chunks[i],
+                        "embedding": embeddings[j],
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    for j, i in enumerate(missing)
+                ]
+                
+                self.vector_store.add_chunks(chunk_dicts)
+            self.vector_store.prune_url(url, ids)
+            self.vector_store.record_url(url, doc_hash, len(chunks))
+            self._count(embeddings_computed=len(missing), embeddings_skipped=len(chunks) - len(missing))
+            logger.info(f"[Retrieval] Ingested {len(chunks)} chunks from {url} ({len(missing)} embedded, {len(chunks) - len(missing)} reused)")
             
             return len(chunks)
         
         except Exception as e:
-            logger.error(f"[Retrieval] Failed to ingest {url}: {e}")
+            logger.error(f"[Retrieval] Failed to ingest text for {url}: {e}")
             return 0
     
-    def retrieve(self, query: str, top_k: int = 5) -> List[Dict]:
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            total = self.embeddings_computed + self.embeddings_skipped
+            return {
+                "urls_skipped_fresh": self.urls_skipped,
+                "unchanged_documents": self.unchanged_documents,
+                "embeddings_computed": self.embeddings_computed,
+                "embeddings_skipped": self.embeddings_skipped,
+                "embedding_skip_rate": round(self.embeddings_skipped / total, 3) if total else None,
+                "url_ttl_seconds": self.url_ttl_seconds,
+                "hybrid": self.hybrid.get_stats()
+            }
+    
+    def retrieve(self, query: str, top_k: int = 5, query_embedding: Optional[Union[np.ndarray, List[float]]] = None) -> List[Dict]:
+        """Hybrid retrieval for ``query``; pass ``query_embedding`` when the caller already embedded it."""
         try:
-            query_embedding = self.embedding_service.embed_single(query)
+            if query_embedding is None:
+                query_embedding = self.embedding_service.embed_single(query)
+            else:
+                query_embedding = np.asarray(query_embedding, dtype=np.float32)
             
-            results = self.vector_store.search(query_embedding, top_k=top_k)
+            results, _ = self.hybrid.search(query, query_embedding, top_k=top_k)
             
             return results
         
@@ -73,8 +130,9 @@ class RetrievalPipeline:
             logger.error(f"[Retrieval] Retrieval failed: {e}")
             return []
     
-    def build_context(self, query: str, top_k: int = 5, session_memory: str = "") -> Dict:
-        results = self.retrieve(query, top_k=top_k)
+    def build_context(self, query: str, top_k: int = 5, session_memory: str = "",
+                      query_embedding: Optional[Union[np.ndarray, List[float]]] = None) -> Dict:
+        results = self.retrieve(query, top_k=top_k, query_embedding=query_embedding)
         
         context_texts = [r["metadata"]["text"] for r in results]
         context = "\n\n".join(context_texts)
@@ -2,7 +2,8 @@ import threading
 from loguru import logger
 import numpy as np
 from typing import Dict, List
-from ragService.embeddingService import EmbeddingService
+from ragService.embeddingService import get_embedding_service
+from ragService.embeddingMemo import MemoizedEmbedder
 from ragService.vectorStore import VectorStore
 from ragService.ragEngine import RAGEngine
 from ragService.semanticCache import SemanticCache
@@ -33,7 +34,7 @@ class RetrievalSystem:
     
     def __init__(self):
         logger.info("[RetrievalSystem] Initializing...")
-        self.embedding_service = EmbeddingService(model_name=EMBEDDING_MODEL)
+        self.embedding_service = MemoizedEmbedder(get_embedding_service(EMBEDDING_MODEL), EMBEDDING_MODEL)
         logger.info(f"[RetrievalSystem] Embedding service device: {self.embedding_service.device}")
         
         self.vector_store = VectorStore(embedding_dim=EMBEDDING_DIMENSION, embeddings_dir=EMBEDDINGS_DIR)
@@ -1,84 +1,133 @@
+from collections import deque
 from pathlib import Path
 import threading
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from loguru import logger
 import numpy as np
-import os
-import pickle 
+from ragService.semanticCacheStore import get_semantic_cache_store
+
+class _UrlCacheBucket:
+    """Ring of pre-normalized query embeddings for one URL, bounded by ``capacity``.
+
+    Storage starts small and doubles as entries arrive, so the many URLs that
+    only ever see one or two queries stay cheap; once it reaches ``capacity``
+    the oldest slot is overwritten.
+    """
+
+    def __init__(self, dim: int, capacity: int, initial_capacity: int = 4):
+        self.capacity = capacity
+        allocated = max(1, min(initial_capacity, capacity))
+        self.matrix = np.zeros((allocated, dim), dtype=np.float32)
+        self.expires_at = np.zeros(allocated, dtype=np.float64)
+        self.responses: List[Optional[Dict]] = [None] * allocated
+        self.head = 0
+
+    def _grow(self) -> None:
+        size = self.matrix.shape[0]
+        allocated = min(self.capacity, size * 2)
+        matrix = np.zeros((allocated, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:size] = self.matrix
+        expires_at = np.zeros(allocated, dtype=np.float64)
+        expires_at[:size] = self.expires_at
+        self.matrix, self.expires_at = matrix, expires_at
+        self.responses.extend([None] * (allocated - size))
+
+    def add(self, embedding: np.ndarray, response: Dict, expires_at: float) -> None:
+        slot = self.head
+        if slot == self.matrix.shape[0]:
+            self._grow()
+        self.matrix[slot] = embedding
+        self.expires_at[slot] = expires_at
+        self.responses[slot] = response
+        self.head = (slot + 1) % self.capacity
+
+    def best_match(self, query_embedding: np.ndarray, now: float):
+        live = self.expires_at > now
+        if not live.any():
+            return None, 0.0
+        similarities = self.matrix @ query_embedding
+        similarities[~live] = -np.inf
+        slot = int(np.argmax(similarities))
+        return self.responses[slot], float(similarities[slot])
+
+    def expire(self, now: float) -> int:
+        stale = (self.expires_at > 0) & (self.expires_at <= now)
+        for slot in np.flatnonzero(stale):
+            self.responses[slot] = None
+        self.expires_at[stale] = 0.0
+        return int(stale.sum())
+
+    def live_count(self, now: float) -> int:
+        return int((self.expires_at > now).sum())
+
+
+def _normalize(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    return vec / (np.linalg.norm(vec) + 1e-8)
+
 
 class SemanticCache:
-    def __init__(self, ttl_seconds: int = 300, similarity_threshold: float = 0.90, cache_dir: str = "./cache"):
+    def __init__(self, ttl_seconds: int = 300, similarity_threshold: float = 0.90, cache_dir: str = "./cache", max_entries_per_url: int = 100, compaction_interval: int = 600):
         self.ttl_seconds = ttl_seconds
         self.similarity_threshold = similarity_threshold
+        self.max_entries_per_url = max_entries_per_url
+        self.compaction_interval = compaction_interval
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache: Dict[str, Dict] = {}
+        self.cache: Dict[str, _UrlCacheBucket] = {}
+        self._pending: deque = deque(maxlen=max_entries_per_url * 64)
         self.lock = threading.RLock()
-        self._cleanup_expired_on_startup()
+        self.store = get_semantic_cache_store(str(self.cache_dir / "semantic_cache.db"))
+        self.store.maybe_compact(self.compaction_interval)
         logger.info(f"[SemanticCache] Initialized with TTL={ttl_seconds}s, cache_dir={cache_dir}")
     
-    def _get_request_cache_path(self, request_id: str) -> Path:
-        return self.cache_dir / f"cache_{request_id}.pkl"
-    
-    def _cleanup_expired_on_startup(self):
-        if not self.cache_dir.exists():
-            return
-        current_time = time.time()
-        expired_count = 0
-        for cache_file in self.cache_dir.glob("cache_*.pkl"):
-            try:
-                file_age = current_time - os.path.getmtime(cache_file)
-                if file_age > self.ttl_seconds:
-                    cache_file.unlink()
-                    expired_count += 1
-                    request_id = cache_file.stem.replace("cache_", "")
-                    logger.info(f"[SemanticCache] Removed expired cache: {request_id}")
-            except Exception as e:
-                logger.warning(f"[SemanticCache] Failed to cleanup {cache_file}: {e}")
-        if expired_count > 0:
-            logger.info(f"[SemanticCache] Cleaned up {expired_count} expired cache file(s) on startup")
-    
     def _cleanup_runtime(self):
         with self.lock:
             current_time = time.time()
             expired_urls = []
-            for url, url_cache in self.cache.items():
-                expired_keys = [
-                    key for key, entry in url_cache.items()
-                    if current_time - entry["created_at"] > self.ttl_seconds
-                ]
-                for key in expired_keys:
-                    del url_cache[key]
-                if not url_cache:
+            for url, bucket in self.cache.items():
+                bucket.expire(current_time)
+                if bucket.live_count(current_time) == 0:
                     expired_urls.append(url)
             for url in expired_urls:
                 del self.cache[url]
             if expired_urls:
                 logger.debug(f"[SemanticCache] Cleaned up {len(expired_urls)} expired URL entries")
     
+    def _add_to_bucket(self, url: str, query_emb: np.ndarray, response: Dict, expires_at: float) -> None:
+        bucket = self.cache.get(url)
+        if bucket is None or bucket.matrix.shape[1] != query_emb.shape[0]:
+            bucket = _UrlCacheBucket(query_emb.shape[0], self.max_entries_per_url)
+            self.cache[url] = bucket
+        bucket.add(query_emb, response, expires_at)
+    
     def load_for_request(self, request_id: str) -> bool:
-        cache_path = self._get_request_cache_path(request_id)
-        if not cache_path.exists():
-            logger.debug(f"[SemanticCache] No cache found for request {request_id}")
-            return False
         try:
-            with open(cache_path, 'rb') as f:
-                self.cache = pickle.load(f)
-            self._cleanup_runtime()
-            logger.info(f"[SemanticCache] Loaded cache for request {request_id}")
+            loaded = 0
+            with self.lock:
+                self.cache.clear()
+                self._pending.clear()
+                for url, query_emb, response, expires_at in self.store.load(request_id):
+                    self._add_to_bucket(url, query_emb, response, expires_at)
+                    loaded += 1
+            if not loaded:
+                logger.debug(f"[SemanticCache] No cache found for request {request_id}")
+                return False
+            logger.info(f"[SemanticCache] Loaded {loaded} cache entries for request {request_id}")
             return True
         except Exception as e:
             logger.error(f"[SemanticCache] Failed to load cache for {request_id}: {e}")
             return False
     
     def save_for_request(self, request_id: str) -> bool:
-        cache_path = self._get_request_cache_path(request_id)
         try:
             with self.lock:
-                with open(cache_path, 'wb') as f:
-                    pickle.dump(self.cache, f)
-            logger.info(f"[SemanticCache] Saved cache for request {request_id}")
+                rows = list(self._pending)
+                self._pending.clear()
+            written = self.store.append(request_id, rows)
+            self.store.maybe_compact(self.compaction_interval)
+            logger.info(f"[SemanticCache] Appended {written} cache entries for request {request_id}")
             return True
         except Exception as e:
             logger.error(f"[SemanticCache] Failed to save cache for {request_id}: {e}")
@@ -86,54 +135,32 @@ class SemanticCache:
     
     def get(self, url: str, query_embedding: np.ndarray) -> Optional[Dict]:
         with self.lock:
-            if url not in self.cache:
+            bucket = self.cache.get(url)
+            if bucket is None:
                 return None
-            url_cache = self.cache[url]
-            current_time = time.time()
-            best_match = None
-            best_similarity = 0.0
-            expired_keys = []
-            for cache_key, cache_entry in url_cache.items():
-                age = current_time - cache_entry["created_at"]
-                if age > self.ttl_seconds:
-                    expired_keys.append(cache_key)
-                    continue
-                cached_emb = np.array(cache_entry["query_embedding"], dtype=np.float32)
-                query_emb = np.array(query_embedding, dtype=np.float32)
-                cached_emb = cached_emb / (np.linalg.norm(cached_emb) + 1e-8)
-                query_emb = query_emb / (np.linalg.norm(query_emb) + 1e-8)
-                similarity = float(np.dot(cached_emb, query_emb))
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = cache_entry
-            for key in expired_keys:
-                del url_cache[key]
-            if best_similarity >= self.similarity_threshold and best_match:
+            query_emb = _normalize(query_embedding)
+            if query_emb.shape[0] != bucket.matrix.shape[1]:
+                return None
+            response, best_similarity = bucket.best_match(query_emb, time.time())
+            if response is not None and best_similarity >= self.similarity_threshold:
                 logger.debug(f"[SemanticCache] HIT for {url} (similarity: {best_similarity:.3f})")
-                return best_match["response"]
+                return response
             return None
     
     def set(self, url: str, query_embedding: np.ndarray, response: Dict) -> None:
         with self.lock:
-            if url not in self.cache:
-                self.cache[url] = {}
-            cache_key = hash(query_embedding.tobytes()) % (2**31)
-            self.cache[url][cache_key] = {
-                "query_embedding": query_embedding.tolist() if isinstance(query_embedding, np.ndarray) else query_embedding,
-                "response": response,
-                "created_at": time.time()
-            }
-            if len(self.cache[url]) > 100:
-                oldest_key = min(self.cache[url].keys(), key=lambda k: self.cache[url][k]["created_at"])
-                del self.cache[url][oldest_key]
+            query_emb = _normalize(query_embedding)
+            created_at = time.time()
+            expires_at = created_at + self.ttl_seconds
+            self._add_to_bucket(url, query_emb, response, expires_at)
+            self._pending.append((url, query_emb, response, created_at, expires_at))
     
     def clear_request(self, request_id: str) -> bool:
-        cache_path = self._get_request_cache_path(request_id)
         try:
-            if cache_path.exists():
-                cache_path.unlink()
+            self.store.delete_request(request_id)
             with self.lock:
                 self.cache.clear()
+                self._pending.clear()
             logger.info(f"[SemanticCache] Cleared cache for request {request_id}")
             return True
         except Exception as e:
@@ -142,12 +169,14 @@ class SemanticCache:
     
     def get_stats(self) -> Dict:
         with self.lock:
-            total_entries = sum(len(v) for v in self.cache.values())
-            cache_files = len(list(self.cache_dir.glob("cache_*.pkl")))
-            return {
-                "cached_urls": len(self.cache),
-                "total_entries": total_entries,
-                "cache_files_on_disk": cache_files,
-                "ttl_seconds": self.ttl_seconds,
-                "similarity_threshold": self.similarity_threshold
-            }
+            current_time = time.time()
+            total_entries = sum(bucket.live_count(current_time) for bucket in self.cache.values())
+            pending_entries = len(self._pending)
+        return {
+            "cached_urls": len(self.cache),
+            "total_entries": total_entries,
+            "pending_entries": pending_entries,
+            "rows_on_disk": self.store.row_count(),
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold
+        }
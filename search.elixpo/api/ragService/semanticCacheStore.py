@@ -0,0 +1,117 @@
+from pathlib import Path
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+from loguru import logger
+import numpy as np
+
+_shared_stores: Dict[str, "SemanticCacheStore"] = {}
+_shared_stores_lock = threading.Lock()
+
+
+class SemanticCacheStore:
+    """Append-only SQLite (WAL) store shared by every request's semantic cache."""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_cache_request ON semantic_cache(request_id, expires_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_cache_expires ON semantic_cache(expires_at)")
+        self.conn.commit()
+        self._last_compaction = 0.0
+
+    def append(self, request_id: str, rows: List[Tuple[str, np.ndarray, Dict, float, float]]) -> int:
+        if not rows:
+            return 0
+        payload = [
+            (request_id, url, np.asarray(emb, dtype=np.float32).tobytes(),
+             pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL), created_at, expires_at)
+            for url, emb, response, created_at, expires_at in rows
+        ]
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO semantic_cache (request_id, url, embedding, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    payload
+                )
+        return len(payload)
+
+    def load(self, request_id: str, now: float = None) -> Iterator[Tuple[str, np.ndarray, Dict, float]]:
+        now = time.time() if now is None else now
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, embedding, response, expires_at FROM semantic_cache "
+                "WHERE request_id = ? AND expires_at > ? ORDER BY id",
+                (request_id, now)
+            ).fetchall()
+        for url, emb_blob, response_blob, expires_at in rows:
+            try:
+                yield url, np.frombuffer(emb_blob, dtype=np.float32), pickle.loads(response_blob), expires_at
+            except Exception as e:
+                logger.warning(f"[SemanticCacheStore] Skipping unreadable row for {request_id}: {e}")
+
+    def delete_request(self, request_id: str) -> int:
+        with self.lock:
+            with self.conn:
+                cursor = self.conn.execute("DELETE FROM semantic_cache WHERE request_id = ?", (request_id,))
+        return cursor.rowcount
+
+    def compact(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        with self.lock:
+            with self.conn:
+                cursor = self.conn.execute("DELETE FROM semantic_cache WHERE expires_at <= ?", (now,))
+            removed = cursor.rowcount
+            if removed:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if removed:
+            logger.info(f"[SemanticCacheStore] Compacted {removed} expired row(s)")
+        return removed
+
+    def maybe_compact(self, interval_seconds: float) -> int:
+        now = time.time()
+        if now - self._last_compaction < interval_seconds:
+            return 0
+        self._last_compaction = now
+        return self.compact(now)
+
+    def row_count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def get_semantic_cache_store(db_path: str) -> SemanticCacheStore:
+    key = str(Path(db_path).resolve())
+    store = _shared_stores.get(key)
+    if store is not None:
+        return store
+    with _shared_stores_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = SemanticCacheStore(key)
+            _shared_stores[key] = store
+        return store
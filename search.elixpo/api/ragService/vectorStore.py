@@ -2,10 +2,20 @@ from loguru import logger
 import torch
 import chromadb
 from pathlib import Path
+import hashlib
+import json
+import queue
+from collections import deque
 import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-from pipeline.config import EMBEDDING_DIMENSION
-from typing import List, Dict
+from pipeline.config import (EMBEDDING_DIMENSION, VECTOR_STORE_WRITE_COALESCE_MS, VECTOR_STORE_WRITE_MAX_CHUNKS,
+                             VECTOR_STORE_MAX_AGE_SECONDS, VECTOR_STORE_MAX_CHUNKS, VECTOR_STORE_COMPACTION_BATCH,
+                             VECTOR_STORE_MAINTENANCE_BUDGET_SECONDS, VECTOR_STORE_SIZE_HISTORY)
+from commons.minimal import normalize_url
+from ragService.bm25Index import BM25Index
+from typing import Iterable, List, Dict, Optional, Set, Tuple, Union
 from datetime import datetime
 import os
 from chromadb.telemetry.product import ProductTelemetryClient, ProductTelemetryEvent
@@ -18,8 +28,35 @@ class NoOpProductTelemetry(ProductTelemetryClient):
         return
 
 
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def chunk_id_for(url: str, text: str) -> str:
+    """Stable chunk id: the same text from the same (normalized) URL always maps to the same id."""
+    return hashlib.blake2b(f"{normalize_url(url)}\n{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
 class VectorStore:
-    def __init__(self, embedding_dim: int = None, embeddings_dir: str = "./embeddings"):
+    """Chroma-backed chunk store.
+
+    Searches go straight to the collection and never take a lock. All writes
+    are queued to one background writer that coalesces concurrent
+    ``add_chunks`` calls into a single upsert and applies prunes in order.
+    ``self.lock`` only guards the URL freshness index and counters.
+
+    The writer also maintains ``self.lexical``, a BM25 index over the same
+    chunk texts, updated on every add and delete, for ``lexical_search``. At
+    startup it is rebuilt from the collection on a separate loader thread.
+
+    ``run_maintenance`` enforces retention in small writer batches: URLs past
+    the max age are dropped, least recently hit URLs are evicted above the
+    chunk cap, and chunks with no URL entry are swept by their timestamp.
+    """
+
+    def __init__(self, embedding_dim: int = None, embeddings_dir: str = "./embeddings",
+                 write_coalesce_ms: float = VECTOR_STORE_WRITE_COALESCE_MS,
+                 write_max_chunks: int = VECTOR_STORE_WRITE_MAX_CHUNKS):
         if embedding_dim is None:
             embedding_dim = EMBEDDING_DIMENSION
         self.embedding_dim = embedding_dim
@@ -49,84 +86,430 @@ class VectorStore:
         
         self.chunk_count = 0
         self.lock = threading.RLock()
+        self.upserted = 0
+        self.deduplicated = 0
+        self.stale_removed = 0
+        self.write_batches = 0
+        self.expired_urls = 0
+        self.evicted_urls = 0
+        self.swept_chunks = 0
+        self._sweep_offset = 0
+        self.size_history = deque(maxlen=VECTOR_STORE_SIZE_HISTORY)
+        self.write_coalesce_ms = write_coalesce_ms
+        self.write_max_chunks = write_max_chunks
+        self._write_queue: "queue.Queue[Optional[Tuple[str, tuple, Future]]]" = queue.Queue()
         
         self.metadata_path = os.path.join(embeddings_dir, "metadata.json")
+        self.url_index: Dict[str, Dict] = {}
+        self._url_index_dirty = False
+        self.lexical = BM25Index()
         
         self._load_from_disk()
+        self._writer = threading.Thread(target=self._writer_loop, name="vector-store-writer", daemon=True)
+        self._writer.start()
+        self._lexical_loader = threading.Thread(target=self._reindex_lexical, name="vector-store-lexical-load", daemon=True)
+        self._lexical_loader.start()
+        self._record_size()
         logger.info(f"[VectorStore] Initialized with {self.chunk_count} chunks on {self.device}")
     
-    def add_chunks(self, chunks: List[Dict]) -> None:
-        with self.lock:
-            ids = []
-            embeddings = []
-            documents = []
-            metadatas = []
+    def add_chunks(self, chunks: List[Dict], wait: bool = True) -> Union[int, Future]:
+        """Queue chunks for upsert under content-derived ids; chunks already stored are skipped.
+
+        With ``wait`` the call returns how many were new once they are searchable,
+        otherwise it returns the pending Future.
+        """
+        ids = []
+        embeddings = []
+        documents = []
+        metadatas = []
+        seen = set()
+        
+        for chunk in chunks:
+            chunk_id = chunk.get("id") or chunk_id_for(chunk["url"], chunk["text"])
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            emb = chunk["embedding"]
+            if isinstance(emb, list):
+                emb = np.array(emb, dtype=np.float32)
+            elif isinstance(emb, torch.Tensor):
+                emb = emb.cpu().numpy().astype(np.float32)
+            else:
+                emb = np.array(emb, dtype=np.float32)
             
-            for i, chunk in enumerate(chunks):
-                emb = chunk["embedding"]
-                if isinstance(emb, list):
-                    emb = np.array(emb, dtype=np.float32)
-                elif isinstance(emb, torch.Tensor):
-                    emb = emb.cpu().numpy().astype(np.float32)
-                else:
-                    emb = np.array(emb, dtype=np.float32)
-                
-                emb = emb / (np.linalg.norm(emb) + 1e-8)
-                
-                chunk_id = str(self.chunk_count + i)
-                ids.append(chunk_id)
-                embeddings.append(emb.tolist())
-                documents.append(chunk["text"])
-                metadatas.append({
-                    "url": chunk["url"],
-                    "chunk_id": chunk.get("chunk_id", chunk_id),
-                    "timestamp": chunk.get("timestamp", datetime.now().isoformat())
-                })
-                self.chunk_count += 1
+            emb = emb / (np.linalg.norm(emb) + 1e-8)
             
+            ids.append(chunk_id)
+            embeddings.append(emb.tolist())
+            documents.append(chunk["text"])
+            metadatas.append({
+                "url": chunk["url"],
+                "url_key": normalize_url(chunk["url"]),
+                "chunk_id": chunk.get("chunk_id", chunk_id),
+                "timestamp": chunk.get("timestamp", datetime.now().isoformat()),
+                "ingested_at": time.time()
+            })
+        
+        future = self._submit("add", (ids, embeddings, documents, metadatas))
+        return future.result() if wait else future
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every write queued before this call has been applied."""
+        self._submit("flush", ()).result(timeout=timeout)
+    
+    def close(self) -> None:
+        self.flush()
+        self._write_queue.put(None)
+        self._writer.join()
+    
+    def _submit(self, kind: str, payload: tuple) -> Future:
+        future = Future()
+        self._write_queue.put((kind, payload, future))
+        return future
+    
+    def _writer_loop(self) -> None:
+        while True:
+            op = self._write_queue.get()
+            if op is None:
+                return
+            batch = [op]
+            pending_chunks = len(op[1][0]) if op[0] == "add" else 0
+            deadline = time.monotonic() + self.write_coalesce_ms / 1000.0
+            while pending_chunks < self.write_max_chunks:
+                try:
+                    op = self._write_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._write_queue.put(None)
+                    break
+                batch.append(op)
+                if op[0] == "add":
+                    pending_chunks += len(op[1][0])
+            
+            adds = []
+            for kind, payload, future in batch:
+                if kind == "add":
+                    adds.append((payload, future))
+                    continue
+                self._apply_adds(adds)
+                adds = []
+                try:
+                    if kind == "prune":
+                        future.set_result(self._prune(*payload))
+                    elif kind == "drop_urls":
+                        future.set_result(self._drop_urls(*payload))
+                    elif kind == "delete":
+                        future.set_result(self._delete(*payload))
+                    else:
+                        future.set_result(None)
+                except Exception as e:
+                    future.set_exception(e)
+            self._apply_adds(adds)
+    
+    def _apply_adds(self, adds: List[Tuple[tuple, Future]]) -> None:
+        if not adds:
+            return
+        rows: Dict[str, tuple] = {}
+        owners = []
+        for (ids, embeddings, documents, metadatas), _ in adds:
+            claimed = []
+            for i, chunk_id in enumerate(ids):
+                if chunk_id not in rows:
+                    rows[chunk_id] = (embeddings[i], documents[i], metadatas[i])
+                    claimed.append(chunk_id)
+            owners.append(claimed)
+        try:
+            existing = self.existing_ids(list(rows))
+            new_ids = [chunk_id for chunk_id in rows if chunk_id not in existing]
+            if new_ids:
+                self.collection.upsert(
+                    ids=new_ids,
+                    embeddings=[rows[chunk_id][0] for chunk_id in new_ids],
+                    documents=[rows[chunk_id][1] for chunk_id in new_ids],
+                    metadatas=[rows[chunk_id][2] for chunk_id in new_ids]
+                )
+                self.chunk_count = self.collection.count()
+                self.lexical.add_many((chunk_id, rows[chunk_id][1]) for chunk_id in new_ids)
+        except Exception as e:
+            logger.error(f"[VectorStore] Batched upsert of {len(rows)} chunk(s) failed: {e}")
+            for _, future in adds:
+                future.set_exception(e)
+            return
+        with self.lock:
+            self.upserted += len(new_ids)
+            self.deduplicated += sum(len(payload[0]) for payload, _ in adds) - len(new_ids)
+            self.write_batches += 1
+        for claimed, (_, future) in zip(owners, adds):
+            future.set_result(sum(1 for chunk_id in claimed if chunk_id not in existing))
+    
+    def existing_ids(self, ids: List[str]) -> Set[str]:
+        if not ids:
+            return set()
+        return set(self.collection.get(ids=list(ids), include=[])["ids"])
+    
+    def prune_url(self, url: str, keep_ids: Iterable[str], wait: bool = True) -> Union[int, Future]:
+        """Delete chunks stored for ``url`` that are not in ``keep_ids`` (content that changed since the last ingest)."""
+        future = self._submit("prune", (url, set(keep_ids)))
+        return future.result() if wait else future
+    
+    def _prune(self, url: str, keep: Set[str]) -> int:
+        stored = self.collection.get(where={"url_key": normalize_url(url)}, include=[])["ids"]
+        stale = [chunk_id for chunk_id in stored if chunk_id not in keep]
+        if stale:
+            self.collection.delete(ids=stale)
+            self.lexical.remove(stale)
+            self.chunk_count = self.collection.count()
+            with self.lock:
+                self.stale_removed += len(stale)
+            logger.info(f"[VectorStore] Removed {len(stale)} stale chunk(s) for {url}")
+        return len(stale)
+    
+    def _drop_urls(self, url_keys: List[str], cutoff: Optional[float] = None) -> int:
+        removed = 0
+        for url_key in url_keys:
+            with self.lock:
+                entry = self.url_index.get(url_key)
+                # An ingest may have refreshed the URL since it was picked for expiry
+                if cutoff is not None and entry is not None and entry["ingested_at"] >= cutoff:
+                    continue
+                self.url_index.pop(url_key, None)
+                self._url_index_dirty = True
+            ids = self.collection.get(where={"url_key": url_key}, include=[])["ids"]
             if ids:
-                self.collection.add(
-                    ids=ids,
-                    embeddings=embeddings,
-                    documents=documents,
-                    metadatas=metadatas
+                self.collection.delete(ids=ids)
+                self.lexical.remove(ids)
+                removed += len(ids)
+        if removed:
+            self.chunk_count = self.collection.count()
+        return removed
+    
+    def _delete(self, ids: List[str]) -> int:
+        if ids:
+            self.collection.delete(ids=ids)
+            self.lexical.remove(ids)
+            self.chunk_count = self.collection.count()
+        return len(ids)
+    
+    def _lexical_pages(self, page_size: int):
+        offset = 0
+        while True:
+            page = self.collection.get(limit=page_size, offset=offset, include=["documents"])
+            yield zip(page["ids"], page["documents"])
+            offset += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                return
+    
+    def _reindex_lexical(self, page_size: int = 2000) -> int:
+        """Build the lexical index from the collection on its own thread, so the
+        writer keeps applying adds and deletes (which the index also sees) meanwhile."""
+        started = time.monotonic()
+        try:
+            loaded = self.lexical.load(self._lexical_pages(page_size))
+        except Exception as e:
+            logger.error(f"[VectorStore] Lexical index build failed: {e}")
+            return 0
+        if loaded:
+            logger.info(f"[VectorStore] Built lexical index over {loaded} chunks in {time.monotonic() - started:.1f}s")
+        return loaded
+    
+    def run_maintenance(self, max_age_seconds: float = VECTOR_STORE_MAX_AGE_SECONDS, max_chunks: int = VECTOR_STORE_MAX_CHUNKS,
+                        batch_size: int = VECTOR_STORE_COMPACTION_BATCH,
+                        time_budget_seconds: float = VECTOR_STORE_MAINTENANCE_BUDGET_SECONDS) -> Dict:
+        """Apply the retention policies in writer batches until done or out of time, then record the index size."""
+        started = time.monotonic()
+        now = time.time()
+        cutoff = now - max_age_seconds
+        report = {"expired_urls": 0, "evicted_urls": 0, "swept_chunks": 0, "chunks_removed": 0}
+        
+        with self.lock:
+            expired = [key for key, entry in self.url_index.items() if entry["ingested_at"] < cutoff]
+        for keys in self._url_batches(expired, batch_size):
+            if time.monotonic() - started > time_budget_seconds:
+                break
+            report["chunks_removed"] += self._submit("drop_urls", (keys, cutoff)).result()
+            report["expired_urls"] += len(keys)
+        
+        if self.chunk_count > max_chunks:
+            target = int(max_chunks * 0.9)
+            with self.lock:
+                by_recency = sorted(
+                    self.url_index.items(),
+                    key=lambda item: max(item[1]["ingested_at"], item[1].get("last_hit", 0.0))
                 )
+            excess = self.chunk_count - target
+            victims, planned = [], 0
+            for key, entry in by_recency:
+                if planned >= excess:
+                    break
+                victims.append(key)
+                planned += entry.get("chunks", 0)
+            for keys in self._url_batches(victims, batch_size):
+                if time.monotonic() - started > time_budget_seconds:
+                    break
+                report["chunks_removed"] += self._submit("drop_urls", (keys,)).result()
+                report["evicted_urls"] += len(keys)
+        
+        while time.monotonic() - started <= time_budget_seconds:
+            swept, done = self._sweep_batch(cutoff, batch_size)
+            report["swept_chunks"] += swept
+            if done:
+                break
+        report["chunks_removed"] += report["swept_chunks"]
+        
+        with self.lock:
+            self.expired_urls += report["expired_urls"]
+            self.evicted_urls += report["evicted_urls"]
+            self.swept_chunks += report["swept_chunks"]
+        self._record_size()
+        report["seconds"] = round(time.monotonic() - started, 3)
+        if report["chunks_removed"]:
+            logger.info(f"[VectorStore] Maintenance removed {report['chunks_removed']} chunk(s): {report}")
+        return report
     
-    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+    def _url_batches(self, url_keys: List[str], batch_size: int) -> Iterable[List[str]]:
+        """Group URLs so each writer op deletes roughly ``batch_size`` chunks."""
+        batch, planned = [], 0
+        for url_key in url_keys:
+            with self.lock:
+                planned += self.url_index.get(url_key, {}).get("chunks", 1)
+            batch.append(url_key)
+            if planned >= batch_size:
+                yield batch
+                batch, planned = [], 0
+        if batch:
+            yield batch
+    
+    def _sweep_batch(self, cutoff: float, batch_size: int) -> Tuple[int, bool]:
+        """Scan one page of the collection and delete expired chunks whose URL is no longer indexed.
+
+        Returns ``(deleted, sweep_finished)``; the scan position carries over between passes.
+        """
+        page = self.collection.get(limit=batch_size, offset=self._sweep_offset, include=["metadatas"])
+        stale = []
         with self.lock:
-            if isinstance(query_embedding, torch.Tensor):
-                query_embedding = query_embedding.cpu().numpy().astype(np.float32)
-            else:
-                query_embedding = np.array(query_embedding, dtype=np.float32)
-            
-            query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-8)
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=min(top_k, self.chunk_count if self.chunk_count > 0 else 1)
-            )
-            
-            output = []
-            if results["ids"] and len(results["ids"]) > 0:
-                for i, (doc_id, distance, metadata, document) in enumerate(
-                    zip(results["ids"][0], 
-                        results["distances"][0], 
-                        results["metadatas"][0], 
-                        results["documents"][0])
-                ):
-                    output.append({
-                        "score": float(1 - distance),  # Convert distance to similarity
-                        "metadata": {
-                            **metadata,
-                            "text": document
-                        }
-                    })
-            
-            return output
+            for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                url_key = metadata.get("url_key") or normalize_url(metadata.get("url", ""))
+                if url_key in self.url_index:
+                    continue
+                ingested_at = metadata.get("ingested_at")
+                if ingested_at is None:
+                    try:
+                        ingested_at = datetime.fromisoformat(metadata["timestamp"]).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        ingested_at = 0.0
+                if ingested_at < cutoff:
+                    stale.append(chunk_id)
+        if stale:
+            self._submit("delete", (stale,)).result()
+        finished = len(page["ids"]) < batch_size
+        self._sweep_offset = 0 if finished else self._sweep_offset + len(page["ids"]) - len(stale)
+        return len(stale), finished
+    
+    def _record_size(self) -> None:
+        disk_bytes = 0
+        for root, _, files in os.walk(self.embeddings_dir):
+            for name in files:
+                try:
+                    disk_bytes += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        with self.lock:
+            self.size_history.append({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "chunks": self.chunk_count,
+                "urls": len(self.url_index),
+                "disk_bytes": disk_bytes
+            })
+    
+    def _record_hits(self, metadatas: List[Dict]) -> None:
+        now = time.time()
+        with self.lock:
+            for metadata in metadatas:
+                metadata = metadata or {}
+                entry = self.url_index.get(metadata.get("url_key") or normalize_url(metadata.get("url", "")))
+                if entry is not None:
+                    entry["last_hit"] = now
+                    entry["hits"] = entry.get("hits", 0) + 1
+                    self._url_index_dirty = True
+    
+    def get_url_entry(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            entry = self.url_index.get(normalize_url(url))
+            return dict(entry) if entry else None
+    
+    def record_url(self, url: str, doc_hash: str, chunk_count: int) -> None:
+        with self.lock:
+            previous = self.url_index.get(normalize_url(url), {})
+            self.url_index[normalize_url(url)] = {
+                "ingested_at": time.time(),
+                "content_hash": doc_hash,
+                "chunks": chunk_count,
+                "last_hit": previous.get("last_hit", 0.0),
+                "hits": previous.get("hits", 0)
+            }
+            self._url_index_dirty = True
+    
+    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+        if isinstance(query_embedding, torch.Tensor):
+            query_embedding = query_embedding.cpu().numpy().astype(np.float32)
+        else:
+            query_embedding = np.array(query_embedding, dtype=np.float32)
+        
+        query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-8)
+        
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=min(top_k, self.chunk_count if self.chunk_count > 0 else 1)
+        )
+        
+        output = []
+        if results["ids"] and len(results["ids"]) > 0:
+            self._record_hits(results["metadatas"][0])
+            for i, (doc_id, distance, metadata, document) in enumerate(
+                zip(results["ids"][0], 
+                    results["distances"][0], 
+                    results["metadatas"][0], 
+                    results["documents"][0])
+            ):
+                output.append({
+                    "id": doc_id,
+                    "score": float(1 - distance),  # Convert distance to similarity
+                    "metadata": {
+                        **metadata,
+                        "text": document
+                    }
+                })
+        
+        return output
+    
+    def lexical_search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """BM25 search over chunk texts; results have the same shape as ``search`` with BM25 scores."""
+        hits = self.lexical.search(query, top_k=top_k)
+        if not hits:
+            return []
+        found = self.collection.get(ids=[doc_id for doc_id, _ in hits], include=["documents", "metadatas"])
+        rows = {doc_id: (document, metadata) for doc_id, document, metadata
+                in zip(found["ids"], found["documents"], found["metadatas"])}
+        output = []
+        for doc_id, score in hits:
+            if doc_id not in rows:
+                continue
+            document, metadata = rows[doc_id]
+            output.append({"id": doc_id, "score": score, "metadata": {**(metadata or {}), "text": document}})
+        self._record_hits([result["metadata"] for result in output])
+        return output
     
     def persist_to_disk(self) -> None:
         with self.lock:
             try:
+                if self._url_index_dirty:
+                    tmp_path = f"{self.metadata_path}.tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump({"url_index": self.url_index}, f)
+                    os.replace(tmp_path, self.metadata_path)
+                    self._url_index_dirty = False
                 logger.info(f"[VectorStore] Data auto-persisted by ChromaDB to {self.embeddings_dir}")
             except Exception as e:
                 logger.error(f"[VectorStore] Failed to persist: {e}")
@@ -140,56 +523,76 @@ class VectorStore:
         except Exception as e:
             logger.warning(f"[VectorStore] Could not load from disk: {e}")
             self.chunk_count = 0
+        try:
+            if os.path.exists(self.metadata_path):
+                with open(self.metadata_path) as f:
+                    self.url_index = json.load(f).get("url_index", {})
+                logger.info(f"[VectorStore] Loaded freshness index for {len(self.url_index)} URL(s)")
+        except Exception as e:
+            logger.warning(f"[VectorStore] Could not load URL freshness index: {e}")
+            self.url_index = {}
     
     def get_stats(self) -> Dict:
         with self.lock:
             return {
                 "total_chunks": self.chunk_count,
+                "indexed_urls": len(self.url_index),
+                "chunks_upserted": self.upserted,
+                "chunks_deduplicated": self.deduplicated,
+                "stale_chunks_removed": self.stale_removed,
+                "write_batches": self.write_batches,
+                "queued_writes": self._write_queue.qsize(),
+                "expired_urls": self.expired_urls,
+                "evicted_urls": self.evicted_urls,
+                "swept_chunks": self.swept_chunks,
+                "disk_bytes": self.size_history[-1]["disk_bytes"] if self.size_history else None,
+                "size_history": list(self.size_history),
+                "lexical_index": self.lexical.get_stats(),
                 "device": self.device,
                 "embedding_dim": self.embedding_dim
             }
     
     def search_with_cache_check(self, query_embedding: np.ndarray, top_k: int = 5, cache_similarity_threshold: float = 0.85) -> Dict:
-        with self.lock:
-            if isinstance(query_embedding, torch.Tensor):
-                query_embedding = query_embedding.cpu().numpy().astype(np.float32)
-            else:
-                query_embedding = np.array(query_embedding, dtype=np.float32)
-            
-            query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-8)
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=min(top_k, self.chunk_count if self.chunk_count > 0 else 1)
-            )
-            
-            output = []
-            similarities = []
-            
-            if results["ids"] and len(results["ids"]) > 0:
-                for i, (doc_id, distance, metadata, document) in enumerate(
-                    zip(results["ids"][0], 
-                        results["distances"][0], 
-                        results["metadatas"][0], 
-                        results["documents"][0])
-                ):
-                    similarity = float(1 - distance)
-                    similarities.append(similarity)
-                    output.append({
-                        "score": similarity,
-                        "metadata": {
-                            **metadata,
-                            "text": document
-                        }
-                    })
-            
-            best_match_similarity = similarities[0] if similarities else 0.0
-            avg_similarity = sum(similarities) / len(similarities) if similarities else 0.0
-            cache_hit = best_match_similarity >= cache_similarity_threshold
-            
-            return {
-                'results': output,
-                'cache_hit': cache_hit,
-                'avg_similarity': avg_similarity,
-                'best_match_similarity': best_match_similarity
-            }
+        if isinstance(query_embedding, torch.Tensor):
+            query_embedding = query_embedding.cpu().numpy().astype(np.float32)
+        else:
+            query_embedding = np.array(query_embedding, dtype=np.float32)
+        
+        query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-8)
+        
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=min(top_k, self.chunk_count if self.chunk_count > 0 else 1)
+        )
+        
+        output = []
+        similarities = []
+        
+        if results["ids"] and len(results["ids"]) > 0:
+            self._record_hits(results["metadatas"][0])
+            for i, (doc_id, distance, metadata, document) in enumerate(
+                zip(results["ids"][0], 
+                    results["distances"][0], 
+                    results["metadatas"][0], 
+                    results["documents"][0])
+            ):
+                similarity = float(1 - distance)
+                similarities.append(similarity)
+                output.append({
+                    "score": similarity,
+                    "metadata": {
+                        **metadata,
+                        "text": document
+                    }
+                })
+        
+        best_match_similarity = similarities[0] if similarities else 0.0
+        avg_similarity = sum(similarities) / len(similarities) if similarities else 0.0
+        cache_hit = best_match_similarity >= cache_similarity_threshold
+        
+        return {
+            'results': output,
+            'cache_hit': cache_hit,
+            'avg_similarity': avg_similarity,
+            'best_match_similarity': best_match_similarity
+        }
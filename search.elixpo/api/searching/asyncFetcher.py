@@ -0,0 +1,167 @@
+import asyncio
+import codecs
+import re
+import time
+import weakref
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import httpx
+from loguru import logger
+from pipeline.config import (MAX_TOTAL_SCRAPE_WORD_COUNT, FETCH_MAX_CONCURRENCY, FETCH_PER_HOST_CONCURRENCY,
+                             FETCH_TIMEOUT_SECONDS, FETCH_MAX_BYTES, FETCH_WORD_HEADROOM)
+from searching.utils import validate_url_for_fetch
+from searching.htmlExtractor import extract_text
+from commons.urlContentCache import url_content_cache
+
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z0-9]+)[^>]*>|<!--.*?-->", re.S)
+_SKIP_TAGS = {"script", "style", "noscript", "svg", "template"}
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5',
+}
+
+
+class _VisibleWordCounter:
+    """Counts words outside tags and script/style bodies as HTML streams in."""
+
+    def __init__(self):
+        self.words = 0
+        self._pending = ""
+        self._skip_depth = 0
+
+    def feed(self, chunk: str) -> int:
+        data = self._pending + chunk
+        cut = data.rfind("<")
+        if cut != -1 and data.find(">", cut) == -1:
+            data, self._pending = data[:cut], data[cut:]
+        else:
+            self._pending = ""
+        pos = 0
+        for match in _TAG_RE.finditer(data):
+            if not self._skip_depth:
+                self.words += len(data[pos:match.start()].split())
+            tag = (match.group(2) or "").lower()
+            if tag in _SKIP_TAGS:
+                self._skip_depth = max(0, self._skip_depth + (-1 if match.group(1) else 1))
+            pos = match.end()
+        if not self._skip_depth:
+            self.words += len(data[pos:].split())
+        return self.words
+
+
+class AsyncFetcher:
+    """Pooled httpx page fetcher with global and per-host concurrency limits."""
+
+    def __init__(self, max_concurrency: int = FETCH_MAX_CONCURRENCY, per_host_concurrency: int = FETCH_PER_HOST_CONCURRENCY,
+                 timeout: float = FETCH_TIMEOUT_SECONDS, max_bytes: int = FETCH_MAX_BYTES,
+                 url_validator: Callable[[str], bool] = validate_url_for_fetch, use_cache: bool = True):
+        self.per_host_concurrency = per_host_concurrency
+        self.max_bytes = max_bytes
+        self.url_validator = url_validator
+        self.use_cache = use_cache
+        self._global_sem = asyncio.Semaphore(max_concurrency)
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self.client = httpx.AsyncClient(
+            headers=_HEADERS,
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency, keepalive_expiry=30.0),
+        )
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_sems[host] = sem
+        return sem
+
+    async def fetch(self, url: str, word_limit: int = MAX_TOTAL_SCRAPE_WORD_COUNT) -> str:
+        if not self.url_validator(url):
+            logger.error(f"[Fetch] URL validation failed: {url}")
+            return ""
+        if self.use_cache:
+            cached_text = url_content_cache.get(url, word_limit=word_limit)
+            if cached_text is not None:
+                return cached_text
+
+        try:
+            async with self._global_sem, self._host_sem(url):
+                html = await self._stream_html(url, word_limit)
+        except httpx.TimeoutException:
+            logger.error(f"[Fetch] Timeout scraping URL: {url}")
+            return ""
+        except httpx.HTTPError as e:
+            logger.error(f"[Fetch] Request error scraping URL: {url}: {type(e).__name__}: {e}")
+            return ""
+        if not html:
+            return ""
+
+        text = await asyncio.to_thread(extract_text, html, word_limit)
+        if self.use_cache:
+            url_content_cache.set(url, text, word_limit)
+        return text
+
+    async def _stream_html(self, url: str, word_limit: int) -> str:
+        async with self.client.stream("GET", url) as response:
+            if response.status_code != 200:
+                logger.error(f"[FETCH] Error fetching {url}: Status {response.status_code}")
+                return ""
+            content_type = response.headers.get('Content-Type', '').lower()
+            if 'text/html' not in content_type:
+                logger.warning(f"[FETCH] Skipping non-HTML content from {url} (Content-Type: {content_type})")
+                return ""
+
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            counter = _VisibleWordCounter()
+            parts: List[str] = []
+            received = 0
+            word_target = word_limit * FETCH_WORD_HEADROOM
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                text = decoder.decode(chunk)
+                parts.append(text)
+                if counter.feed(text) >= word_target or received >= self.max_bytes:
+                    logger.debug(f"[FETCH] Early stop for {url} after {received} bytes ({counter.words} words)")
+                    break
+            return "".join(parts)
+
+    async def fetch_as_completed(self, urls: List[str], word_limit: int = MAX_TOTAL_SCRAPE_WORD_COUNT,
+                                 deadline: Optional[float] = None) -> AsyncIterator[Tuple[str, str]]:
+        """Yield ``(url, text)`` as each page finishes; pages still running at ``deadline`` seconds are cancelled."""
+        tasks = {asyncio.ensure_future(self.fetch(url, word_limit)): url for url in dict.fromkeys(urls)}
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if stop_at is None else max(0.0, stop_at - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.warning(f"[Fetch] Deadline reached with {len(pending)} URL(s) still loading")
+                    break
+                for task in done:
+                    try:
+                        yield tasks[task], task.result()
+                    except Exception as e:
+                        logger.error(f"[Fetch] Failed fetching {tasks[task]}: {e}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncFetcher]" = weakref.WeakKeyDictionary()
+
+
+def get_async_fetcher() -> AsyncFetcher:
+    """Return the fetcher bound to the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.get(loop)
+    if fetcher is None:
+        fetcher = AsyncFetcher()
+        _fetchers[loop] = fetcher
+    return fetcher
@@ -0,0 +1,197 @@
+import re
+from typing import Callable, Dict, List
+from loguru import logger
+from bs4 import BeautifulSoup
+from pipeline.config import MAX_TOTAL_SCRAPE_WORD_COUNT, HTML_EXTRACTOR_BACKEND
+
+try:
+    from selectolax.parser import HTMLParser
+    _HAS_SELECTOLAX = True
+except ImportError:
+    _HAS_SELECTOLAX = False
+
+try:
+    import lxml.html
+    from lxml import etree
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+BOILERPLATE_TAGS = {'script', 'style', 'nav', 'footer', 'header', 'aside', 'form', 'button', 'noscript', 'iframe', 'svg', 'template', 'head'}
+BLOCK_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'div', 'section', 'article', 'main',
+              'ul', 'ol', 'table', 'tr', 'td', 'th', 'pre', 'br', 'dd', 'dt', 'figcaption'}
+MAIN_CONTENT_TAGS = ['main', 'article', 'div', 'section', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'p']
+MAIN_CONTENT_CLASSES = ['main', 'content', 'article', 'post', 'body', 'main-content', 'entry-content', 'blog-post']
+
+_MAIN_CONTENT_SELECTOR = ", ".join(f"{tag}.{cls}" for tag in MAIN_CONTENT_TAGS for cls in MAIN_CONTENT_CLASSES)
+_MAIN_CONTENT_XPATH = "//*[{}][{}]".format(
+    " or ".join(f"self::{tag}" for tag in MAIN_CONTENT_TAGS),
+    " or ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')" for cls in MAIN_CONTENT_CLASSES),
+)
+_WS_RE = re.compile(r'\s+')
+
+
+class _TextCollector:
+    """Accumulates inline text into blocks and stops once ``word_limit`` words are kept."""
+
+    def __init__(self, word_limit: int):
+        self.word_limit = word_limit
+        self.word_count = 0
+        self.blocks: List[str] = []
+        self._buffer: List[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.word_count >= self.word_limit
+
+    def add(self, text: str) -> None:
+        if text and not self.full:
+            self._buffer.append(text)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        words = _WS_RE.sub(' ', "".join(self._buffer)).split()
+        self._buffer = []
+        words = words[:self.word_limit - self.word_count]
+        if words:
+            self.blocks.append(" ".join(words))
+            self.word_count += len(words)
+
+    def result(self) -> str:
+        self.flush()
+        text_content = '\n\n'.join(self.blocks)
+        if self.full:
+            text_content += '...'
+        return text_content.strip()
+
+
+def _extract_selectolax(html, word_limit: int) -> str:
+    tree = HTMLParser(html)
+    roots = tree.css(_MAIN_CONTENT_SELECTOR) or [tree.body or tree.root]
+    collector = _TextCollector(word_limit)
+    walked = set()
+    for root in roots:
+        if root is None or collector.full:
+            continue
+        ancestor, nested = root.parent, False
+        while ancestor is not None:
+            if ancestor.mem_id in walked:
+                nested = True
+                break
+            ancestor = ancestor.parent
+        if nested:
+            continue
+        walked.add(root.mem_id)
+        stack = [(None, iter([root]))]
+        while stack and not collector.full:
+            node = next(stack[-1][1], None)
+            if node is None:
+                # Only closing a block ends a paragraph; inline tags keep flowing into it
+                if stack.pop()[0] in BLOCK_TAGS:
+                    collector.flush()
+                continue
+            tag = node.tag
+            if tag == '-text':
+                collector.add(node.text_content)
+            elif tag in BOILERPLATE_TAGS or tag.startswith('_') or tag == '!doctype':
+                continue
+            else:
+                if tag in BLOCK_TAGS:
+                    collector.flush()
+                stack.append((tag, node.iter(include_text=True)))
+    return collector.result()
+
+
+def _extract_lxml(html, word_limit: int) -> str:
+    try:
+        doc = lxml.html.fromstring(html)
+    except ValueError:
+        doc = lxml.html.fromstring(html.encode('utf-8') if isinstance(html, str) else html)
+    except etree.ParserError:
+        return ""
+    roots = doc.xpath(_MAIN_CONTENT_XPATH)
+    if roots:
+        root_set = set(roots)
+        roots = [r for r in roots if not any(a in root_set for a in r.iterancestors())]
+    else:
+        body = doc.find('body')
+        roots = [body if body is not None else doc]
+
+    collector = _TextCollector(word_limit)
+    for root in roots:
+        if collector.full:
+            break
+        walker = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+        for event, el in walker:
+            if collector.full:
+                break
+            if event in ("comment", "pi"):
+                collector.add(el.tail)
+                continue
+            tag = el.tag if isinstance(el.tag, str) else None
+            if event == "start":
+                if tag is None or tag in BOILERPLATE_TAGS:
+                    walker.skip_subtree()
+                    continue
+                if tag in BLOCK_TAGS:
+                    collector.flush()
+                collector.add(el.text)
+            else:
+                if tag in BLOCK_TAGS:
+                    collector.flush()
+                if el is not root:
+                    collector.add(el.tail)
+    return collector.result()
+
+
+def _extract_bs4(html, word_limit: int) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'form', 'button', 'noscript', 'iframe', 'svg']):
+        element.extract()
+
+    main_content_elements = soup.find_all(MAIN_CONTENT_TAGS, class_=MAIN_CONTENT_CLASSES)
+    if not main_content_elements:
+        main_content_elements = [soup.find('body')] if soup.find('body') else [soup]
+
+    temp_text = []
+    word_count = 0
+    for main_elem in main_content_elements:
+        if word_count >= word_limit:
+            break
+        for tag in main_elem.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'div']):
+            text = re.sub(r'\s+', ' ', tag.get_text()).strip()
+            if text:
+                words = text.split()
+                words_to_add = words[:word_limit - word_count]
+                if words_to_add:
+                    temp_text.append(" ".join(words_to_add))
+                    word_count += len(words_to_add)
+
+    text_content = '\n\n'.join(temp_text)
+    if word_count >= word_limit:
+        text_content = ' '.join(text_content.split()[:word_limit]) + '...'
+
+    return text_content.strip()
+
+
+EXTRACTORS: Dict[str, Callable] = {"bs4": _extract_bs4}
+if _HAS_LXML:
+    EXTRACTORS["lxml"] = _extract_lxml
+if _HAS_SELECTOLAX:
+    EXTRACTORS["selectolax"] = _extract_selectolax
+
+
+def extract_text(html, word_limit: int = MAX_TOTAL_SCRAPE_WORD_COUNT, backend: str = HTML_EXTRACTOR_BACKEND) -> str:
+    extractor = EXTRACTORS.get(backend)
+    if extractor is None:
+        logger.warning(f"[Extractor] Backend '{backend}' unavailable, using bs4")
+        extractor = _extract_bs4
+    try:
+        return extractor(html, word_limit)
+    except Exception as e:
+        if extractor is _extract_bs4:
+            raise
+        logger.warning(f"[Extractor] {backend} failed ({type(e).__name__}: {e}), falling back to bs4")
+        return _extract_bs4(html, word_limit)
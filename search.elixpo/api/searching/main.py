@@ -1,8 +1,9 @@
+import asyncio
 from typing import List
 from pipeline.config import  RETRIEVAL_TOP_K
+from pipeline.utils import get_ipc_client
 from loguru import logger
-from multiprocessing.managers import BaseManager
-from ragService.embeddingService import EmbeddingService
+from ragService.embeddingService import get_embedding_service
 from ragService.vectorStore import VectorStore
 from ragService.retrievalPipeline import RetrievalPipeline
 from typing import Dict
@@ -14,28 +15,6 @@ _global_vector_store = None
 _global_retrieval_pipeline = None
 
 
-# IPC Client setup for connecting to model_server
-class ModelServerClient(BaseManager):
-    pass
-
-ModelServerClient.register('CoreEmbeddingService')
-
-_model_server = None
-
-def get_model_server():
-    """Lazy connection to the model_server via IPC"""
-    global _model_server
-    if _model_server is None:
-        try:
-            _model_server = ModelServerClient(address=("localhost", 5010), authkey=b"ipcService")
-            _model_server.connect()
-            logger.info("[SEARCH] Connected to model_server via IPC")
-        except Exception as e:
-            logger.error(f"[SEARCH] Failed to connect to model_server: {e}")
-            raise
-    return _model_server
-
-
 def _ensure_retrieval_services():
     global _global_embedding_service, _global_vector_store, _global_retrieval_pipeline
     
@@ -44,7 +23,7 @@ def _ensure_retrieval_services():
             from pipeline.config import EMBEDDING_MODEL, EMBEDDINGS_DIR
             
             logger.info("[SEARCH] Initializing retrieval services...")
-            _global_embedding_service = EmbeddingService(model_name=EMBEDDING_MODEL)
+            _global_embedding_service = get_embedding_service(EMBEDDING_MODEL)
             _global_vector_store = VectorStore(embeddings_dir=EMBEDDINGS_DIR)
             _global_retrieval_pipeline = RetrievalPipeline(
                 _global_embedding_service,
@@ -56,19 +35,18 @@ def _ensure_retrieval_services():
             raise
 
 
-def ingest_url_to_vector_store(url: str) -> Dict:
+async def ingest_url_to_vector_store(url: str) -> Dict:
     try:
-        model_server = get_model_server()
-        core_service = model_server.CoreEmbeddingService()
-        ingest_result = core_service.ingest_url(url)
+        core_service = get_ipc_client().service("CoreEmbeddingService")
+        ingest_result = await core_service.ingest_url(url)
         logger.info(f"[SEARCH] Ingested URL {url} via IPC: {ingest_result}")
         return ingest_result
     except Exception as e:
         logger.error(f"[SEARCH] Failed to ingest URL {url} via IPC: {e}")
         # Fallback to local services if IPC fails
         try:
-            _ensure_retrieval_services()
-            chunk_count = _global_retrieval_pipeline.ingest_url(url, max_words=3000)
+            await asyncio.to_thread(_ensure_retrieval_services)
+            chunk_count = await asyncio.to_thread(_global_retrieval_pipeline.ingest_url, url, max_words=3000)
             return {
                 "success": True,
                 "url": url,
@@ -83,19 +61,18 @@ def ingest_url_to_vector_store(url: str) -> Dict:
             }
 
 
-def retrieve_from_vector_store(query: str, top_k: int = RETRIEVAL_TOP_K) -> List[Dict]:
+async def retrieve_from_vector_store(query: str, top_k: int = RETRIEVAL_TOP_K) -> List[Dict]:
     try:
-        model_server = get_model_server()
-        core_service = model_server.CoreEmbeddingService()
-        results = core_service.retrieve(query, top_k=top_k)
+        core_service = get_ipc_client().service("CoreEmbeddingService")
+        results = await core_service.retrieve(query, top_k=top_k)
         logger.info(f"[SEARCH] Retrieved {len(results)} results via IPC")
         return results
     except Exception as e:
         logger.error(f"[SEARCH] Failed to retrieve via IPC: {e}")
         # Fallback to local services if IPC fails
         try:
-            _ensure_retrieval_services()
-            return _global_retrieval_pipeline.retrieve(query, top_k=top_k)
+            await asyncio.to_thread(_ensure_retrieval_services)
+            return await asyncio.to_thread(_global_retrieval_pipeline.retrieve, query, top_k=top_k)
         except Exception as fallback_e:
             logger.error(f"[SEARCH] Fallback retrieve also failed: {fallback_e}")
             return []
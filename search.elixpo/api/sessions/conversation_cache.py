@@ -14,13 +14,18 @@ from pipeline.config import CACHE_WINDOW_SIZE, CACHE_MAX_ENTRIES, CACHE_TTL_SECO
 logger = logging.getLogger("elixpo")
 
 try:
-    from sentence_transformers import SentenceTransformer
+    from ragService.embeddingService import get_embedding_service
+    from ragService.embeddingMemo import MemoizedEmbedder
     EMBEDDING_AVAILABLE = True
 except ImportError:
     EMBEDDING_AVAILABLE = False
     logger.warning("SentenceTransformer not available for conversation cache embeddings")
 
 
+# On-disk layout of cache_<session>.npz; bump when the arrays or index schema change
+CACHE_FILE_VERSION = 1
+
+
 class ConversationCacheManager:
     def __init__(self, 
                  window_size: int = CACHE_WINDOW_SIZE,
@@ -37,14 +42,15 @@ class ConversationCacheManager:
         self.compression_method = compression_method
         self.similarity_threshold = similarity_threshold
         self.cache_dir = cache_dir
+        self.embedding_model_name = embedding_model
         
         os.makedirs(self.cache_dir, exist_ok=True)
         
         self.embedding_model = None
         if EMBEDDING_AVAILABLE:
             try:
-                self.embedding_model = SentenceTransformer(embedding_model)
-                logger.info(f"[ConversationCache] Loaded embedding model: {embedding_model}")
+                self.embedding_model = MemoizedEmbedder(get_embedding_service(embedding_model), embedding_model)
+                logger.info(f"[ConversationCache] Using shared embedding model: {embedding_model}")
             except Exception as e:
                 logger.warning(f"[ConversationCache] Failed to load embedding model: {e}")
         
@@ -52,6 +58,8 @@ class ConversationCacheManager:
         self.full_cache: Dict[str, dict] = {}
         self.embeddings_cache: Dict[str, np.ndarray] = {}
         self.latest_response: Optional[str] = None
+        # Stacked, unit-normalised embeddings per search scope, rebuilt after the cache changes
+        self._matrices: Dict[bool, Tuple[List[dict], np.ndarray, np.ndarray]] = {}
         
     def add_to_cache(self, query: str, response: str, metadata: Optional[Dict] = None) -> None:
         if len(query) < 10:
@@ -72,8 +80,8 @@ class ConversationCacheManager:
         embedding = None
         if self.embedding_model:
             try:
-                embedding = self.embedding_model.encode(query, convert_to_numpy=True)
-                self.embeddings_cache[entry_id] = embedding
+                embedding = self.embedding_model.embed_single(query)
+                self.embeddings_cache[entry_id] = self._normalize(embedding)
             except Exception as e:
                 logger.warning(f"[ConversationCache] Failed to generate embedding: {e}")
         
@@ -91,6 +99,7 @@ class ConversationCacheManager:
             del self.full_cache[oldest_key]
             if oldest_key in self.embeddings_cache:
                 del self.embeddings_cache[oldest_key]
+        self._matrices.clear()
         
         logger.debug(f"[ConversationCache] Added to cache: {entry_id[:LOG_ENTRY_ID_DISPLAY_SIZE]}... (window size: {len(self.cache_window)}, total: {len(self.full_cache)})")
     
@@ -114,36 +123,25 @@ class ConversationCacheManager:
             return None, 0.0
         
         try:
-            query_embedding = self.embedding_model.encode(query, convert_to_numpy=True)
+            query_embedding = self._normalize(self.embedding_model.embed_single(query))
             
             best_match = None
             best_score = 0.0
             
-            for entry in search_cache:
-                entry_id = entry.get("id")
-                if entry_id not in self.embeddings_cache:
-                    continue
-                
-                if self._is_expired(entry):
-                    continue
-                
-                entry_embedding = self.embeddings_cache[entry_id]
-                similarity = np.dot(query_embedding, entry_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(entry_embedding)
-                )
-                
-                if similarity > best_score:
-                    best_score = similarity
-                    best_match = entry
+            entries, expiries, matrix = self._stacked(use_window)
+            if entries:
+                similarities = matrix @ query_embedding
+                similarities[expiries <= datetime.now().timestamp()] = -np.inf
+                best = int(np.argmax(similarities))
+                if similarities[best] > best_score:
+                    best_score = float(similarities[best])
+                    best_match = entries[best]
             
             if best_match and best_score >= threshold:
                 result_entry = dict(best_match)
                 
                 if not return_compressed and "response_compressed" in result_entry:
-                    result_entry["response"] = self._decompress(
-                        result_entry["response_compressed"],
-                        result_entry.get("compression_method", self.compression_method)
-                    )
+                    result_entry["response"] = self._response_text(result_entry)
                     del result_entry["response_compressed"]
                 
                 logger.info(f"[ConversationCache] Cache HIT - Similarity: {best_score:.3f} (threshold: {threshold})")
@@ -156,6 +154,32 @@ class ConversationCacheManager:
             logger.error(f"[ConversationCache] Query error: {e}")
             return None, 0.0
     
+    def _response_text(self, entry: Dict) -> str:
+        """Plain response for ``entry``; entries loaded from disk only keep the compressed bytes."""
+        if "response" in entry:
+            return entry["response"]
+        if "response_compressed" in entry:
+            return self._decompress(entry["response_compressed"], entry.get("compression_method", self.compression_method))
+        return ""
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        return vector / (np.linalg.norm(vector) + 1e-8)
+    
+    def _stacked(self, use_window: bool) -> Tuple[List[dict], np.ndarray, np.ndarray]:
+        """Entries with embeddings in the search scope, their expiry timestamps and one embedding matrix."""
+        cached = self._matrices.get(use_window)
+        if cached is not None:
+            return cached
+        source = self.cache_window if use_window else self.full_cache.values()
+        entries = [entry for entry in source if entry.get("id") in self.embeddings_cache]
+        expiries = np.array([self._expiry_timestamp(entry) for entry in entries], dtype=np.float64)
+        matrix = (np.stack([self.embeddings_cache[entry["id"]] for entry in entries])
+                  if entries else np.empty((0, 0), dtype=np.float32))
+        self._matrices[use_window] = (entries, expiries, matrix)
+        return self._matrices[use_window]
+    
     def batch_query_cache(self, queries: List[str], use_window: bool = True, top_k: int = 3) -> List[Tuple[Optional[Dict], float]]:
         
         results = []
@@ -172,7 +196,7 @@ class ConversationCacheManager:
         window_text = "## Recent Conversation Context (from cache):\n"
         for i, entry in enumerate(self.cache_window, 1):
             query = entry.get("query", "")[:LOG_MESSAGE_CONTEXT_TRUNCATE]
-            response_preview = entry.get("response", "")[:LOG_MESSAGE_PREVIEW_TRUNCATE]
+            response_preview = self._response_text(entry)[:LOG_MESSAGE_PREVIEW_TRUNCATE]
             window_text += f"\n{i}. Q: {query}\n   A: {response_preview}...\n"
         
         return window_text
@@ -181,6 +205,7 @@ class ConversationCacheManager:
         self.cache_window.clear()
         self.full_cache.clear()
         self.embeddings_cache.clear()
+        self._matrices.clear()
         self.latest_response = None
         logger.info("[ConversationCache] Cache cleared")
     
@@ -193,10 +218,20 @@ class ConversationCacheManager:
             "ttl_seconds": self.ttl_seconds
         }
     
+    def _cache_file(self, session_id: str) -> str:
+        return os.path.join(self.cache_dir, f"cache_{session_id}.npz")
+    
+    def _legacy_cache_file(self, session_id: str) -> str:
+        return os.path.join(self.cache_dir, f"cache_{session_id}.pkl")
+    
     def save_to_disk(self, session_id: str = "default") -> bool:
         """
         Persist cache to disk for cross-session retrieval.
         
+        Writes a versioned ``.npz``: a JSON index of the entries, their
+        compressed responses concatenated into one byte blob, and the query
+        embeddings as a float16 matrix, so loading needs no re-encoding.
+        
         Args:
             session_id: Session identifier for cache file naming
             
@@ -204,12 +239,29 @@ class ConversationCacheManager:
             True if successful, False otherwise
         """
         try:
-            cache_file = os.path.join(self.cache_dir, f"cache_{session_id}.pkl")
+            cache_file = self._cache_file(session_id)
+            
+            entries = []
+            blobs = []
+            rows = []
+            offset = 0
+            for entry_id, entry in self.full_cache.items():
+                record = {k: v for k, v in entry.items() if k not in ("response", "response_compressed")}
+                blob = entry.get("response_compressed") or self._compress(entry.get("response", ""))
+                record["blob"] = [offset, len(blob)]
+                blobs.append(blob)
+                offset += len(blob)
+                embedding = self.embeddings_cache.get(entry_id)
+                record["row"] = len(rows) if embedding is not None else None
+                if embedding is not None:
+                    rows.append(embedding)
+                entries.append(record)
             
-            # Prepare serializable cache (remove numpy embeddings)
-            serializable_cache = {
-                "full_cache": self.full_cache,
-                "cache_entries": list(self.cache_window),
+            index = {
+                "version": CACHE_FILE_VERSION,
+                "embedding_model": self.embedding_model_name,
+                "entries": entries,
+                "window": [entry.get("id") for entry in self.cache_window],
                 "metadata": {
                     "window_size": self.window_size,
                     "max_entries": self.max_entries,
@@ -217,9 +269,21 @@ class ConversationCacheManager:
                     "saved_at": datetime.now().isoformat()
                 }
             }
+            embeddings = np.stack(rows).astype(np.float16) if rows else np.empty((0, 0), dtype=np.float16)
             
-            with open(cache_file, 'wb') as f:
-                pickle.dump(serializable_cache, f)
+            tmp_file = f"{cache_file}.tmp.npz"
+            np.savez(
+                tmp_file,
+                version=np.array([CACHE_FILE_VERSION], dtype=np.int32),
+                index=np.frombuffer(json.dumps(index, default=str).encode("utf-8"), dtype=np.uint8),
+                blobs=np.frombuffer(b"".join(blobs), dtype=np.uint8),
+                embeddings=embeddings
+            )
+            os.replace(tmp_file, cache_file)
+            
+            legacy_file = self._legacy_cache_file(session_id)
+            if os.path.exists(legacy_file):
+                os.remove(legacy_file)
             
             logger.info(f"[ConversationCache] Saved cache to disk: {cache_file}")
             return True
@@ -232,6 +296,9 @@ class ConversationCacheManager:
         """
         Load cache from disk for session continuation.
         
+        Reads the ``.npz`` layout written by ``save_to_disk``; falls back to a
+        legacy ``.pkl`` cache, whose embeddings are re-encoded in one batch.
+        
         Args:
             session_id: Session identifier for cache file naming
             
@@ -239,46 +306,104 @@ class ConversationCacheManager:
             True if successful and cache was loaded, False otherwise
         """
         try:
-            cache_file = os.path.join(self.cache_dir, f"cache_{session_id}.pkl")
+            cache_file = self._cache_file(session_id)
             
             if not os.path.exists(cache_file):
+                if os.path.exists(self._legacy_cache_file(session_id)):
+                    return self._load_legacy(session_id)
                 logger.info(f"[ConversationCache] No cached data found for session: {session_id}")
                 return False
             
-            with open(cache_file, 'rb') as f:
-                serializable_cache = pickle.load(f)
+            with np.load(cache_file) as data:
+                version = int(data["version"][0])
+                if version > CACHE_FILE_VERSION:
+                    logger.warning(f"[ConversationCache] Cache file version {version} is newer than supported {CACHE_FILE_VERSION}, ignoring")
+                    return False
+                index = json.loads(data["index"].tobytes().decode("utf-8"))
+                blobs = data["blobs"].tobytes()
+                embeddings = data["embeddings"].astype(np.float32)
             
-            self.full_cache = serializable_cache.get("full_cache", {})
-            loaded_entries = serializable_cache.get("cache_entries", [])
+            same_model = index.get("embedding_model") == self.embedding_model_name
+            stale = []
+            self._reset_for_load()
+            for record in index["entries"]:
+                if self._is_expired(record):
+                    continue
+                start, length = record.pop("blob")
+                row = record.pop("row")
+                entry = dict(record)
+                # Responses stay compressed until a cache hit asks for the text
+                entry["response_compressed"] = blobs[start:start + length]
+                self.full_cache[entry["id"]] = entry
+                if row is not None and same_model:
+                    self.embeddings_cache[entry["id"]] = self._normalize(embeddings[row])
+                else:
+                    stale.append(entry)
+            if stale:
+                self._reencode(stale)
             
-            # Reload embeddings for cached entries
-            if self.embedding_model:
-                for entry in loaded_entries:
-                    if not self._is_expired(entry):
-                        try:
-                            query = entry.get("query", "")
-                            embedding = self.embedding_model.encode(query, convert_to_numpy=True)
-                            self.embeddings_cache[entry.get("id")] = embedding
-                            self.cache_window.append(entry)
-                        except Exception as e:
-                            logger.warning(f"[ConversationCache] Failed to reload embedding: {e}")
+            for entry_id in index.get("window", []):
+                if entry_id in self.full_cache:
+                    self.cache_window.append(self.full_cache[entry_id])
+            self._matrices.clear()
             
-            logger.info(f"[ConversationCache] Loaded {len(self.cache_window)} entries from disk (session: {session_id})")
+            logger.info(f"[ConversationCache] Loaded {len(self.cache_window)} entries from disk (session: {session_id}, re-encoded: {len(stale)})")
             return True
             
         except Exception as e:
             logger.error(f"[ConversationCache] Failed to load cache from disk: {e}")
             return False
     
+    def _load_legacy(self, session_id: str) -> bool:
+        with open(self._legacy_cache_file(session_id), 'rb') as f:
+            serializable_cache = pickle.load(f)
+        
+        self._reset_for_load()
+        window = serializable_cache.get("cache_entries", [])
+        # Window entries may already have left full_cache; keep them like the window does
+        for entry in list(serializable_cache.get("full_cache", {}).values()) + list(window):
+            if entry.get("id") in self.full_cache or self._is_expired(entry):
+                continue
+            if "response_compressed" in entry:
+                entry.pop("response", None)
+            self.full_cache[entry["id"]] = entry
+        self._reencode(list(self.full_cache.values()))
+        for entry in window:
+            entry = self.full_cache.get(entry.get("id"))
+            if entry is not None and entry["id"] in self.embeddings_cache:
+                self.cache_window.append(entry)
+        self._matrices.clear()
+        
+        logger.info(f"[ConversationCache] Loaded {len(self.full_cache)} entries ({len(self.cache_window)} in window) "
+                    f"from legacy cache (session: {session_id})")
+        return True
+    
+    def _reset_for_load(self) -> None:
+        self.cache_window.clear()
+        self.full_cache = {}
+        self.embeddings_cache.clear()
+        self._matrices.clear()
+    
+    def _reencode(self, entries: List[dict]) -> None:
+        if not self.embedding_model or not entries:
+            return
+        try:
+            embeddings = self.embedding_model.embed([entry.get("query", "") for entry in entries])
+            for entry, embedding in zip(entries, embeddings):
+                self.embeddings_cache[entry.get("id")] = self._normalize(embedding)
+        except Exception as e:
+            logger.warning(f"[ConversationCache] Failed to reload embeddings: {e}")
+    
     def delete_session_cache(self, session_id: str = "default") -> bool:
         """Delete persisted cache for a session."""
         try:
-            cache_file = os.path.join(self.cache_dir, f"cache_{session_id}.pkl")
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-                logger.info(f"[ConversationCache] Deleted cache file: {cache_file}")
-                return True
-            return False
+            deleted = False
+            for cache_file in (self._cache_file(session_id), self._legacy_cache_file(session_id)):
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+                    logger.info(f"[ConversationCache] Deleted cache file: {cache_file}")
+                    deleted = True
+            return deleted
         except Exception as e:
             logger.error(f"[ConversationCache] Failed to delete cache: {e}")
             return False
@@ -309,6 +434,12 @@ class ConversationCacheManager:
             logger.error(f"[ConversationCache] Decompression failed: {e}")
             return ""
     
+    def _expiry_timestamp(self, entry: Dict) -> float:
+        try:
+            return datetime.fromisoformat(entry.get("ttl_expiry", "")).timestamp()
+        except Exception:
+            return float("inf")
+    
     def _is_expired(self, entry: Dict) -> bool:
         try:
             expiry = datetime.fromisoformat(entry.get("ttl_expiry", ""))
@@ -1,14 +1,12 @@
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import threading
-import torch
-import chromadb
-import torch
-from pathlib import Path
+import json
 import numpy as np
 import os 
 from loguru import logger
 from pipeline.config import EMBEDDING_DIMENSION, LOG_MESSAGE_CONTEXT_TRUNCATE
+from sessions.sessionIndex import SessionIndex
 
 
 class SessionData:
@@ -24,7 +22,6 @@ class SessionData:
         self.web_search_urls: List[str] = []
         self.youtube_urls: List[str] = []
         self.processed_content: Dict[str, str] = {}
-        self.content_embeddings: Dict[str, np.ndarray] = {}
         self.rag_context_cache: Optional[str] = None
         self.top_content_cache: List[Tuple[str, float]] = []
         self.images: List[str] = []
@@ -34,31 +31,7 @@ class SessionData:
         self.errors: List[str] = []
         self.conversation_history: List[Dict] = []
         self.search_context: str = ""
-        
-        # Initialize ChromaDB collection for session content
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        try:
-            session_dir = os.path.join("./session_embeddings", session_id)
-            Path(session_dir).mkdir(parents=True, exist_ok=True)
-            
-            chroma_settings = chromadb.config.Settings(
-                anonymized_telemetry=False,
-                chroma_telemetry_impl="ragService.vectorStore.NoOpProductTelemetry",
-                chroma_product_telemetry_impl="ragService.vectorStore.NoOpProductTelemetry",
-            )
-            self.chroma_client = chromadb.PersistentClient(
-                path=session_dir,
-                settings=chroma_settings
-            )
-            self.chroma_collection = self.chroma_client.get_or_create_collection(
-                name=f"session_{session_id}",
-                metadata={"hnsw:space": "cosine"}
-            )
-            logger.info(f"[SessionData] {session_id}: ChromaDB collection created successfully")
-        except Exception as e:
-            logger.warning(f"[SessionData] {session_id}: Failed to create ChromaDB collection: {e}")
-            self.chroma_collection = None
-        
+        self.content_index = SessionIndex(embedding_dim)
         self.content_order: List[str] = []
         self.lock = threading.RLock()
     
@@ -66,29 +39,81 @@ class SessionData:
         with self.lock:
             self.fetched_urls.append(url)
             self.processed_content[url] = content
-            if embedding is not None and self.chroma_collection:
+            if embedding is not None:
                 try:
-                    if isinstance(embedding, np.ndarray):
-                        emb_list = embedding.tolist() if embedding.ndim == 1 else embedding[0].tolist()
-                    else:
-                        emb_list = embedding
-                    
-                    self.content_embeddings[url] = embedding
-                    self.chroma_collection.add(
-                        ids=[url],
-                        embeddings=[emb_list],
-                        documents=[content],
-                        metadatas=[{"url": url}]
-                    )
-                    self.content_order.append(url)
+                    self.content_index.add(url, embedding)
                 except Exception as e:
-                    logger.warning(f"[SessionData] Failed to add {url} to ChromaDB: {e}")
-            elif embedding is None or not self.chroma_collection:
-                # Still add to content_order for fallback access
-                self.content_order.append(url)
+                    logger.warning(f"[SessionData] Failed to index {url}: {e}")
+            self.content_order.append(url)
             self.last_activity = datetime.now()
             self.rag_context_cache = None
 
+    def search_content(self, query_embedding: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        with self.lock:
+            return self.content_index.search(query_embedding, k)
+
+    def spill_index(self, directory: str) -> int:
+        """Snapshot the content index to disk while the session is idle; it reloads on next use."""
+        with self.lock:
+            try:
+                return self.content_index.spill(os.path.join(directory, f"{self.session_id}.npz"))
+            except Exception as e:
+                logger.warning(f"[SessionData] {self.session_id}: Failed to spill content index: {e}")
+                return 0
+
+    def release_index(self):
+        with self.lock:
+            self.content_index.discard()
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size: page text, index matrix, history and cached context."""
+        with self.lock:
+            return (
+                sum(len(text) for text in self.processed_content.values())
+                + self.content_index.nbytes
+                + sum(len(str(msg.get("content", ""))) for msg in self.conversation_history)
+                + len(self.search_context)
+                + len(self.rag_context_cache or "")
+            )
+
+    _SNAPSHOT_FIELDS = (
+        "query", "fetched_urls", "web_search_urls", "youtube_urls", "processed_content",
+        "top_content_cache", "images", "videos", "metadata", "tool_calls_made", "errors",
+        "conversation_history", "search_context", "content_order",
+    )
+
+    def save_snapshot(self, path: str) -> int:
+        """Write the whole session to a compressed ``.npz`` and return its size on disk."""
+        with self.lock:
+            state = {field: getattr(self, field) for field in self._SNAPSHOT_FIELDS}
+            state["created_at"] = self.created_at.isoformat()
+            state["last_activity"] = self.last_activity.isoformat()
+            matrix, urls = self.content_index.export()
+            state["index_urls"] = urls
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(
+                tmp_path,
+                state=np.frombuffer(json.dumps(state, default=str).encode("utf-8"), dtype=np.uint8),
+                matrix=matrix,
+            )
+            os.replace(tmp_path, path)
+            return os.path.getsize(path)
+
+    @classmethod
+    def load_snapshot(cls, session_id: str, path: str, embedding_dim: int = None) -> "SessionData":
+        with np.load(path) as snapshot:
+            state = json.loads(snapshot["state"].tobytes().decode("utf-8"))
+            matrix = np.array(snapshot["matrix"], dtype=np.float32)
+        session = cls(session_id, state["query"], embedding_dim=embedding_dim)
+        for field in cls._SNAPSHOT_FIELDS:
+            setattr(session, field, state[field])
+        session.top_content_cache = [tuple(item) for item in session.top_content_cache]
+        session.created_at = datetime.fromisoformat(state["created_at"])
+        session.last_activity = datetime.fromisoformat(state["last_activity"])
+        session.content_index = SessionIndex.from_arrays(session.embedding_dim, matrix, state["index_urls"])
+        return session
+
     def get_rag_context(self, refresh: bool = False, query_embedding: Optional[np.ndarray] = None) -> str:
         with self.lock:
             if self.rag_context_cache and not refresh:
@@ -99,28 +124,16 @@ class SessionData:
                 f"Sources fetched: {len(self.fetched_urls)}",
             ]
             
-            if query_embedding is not None and self.chroma_collection and self.chroma_collection.count() > 0:
+            if query_embedding is not None and len(self.content_index) > 0:
                 try:
-                    if isinstance(query_embedding, np.ndarray):
-                        query_emb_list = query_embedding.tolist() if query_embedding.ndim == 1 else query_embedding[0].tolist()
-                    else:
-                        query_emb_list = query_embedding
-                    
-                    results = self.chroma_collection.query(
-                        query_embeddings=[query_emb_list],
-                        n_results=min(10, self.chroma_collection.count())
-                    )
-                    
+                    results = self.content_index.search(query_embedding, 10)
                     context_parts.append("\nMost Relevant Content:")
-                    if results["ids"] and len(results["ids"]) > 0:
-                        for doc_id, distance, metadata in zip(results["ids"][0], results["distances"][0], results["metadatas"][0]):
-                            relevance_score = 1.0 - distance
-                            url = metadata.get("url", doc_id)
-                            content_preview = self.processed_content.get(url, "")[:LOG_MESSAGE_CONTEXT_TRUNCATE]
-                            context_parts.append(f"  - {url} (relevance: {relevance_score:.3f})")
-                            context_parts.append(f"    Preview: {content_preview}...")
+                    for url, relevance_score in results:
+                        content_preview = self.processed_content.get(url, "")[:LOG_MESSAGE_CONTEXT_TRUNCATE]
+                        context_parts.append(f"  - {url} (relevance: {relevance_score:.3f})")
+                        context_parts.append(f"    Preview: {content_preview}...")
                 except Exception as e:
-                    logger.warning(f"[SessionData] ChromaDB search failed: {e}")
+                    logger.warning(f"[SessionData] Session index search failed: {e}")
                     context_parts.append("\nFetched Content:")
                     for url in self.fetched_urls[-5:]:
                         context_parts.append(f"  - {url}")
@@ -134,33 +147,16 @@ class SessionData:
     
     def get_top_content(self, k: int = 10, query_embedding: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
         with self.lock:
-            if not self.chroma_collection or self.chroma_collection.count() == 0:
+            if len(self.content_index) == 0:
                 return []
             
             if query_embedding is None:
                 return [(url, 1.0 / (i + 1)) for i, url in enumerate(self.content_order[:k])]
             
             try:
-                if isinstance(query_embedding, np.ndarray):
-                    query_emb_list = query_embedding.tolist() if query_embedding.ndim == 1 else query_embedding[0].tolist()
-                else:
-                    query_emb_list = query_embedding
-                
-                results = self.chroma_collection.query(
-                    query_embeddings=[query_emb_list],
-                    n_results=min(k, self.chroma_collection.count())
-                )
-                
-                results_list = []
-                if results["ids"] and len(results["ids"]) > 0:
-                    for doc_id, distance, metadata in zip(results["ids"][0], results["distances"][0], results["metadatas"][0]):
-                        url = metadata.get("url", doc_id)
-                        relevance_score = 1.0 - distance
-                        results_list.append((url, relevance_score))
-                
-                return results_list
+                return self.content_index.search(query_embedding, k)
             except Exception as e:
-                logger.warning(f"[SessionData] ChromaDB top content search failed: {e}")
+                logger.warning(f"[SessionData] Session index top content search failed: {e}")
                 return [(url, 1.0 / (i + 1)) for i, url in enumerate(self.content_order[:k])]
     
     def log_tool_call(self, tool_name: str):
@@ -172,7 +168,6 @@ class SessionData:
     
     def to_dict(self) -> Dict:
         with self.lock:
-            chroma_size = self.chroma_collection.count() if self.chroma_collection else 0
             return {
                 "session_id": self.session_id,
                 "query": self.query,
@@ -183,7 +178,8 @@ class SessionData:
                 "tool_calls": self.tool_calls_made,
                 "errors": self.errors,
                 "top_content": self.top_content_cache,
-                "chroma_collection_size": chroma_size,
+                "content_index_size": len(self.content_index),
+                "content_index_bytes": self.content_index.nbytes,
                 "document_count": len(self.processed_content),
                 "conversation_turns": len(self.conversation_history),
             }
@@ -212,7 +208,7 @@ class SessionData:
         Returns (cache_hit, cached_data)
         """
         with self.lock:
-            if not self.chroma_collection or self.chroma_collection.count() == 0:
+            if len(self.content_index) == 0:
                 return False, None
             
             if query_embedding is None:
@@ -220,37 +216,20 @@ class SessionData:
                 return False, None
             
             try:
-                if isinstance(query_embedding, np.ndarray):
-                    query_emb_list = query_embedding.tolist() if query_embedding.ndim == 1 else query_embedding[0].tolist()
-                else:
-                    query_emb_list = query_embedding
-                
-                results = self.chroma_collection.query(
-                    query_embeddings=[query_emb_list],
-                    n_results=min(3, self.chroma_collection.count())
-                )
-                
-                if results["ids"] and len(results["ids"]) > 0:
-                    best_distance = results["distances"][0][0]
-                    best_similarity = 1.0 - best_distance
-                    
-                    if best_similarity >= similarity_threshold:
-                        logger.info(f"[SessionData] Cache hit! Similarity: {best_similarity:.3f}")
-                        best_match_id = results["ids"][0][0]
-                        best_match_doc = results["documents"][0][0]
-                        best_match_metadata = results["metadatas"][0][0]
-                        
-                        return True, {
-                            "similarity_score": best_similarity,
-                            "cached_document": best_match_doc,
-                            "cached_metadata": best_match_metadata,
-                            "original_query": self.query
-                        }
-                    else:
-                        logger.debug(f"[SessionData] Cache similarity below threshold: {best_similarity:.3f} < {similarity_threshold}")
-                        return False, None
-                else:
+                results = self.content_index.search(query_embedding, 1)
+                if not results:
                     return False, None
+                best_match_url, best_similarity = results[0]
+                if best_similarity >= similarity_threshold:
+                    logger.info(f"[SessionData] Cache hit! Similarity: {best_similarity:.3f}")
+                    return True, {
+                        "similarity_score": best_similarity,
+                        "cached_document": self.processed_content.get(best_match_url, ""),
+                        "cached_metadata": {"url": best_match_url},
+                        "original_query": self.query
+                    }
+                logger.debug(f"[SessionData] Cache similarity below threshold: {best_similarity:.3f} < {similarity_threshold}")
+                return False, None
             except Exception as e:
                 logger.warning(f"[SessionData] Cache check failed: {e}")
                 return False, None
@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+import numpy as np
+
+
+def _as_vector(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    if vector.ndim > 1:
+        vector = vector[0]
+    return vector / (np.linalg.norm(vector) + 1e-8)
+
+
+class SessionIndex:
+    """In-memory top-k index for one session's fetched content.
+
+    Rows of a float32 matrix hold unit-normalised embeddings, so a dot
+    product is the cosine similarity the per-session Chroma collection used
+    to return. ``urls``/``offsets`` map rows to URLs; re-adding a URL
+    overwrites its row. The matrix can be spilled to an ``.npz`` snapshot
+    while the session is idle and is reloaded on the next access.
+    """
+
+    def __init__(self, embedding_dim: int, initial_capacity: int = 8):
+        self.embedding_dim = embedding_dim
+        self._matrix: Optional[np.ndarray] = np.empty((initial_capacity, embedding_dim), dtype=np.float32)
+        self.urls: List[str] = []
+        self.offsets: Dict[str, int] = {}
+        self.spill_path: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes if self._matrix is not None else 0
+
+    def add(self, url: str, embedding) -> None:
+        self._ensure_loaded()
+        vector = _as_vector(embedding)
+        row = self.offsets.get(url)
+        if row is None:
+            row = len(self.urls)
+            if row == self._matrix.shape[0]:
+                grown = np.empty((max(8, row * 2), self.embedding_dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self.urls.append(url)
+            self.offsets[url] = row
+        self._matrix[row] = vector
+
+    def search(self, query_embedding, k: int) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(url, cosine similarity)`` pairs, best first."""
+        size = len(self.urls)
+        if size == 0 or k <= 0:
+            return []
+        self._ensure_loaded()
+        scores = self._matrix[:size] @ _as_vector(query_embedding)
+        k = min(k, size)
+        top = np.argpartition(-scores, k - 1)[:k] if k < size else np.arange(size)
+        top = top[np.argsort(-scores[top])]
+        return [(self.urls[i], float(scores[i])) for i in top]
+
+    def export(self) -> Tuple[np.ndarray, List[str]]:
+        self._ensure_loaded()
+        return self._matrix[:len(self.urls)], list(self.urls)
+
+    @classmethod
+    def from_arrays(cls, embedding_dim: int, matrix: np.ndarray, urls: List[str]) -> "SessionIndex":
+        index = cls(embedding_dim, initial_capacity=max(8, len(urls)))
+        index._matrix[:len(urls)] = matrix
+        index.urls = list(urls)
+        index.offsets = {url: i for i, url in enumerate(index.urls)}
+        return index
+
+    def spill(self, path: str) -> int:
+        """Write the matrix to ``path`` and release it; returns the bytes freed."""
+        if self._matrix is None or not self.urls:
+            return 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, matrix=self._matrix[:len(self.urls)], urls=np.array(json.dumps(self.urls)))
+        os.replace(tmp_path, path)
+        freed = self._matrix.nbytes
+        self._matrix = None
+        self.spill_path = path
+        return freed
+
+    def _ensure_loaded(self) -> None:
+        if self._matrix is not None:
+            return
+        with np.load(self.spill_path) as snapshot:
+            self._matrix = np.array(snapshot["matrix"], dtype=np.float32)
+            self.urls = json.loads(str(snapshot["urls"]))
+        self.offsets = {url: i for i, url in enumerate(self.urls)}
+        try:
+            os.remove(self.spill_path)
+        except OSError as e:
+            logger.warning(f"[SessionIndex] Could not remove snapshot {self.spill_path}: {e}")
+        self.spill_path = None
+
+    def discard(self) -> None:
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+        self.spill_path = None
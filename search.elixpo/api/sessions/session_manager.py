@@ -1,4 +1,5 @@
 from typing import Dict, Optional
+import os
 import threading
 from sessions.sessionData import SessionData
 from loguru import logger
@@ -6,40 +7,60 @@ import uuid
 from datetime import datetime, timedelta
 import numpy as np
 from typing import List, Tuple
-from pipeline.config import EMBEDDING_DIMENSION, X_REQ_ID_SLICE_SIZE, LOG_MESSAGE_QUERY_TRUNCATE
+from pipeline.config import (EMBEDDING_DIMENSION, X_REQ_ID_SLICE_SIZE, LOG_MESSAGE_QUERY_TRUNCATE,
+                             SESSION_INDEX_SPILL_DIR, SESSION_INDEX_SPILL_IDLE_MINUTES, SESSION_REAPER_INTERVAL_SECONDS,
+                             SESSION_MEMORY_BUDGET_BYTES, SESSION_SNAPSHOT_DIR)
 
 
 
 class SessionManager:
-    def __init__(self, max_sessions: int = 1000, ttl_minutes: int = 30, embedding_dim: int = None):
+    def __init__(self, max_sessions: int = 1000, ttl_minutes: int = 30, embedding_dim: int = None,
+                 memory_budget_bytes: int = SESSION_MEMORY_BUDGET_BYTES, snapshot_dir: str = SESSION_SNAPSHOT_DIR,
+                 reaper_interval: float = SESSION_REAPER_INTERVAL_SECONDS):
         if embedding_dim is None:
             embedding_dim = EMBEDDING_DIMENSION
         self.sessions: Dict[str, SessionData] = {}
+        # Sessions evicted to disk: id -> last activity, for TTL and rehydration
+        self.evicted: Dict[str, datetime] = {}
         self.max_sessions = max_sessions
         self.ttl = timedelta(minutes=ttl_minutes)
         self.embedding_dim = embedding_dim
+        self.spill_idle = timedelta(minutes=SESSION_INDEX_SPILL_IDLE_MINUTES)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.snapshot_dir = snapshot_dir
         self.lock = threading.RLock()
-        logger.info(f"[SessionManager] Initialized with max {max_sessions} sessions, TTL: {ttl_minutes}m, embedding_dim: {embedding_dim}")
+        # Sessions being snapshotted outside the lock: id -> touched since it was picked
+        self._in_flight: Dict[str, bool] = {}
+        self._counters = {"expired": 0, "evictions": 0, "rehydrations": 0, "reaper_runs": 0}
+        self._stop = threading.Event()
+        self._reaper = threading.Thread(target=self._reaper_loop, args=(reaper_interval,), name="session-reaper", daemon=True)
+        self._reaper.start()
+        logger.info(f"[SessionManager] Initialized with max {max_sessions} sessions, TTL: {ttl_minutes}m, "
+                    f"budget: {memory_budget_bytes / 1024 / 1024:.0f} MB, embedding_dim: {embedding_dim}")
     
     def create_session(self, query: str) -> str:
+        victims = []
         with self.lock:
             if len(self.sessions) >= self.max_sessions:
                 self._cleanup_expired()
+                victims = self._pick_lru(count=len(self.sessions) - self.max_sessions + 1)
             session_id = str(uuid.uuid4())[:X_REQ_ID_SLICE_SIZE]
             self.sessions[session_id] = SessionData(session_id, query, embedding_dim=self.embedding_dim)
             logger.info(f"[SessionManager] Created session {session_id} for query: {query[:LOG_MESSAGE_QUERY_TRUNCATE]}")
-            return session_id
+        if victims:
+            self._evict(victims)
+        return session_id
     
     def get_session(self, session_id: str) -> Optional[SessionData]:
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 session.last_activity = datetime.now()
             return session
     
     def add_content_to_session(self, session_id: str, url: str, content: str, embedding: Optional[np.ndarray] = None):
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 session.add_fetched_url(url, content, embedding)
                 logger.info(f"[Session {session_id}] Added content from {url}")
@@ -48,7 +69,7 @@ class SessionManager:
     
     def add_search_url(self, session_id: str, url: str, is_youtube: bool = False):
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 if is_youtube:
                     session.youtube_urls.append(url)
@@ -57,27 +78,27 @@ class SessionManager:
     
     def log_tool_execution(self, session_id: str, tool_name: str):
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 session.log_tool_call(tool_name)
     
     def get_rag_context(self, session_id: str, refresh: bool = False, query_embedding: Optional[np.ndarray] = None) -> str:
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 return session.get_rag_context(refresh=refresh, query_embedding=query_embedding)
             return ""
     
     def get_top_content(self, session_id: str, k: int = 10, query_embedding: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 return session.get_top_content(k=k, query_embedding=query_embedding)
             return []
     
     def get_session_summary(self, session_id: str) -> Dict:
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 return session.to_dict()
             return {}
@@ -85,8 +106,39 @@ class SessionManager:
     def cleanup_session(self, session_id: str):
         with self.lock:
             if session_id in self.sessions:
-                del self.sessions[session_id]
+                self.sessions.pop(session_id).release_index()
                 logger.info(f"[SessionManager] Cleaned up session {session_id}")
+            elif self.evicted.pop(session_id, None) is not None:
+                self._remove_snapshot(session_id)
+                logger.info(f"[SessionManager] Cleaned up evicted session {session_id}")
+    
+    def _snapshot_path(self, session_id: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{session_id}.npz")
+    
+    def _remove_snapshot(self, session_id: str):
+        try:
+            os.remove(self._snapshot_path(session_id))
+        except OSError:
+            pass
+    
+    def _resolve(self, session_id: str) -> Optional[SessionData]:
+        session = self.sessions.get(session_id)
+        if session is not None and session_id in self._in_flight:
+            self._in_flight[session_id] = True
+        if session is not None or session_id not in self.evicted:
+            return session
+        try:
+            session = SessionData.load_snapshot(session_id, self._snapshot_path(session_id), embedding_dim=self.embedding_dim)
+        except Exception as e:
+            logger.warning(f"[SessionManager] Failed to rehydrate session {session_id}: {e}")
+            self.evicted.pop(session_id, None)
+            return None
+        self.evicted.pop(session_id, None)
+        self._remove_snapshot(session_id)
+        self.sessions[session_id] = session
+        self._counters["rehydrations"] += 1
+        logger.info(f"[SessionManager] Rehydrated session {session_id} from disk")
+        return session
     
     def _cleanup_expired(self):
         now = datetime.now()
@@ -95,41 +147,142 @@ class SessionManager:
             if now - session.last_activity > self.ttl
         ]
         for sid in expired:
-            del self.sessions[sid]
+            self.sessions.pop(sid).release_index()
             logger.info(f"[SessionManager] Expired session {sid}")
+        expired_on_disk = [sid for sid, last_activity in self.evicted.items() if now - last_activity > self.ttl]
+        for sid in expired_on_disk:
+            del self.evicted[sid]
+            self._remove_snapshot(sid)
+        self._counters["expired"] += len(expired) + len(expired_on_disk)
+    
+    def _pick_lru(self, count: int = 0, target_bytes: Optional[int] = None) -> List[Tuple[str, SessionData]]:
+        """Least recently used sessions to evict until ``count`` are picked or residency fits ``target_bytes``.
+        Call with the lock held; the picks are marked in flight until :meth:`_evict` settles them."""
+        sizes = {sid: s.memory_bytes() for sid, s in self.sessions.items()}
+        resident = sum(sizes.values())
+        victims = []
+        for sid in sorted(self.sessions, key=lambda sid: self.sessions[sid].last_activity):
+            if len(victims) >= count and (target_bytes is None or resident <= target_bytes):
+                break
+            if sid in self._in_flight:
+                continue
+            self._in_flight[sid] = False
+            victims.append((sid, self.sessions[sid]))
+            resident -= sizes[sid]
+        return victims
+    
+    def _evict(self, victims: List[Tuple[str, SessionData]]) -> int:
+        """Snapshot ``victims`` to disk without holding the lock, then move them to ``evicted``.
+        A session used or removed while its snapshot was written stays as it is and the snapshot is dropped."""
+        written = []
+        for sid, session in victims:
+            try:
+                session.save_snapshot(self._snapshot_path(sid))
+                written.append(sid)
+            except Exception as e:
+                logger.warning(f"[SessionManager] Failed to evict session {sid}: {e}")
+        with self.lock:
+            touched = {sid: self._in_flight.pop(sid, True) for sid, _ in victims}
+            evicted = 0
+            for sid, session in victims:
+                if sid not in written:
+                    continue
+                if touched[sid] or self.sessions.get(sid) is not session:
+                    self._remove_snapshot(sid)
+                    continue
+                del self.sessions[sid]
+                session.release_index()
+                self.evicted[sid] = session.last_activity
+                evicted += 1
+            if evicted:
+                self._counters["evictions"] += evicted
+                logger.info(f"[SessionManager] Evicted {evicted} session(s) to disk, {len(self.sessions)} resident")
+            if len(written) > evicted:
+                logger.info(f"[SessionManager] Kept {len(written) - evicted} session(s) used while their snapshot was written")
+        return evicted
+    
+    def reap(self) -> Dict:
+        """One reaper pass: expire past TTL, spill idle indexes, evict LRU sessions over the byte budget.
+        Candidates are picked under the lock; the disk writes happen outside it."""
+        with self.lock:
+            self._cleanup_expired()
+            idle = self._idle_indexes()
+        self._spill_indexes(idle)
+        with self.lock:
+            victims = self._pick_lru(target_bytes=self.memory_budget_bytes)
+        if victims:
+            self._evict(victims)
+        with self.lock:
+            self._counters["reaper_runs"] += 1
+            return {"resident_sessions": len(self.sessions), "evicted_sessions": len(self.evicted)}
+    
+    def _reaper_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"[SessionManager] Reaper error: {e}")
+    
+    def close(self):
+        self._stop.set()
+        self._reaper.join()
+    
+    def _idle_indexes(self) -> List[SessionData]:
+        now = datetime.now()
+        return [session for session in self.sessions.values()
+                if session.content_index.nbytes and now - session.last_activity > self.spill_idle]
+    
+    def _spill_indexes(self, sessions: List[SessionData]):
+        # Each spill holds only its session's lock; an index used meanwhile reloads on next access
+        freed = 0
+        for session in sessions:
+            freed += session.spill_index(SESSION_INDEX_SPILL_DIR)
+        with self.lock:
+            for session in sessions:
+                if self.sessions.get(session.session_id) is not session:
+                    session.release_index()
+        if freed:
+            logger.info(f"[SessionManager] Spilled idle session indexes to disk, freed {freed / 1024:.0f} KB")
     
     def get_stats(self) -> Dict:
         with self.lock:
+            sessions = {
+                sid: {
+                    "query": s.query[:LOG_MESSAGE_QUERY_TRUNCATE],
+                    "urls_fetched": len(s.fetched_urls),
+                    "tools_used": len(s.tool_calls_made),
+                    "content_index_size": len(s.content_index),
+                    "resident_bytes": s.memory_bytes(),
+                }
+                for sid, s in self.sessions.items()
+            }
             return {
-                "total_sessions": len(self.sessions),
+                "total_sessions": len(self.sessions) + len(self.evicted),
+                "resident_sessions": len(self.sessions),
+                "evicted_sessions": len(self.evicted),
                 "max_sessions": self.max_sessions,
-                "sessions": {
-                    sid: {
-                        "query": s.query[:LOG_MESSAGE_QUERY_TRUNCATE],
-                        "urls_fetched": len(s.fetched_urls),
-                        "tools_used": len(s.tool_calls_made),
-                        "faiss_index_size": s.faiss_index.ntotal,
-                    }
-                    for sid, s in self.sessions.items()
-                }
+                "resident_bytes": sum(s["resident_bytes"] for s in sessions.values()),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                **self._counters,
+                "sessions": sessions,
             }
     
     def add_message_to_history(self, session_id: str, role: str, content: str, metadata: Dict = None):
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 session.add_message_to_history(role, content, metadata)
     
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 return session.get_conversation_history()
             return []
     
     def set_search_context(self, session_id: str, context: str):
         with self.lock:
-            session = self.sessions.get(session_id)
+            session = self._resolve(session_id)
             if session:
                 session.set_search_context(context)
 
@@ -9,11 +9,12 @@ python3 -m api.ipcService.main &
 IPC_PID=$!
 echo "[ENTRYPOINT] IPC Service started with PID $IPC_PID"
 
-# Wait for IPC Service to be ready (port 5010)
-echo "[ENTRYPOINT] Waiting for IPC Service to be ready on port 5010..."
+# Wait for IPC Service to be ready (RPC socket, see IPC_SOCKET_PATH in api/pipeline/config.py)
+IPC_SOCKET=/tmp/lixsearch-ipc.sock
+echo "[ENTRYPOINT] Waiting for IPC Service to be ready on $IPC_SOCKET..."
 max_attempts=30
 attempt=0
-while ! nc -z localhost 5010 2>/dev/null; do
+while [ ! -S "$IPC_SOCKET" ]; do
     attempt=$((attempt + 1))
     if [ $attempt -ge $max_attempts ]; then
         echo "[ENTRYPOINT] IPC Service failed to start within timeout"
@@ -0,0 +1,98 @@
+"""
+Page fetch benchmark against a local fixture server with injected latency:
+the old sequential requests.get loop vs the pooled AsyncFetcher, including a
+straggler page that must not hold back the fast ones.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from searching.asyncFetcher import AsyncFetcher
+from searching.htmlExtractor import extract_text
+
+WORDS = "search engine retrieval latency stream parse index embedding vector cache".split()
+PAGES = 12
+LATENCIES_MS = [50, 100, 200, 400]
+STRAGGLER_MS = 5000
+DEADLINE_S = 2.0
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        time.sleep(int(params.get("delay", ["0"])[0]) / 1000)
+        rng = random.Random(self.path)
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choice(WORDS) for _ in range(80))}</p>" for _ in range(int(params.get("paras", ["200"])[0]))
+        )
+        body = f"<html><head><script>var x = 1;</script></head><body><nav>menu</nav><article class='content'>{paragraphs}</article></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def sequential_fetch(urls):
+    start = time.perf_counter()
+    first = None
+    results = []
+    for url in urls:
+        response = requests.get(url, timeout=20)
+        results.append(extract_text(response.content))
+        first = first or time.perf_counter() - start
+    return time.perf_counter() - start, first, len(results)
+
+
+async def async_fetch(urls, deadline=None):
+    fetcher = AsyncFetcher(url_validator=lambda url: True, use_cache=False)
+    start = time.perf_counter()
+    first = None
+    results = []
+    try:
+        async for _, text in fetcher.fetch_as_completed(urls, deadline=deadline):
+            results.append(text)
+            first = first or time.perf_counter() - start
+    finally:
+        await fetcher.aclose()
+    return time.perf_counter() - start, first, len(results)
+
+
+def report(label, elapsed, first, count, total):
+    print(f"{label:<34} total={elapsed:>6.2f}s  first result={first or 0:>6.2f}s  pages={count}/{total}")
+
+
+if __name__ == "__main__":
+    from loguru import logger
+    logger.remove()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    urls = [f"{base}/page{i}?delay={LATENCIES_MS[i % len(LATENCIES_MS)]}" for i in range(PAGES)]
+    straggler_urls = urls + [f"{base}/slow?delay={STRAGGLER_MS}"]
+
+    print("=" * 84)
+    print(f"{PAGES} pages, injected latency {LATENCIES_MS} ms")
+    print("-" * 84)
+    report("sequential requests", *sequential_fetch(urls), PAGES)
+    report("async fetcher", *asyncio.run(async_fetch(urls)), PAGES)
+    print("-" * 84)
+    print(f"plus one {STRAGGLER_MS}ms straggler, {DEADLINE_S}s deadline")
+    report("async fetcher (deadline)", *asyncio.run(async_fetch(straggler_urls, deadline=DEADLINE_S)), len(straggler_urls))
+    print("=" * 84)
+    server.shutdown()
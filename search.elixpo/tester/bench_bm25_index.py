@@ -0,0 +1,130 @@
+"""
+BM25 index benchmark on a synthetic corpus sized like a busy vector store:
+bulk load time, query latency (mean / p95) against the retrieval budget,
+agreement with a brute-force BM25 reference on a sample, that removed and
+re-added documents behave, and that searches keep answering while a writer
+thread adds and removes documents.
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import RAG_RETRIEVAL_BUDGET_MS
+from ragService.bm25Index import BM25Index, tokenize
+
+DOCS = 50_000
+WORDS_PER_DOC = 120
+VOCAB = [f"w{i}" for i in range(20_000)]
+FILLER = ["the", "is", "of", "and", "release", "version", "update", "server", "error", "guide"]
+QUERIES = ["what is the w15 release", "w42 error on the server", "guide to w9000 and w12 update",
+           "ERR_CONNECTION_RESET w77", "version w3 w4 w5 notes"]
+
+
+def make_doc(rng, i):
+    words = [rng.choice(FILLER) if rng.random() < 0.4 else VOCAB[min(int(rng.paretovariate(1.1)), len(VOCAB) - 1)]
+             for _ in range(WORDS_PER_DOC)]
+    if i % 997 == 0:
+        words.append("ERR_CONNECTION_RESET")
+    return " ".join(words)
+
+
+def reference_search(docs, query, top_k, k1=1.2, b=0.75):
+    counts = {doc_id: Counter(tokenize(text)) for doc_id, text in docs.items()}
+    n_docs = len(counts)
+    avg = sum(sum(c.values()) for c in counts.values()) / n_docs
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for c in counts.values() if term in c)
+        if not df:
+            continue
+        idf = math.log1p((n_docs - df + 0.5) / (df + 0.5))
+        for doc_id, c in counts.items():
+            tf = c.get(term)
+            if tf:
+                norm = k1 * (1 - b + b * sum(c.values()) / avg)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+    corpus = {f"doc{i}": make_doc(rng, i) for i in range(DOCS)}
+    checks = {}
+
+    index = BM25Index()
+    items = list(corpus.items())
+    start = time.perf_counter()
+    index.load(items[i:i + 2000] for i in range(0, len(items), 2000))
+    load_s = time.perf_counter() - start
+    checks["all documents loaded"] = len(index) == DOCS
+
+    latencies = []
+    for _ in range(20):
+        for query in QUERIES:
+            started = time.perf_counter()
+            index.search(query, top_k=20)
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    mean_ms = sum(latencies) / len(latencies)
+    p95_ms = latencies[int(len(latencies) * 0.95)]
+    checks["p95 query within budget / 4"] = p95_ms <= RAG_RETRIEVAL_BUDGET_MS / 4
+
+    sample = dict(items[:2000])
+    small = BM25Index(max_df_ratio=1.0)
+    small.add_many(sample.items())
+    agree = True
+    for q in QUERIES:
+        ours, reference = small.search(q, top_k=10), reference_search(sample, q, 10)
+        # Equal scores may come back in either order, so compare score lists
+        agree &= len(ours) == len(reference) and all(abs(a[1] - r[1]) < 1e-3 for a, r in zip(ours, reference))
+    checks["matches brute-force BM25"] = agree
+
+    small.remove(["doc0"])
+    checks["removed doc not returned"] = all(doc_id != "doc0" for doc_id, _ in small.search("ERR_CONNECTION_RESET", top_k=50))
+    small.add("doc0", "ERR_CONNECTION_RESET ERR_CONNECTION_RESET")
+    checks["re-added doc ranks first"] = small.search("ERR_CONNECTION_RESET", top_k=1)[0][0] == "doc0"
+    small.remove([f"doc{i}" for i in range(1, 1500)])
+    checks["compacted after churn"] = small.compactions == 1 and len(small) == 501
+    checks["search after compaction"] = small.search("ERR_CONNECTION_RESET", top_k=1)[0][0] == "doc0"
+
+    stop = threading.Event()
+    writes = [0]
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            index.add_many((f"new{i}-{j}", make_doc(rng, j)) for j in range(200))
+            index.remove(f"new{i}-{j}" for j in range(0, 200, 2))
+            writes[0] += 200
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    busy = []
+    for _ in range(10):
+        for query in QUERIES:
+            started = time.perf_counter()
+            index.search(query, top_k=20)
+            busy.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    thread.join()
+    busy.sort()
+    busy_p95 = busy[int(len(busy) * 0.95)]
+    checks["p95 with concurrent writer within budget / 2"] = busy_p95 <= RAG_RETRIEVAL_BUDGET_MS / 2
+
+    print(f"{DOCS} docs loaded in {load_s:.1f}s, {index.get_stats()['terms']} terms")
+    print(f"query latency: mean {mean_ms:.2f} ms, p95 {p95_ms:.2f} ms; "
+          f"with writer ({writes[0]} docs written): p95 {busy_p95:.2f} ms")
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<44} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
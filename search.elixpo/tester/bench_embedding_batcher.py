@@ -0,0 +1,62 @@
+"""
+Embedding throughput under concurrent IPC-style callers: every thread calling
+EmbeddingService directly (serialised on its lock) vs going through the
+EmbeddingBatcher micro-batcher.
+"""
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_MODEL, EMBEDDING_BATCH_MAX_WAIT_MS, EMBEDDING_BATCH_MAX_TEXTS
+from ragService.embeddingService import get_embedding_service
+from ragService.embeddingBatcher import EmbeddingBatcher
+
+CALLERS = [1, 8, 32]
+CALLS_PER_CALLER = 20
+QUERY = "what is the latest research on retrieval augmented generation for search"
+
+
+def run(embedder, callers):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for i in range(CALLS_PER_CALLER):
+            start = time.perf_counter()
+            embedder.embed_single(f"{QUERY} {n} {i}")
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+if __name__ == "__main__":
+    service = get_embedding_service(EMBEDDING_MODEL)
+    batcher = EmbeddingBatcher(service, max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS, max_texts=EMBEDDING_BATCH_MAX_TEXTS)
+    service.embed(["warmup"] * 4)
+
+    print("=" * 84)
+    print(f"{'callers':>8} | {'mode':<10} | {'emb/s':>10} | {'p50 ms':>10} | {'p99 ms':>10}")
+    print("-" * 84)
+    for callers in CALLERS:
+        for label, embedder in (("direct", service), ("batched", batcher)):
+            throughput, p50, p99 = run(embedder, callers)
+            print(f"{callers:>8} | {label:<10} | {throughput:>10.1f} | {p50:>10.2f} | {p99:>10.2f}")
+    print("-" * 84)
+    print(f"batcher stats: {batcher.get_stats()}")
+    print("=" * 84)
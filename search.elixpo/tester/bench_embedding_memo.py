@@ -0,0 +1,92 @@
+"""
+Embedding memo benchmark: replays the embedding calls one search request
+makes for its query (pipeline pre-embed, conversation cache lookup from a
+tool thread, cache write at the end, RAG retrieval) with and without a
+request scope, and reports model forward passes run vs saved per request
+plus the process memo hit rate across repeated queries.
+"""
+
+import os
+import sys
+import time
+import asyncio
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_MODEL
+from ragService.embeddingService import get_embedding_service
+from ragService.embeddingMemo import MemoizedEmbedder, EmbeddingMemo, request_scope
+
+QUERIES = [
+    "latest python release notes and new features",
+    "how does reciprocal rank fusion combine rankings",
+    "what causes ERR_CONNECTION_RESET in chrome",
+    "latest python release notes and new features",
+]
+
+
+class CountingService:
+    def __init__(self, service):
+        self.service = service
+        self.forward_passes = 0
+
+    def embed(self, texts, batch_size=32):
+        self.forward_passes += 1
+        return self.service.embed(texts, batch_size=batch_size)
+
+    def embed_single(self, text):
+        self.forward_passes += 1
+        return self.service.embed_single(text)
+
+
+async def one_request(embedder, query, scoped):
+    with request_scope() if scoped else nullcontext() as scope:
+        vector = await asyncio.to_thread(embedder.embed_single, query)   # pipeline pre-embed for IPC retrieve
+        await asyncio.to_thread(embedder.embed_single, query)            # query_conversation_cache tool
+        embedder.embed_single(query)                                     # RAGEngine.retrieve_context
+        embedder.embed_single(query)                                     # add_to_cache at the end
+    return vector, scope
+
+
+async def run(embedder, scoped):
+    results = []
+    for query in QUERIES:
+        results.append(await asyncio.create_task(one_request(embedder, query, scoped)))
+    return results
+
+
+if __name__ == "__main__":
+    service = get_embedding_service(EMBEDDING_MODEL)
+
+    baseline = CountingService(service)
+    start = time.perf_counter()
+    asyncio.run(run(baseline, scoped=False))
+    baseline_s = time.perf_counter() - start
+
+    counted = CountingService(service)
+    memo = EmbeddingMemo(ttl_seconds=60)
+    embedder = MemoizedEmbedder(counted, EMBEDDING_MODEL, memo=memo)
+    start = time.perf_counter()
+    results = asyncio.run(run(embedder, scoped=True))
+    memo_s = time.perf_counter() - start
+
+    print(f"{'request':<50}{'passes':>8}{'saved':>7}")
+    for query, (_, scope) in zip(QUERIES, results):
+        stats = scope.get_stats()
+        print(f"{query[:48]:<50}{stats['forward_passes']:>8}{stats['forward_passes_saved']:>7}")
+    print(f"\nforward passes: {baseline.forward_passes} without memo ({baseline_s * 1000:.0f} ms), "
+          f"{counted.forward_passes} with memo ({memo_s * 1000:.0f} ms)")
+    print(memo.get_stats())
+
+    checks = {
+        "one pass per new query": all(scope.computed == 1 for _, scope in results[:3]),
+        "repeat query served by memo": results[3][1].computed == 0 and counted.forward_passes == 3,
+        "same vector returned": (results[0][0] == results[3][0]).all(),
+    }
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
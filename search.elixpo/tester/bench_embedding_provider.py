@@ -0,0 +1,53 @@
+"""
+Per-request setup cost of ConversationCacheManager: loading the embedding
+model in every constructor (old behaviour) vs the process-wide shared provider.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from sentence_transformers import SentenceTransformer
+from pipeline.config import CACHE_EMBEDDING_MODEL
+from sessions.conversation_cache import ConversationCacheManager
+
+REQUESTS = 10
+
+
+def bench_per_request_load(cache_dir):
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        model = SentenceTransformer(CACHE_EMBEDDING_MODEL)
+        model.encode("warm query for the per request model", convert_to_numpy=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_shared_provider(cache_dir):
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        manager = ConversationCacheManager(embedding_model=CACHE_EMBEDDING_MODEL, cache_dir=cache_dir)
+        manager.embedding_model.embed_single("warm query for the shared model")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings):
+    first = timings[0] * 1000
+    rest = sorted(timings[1:])
+    median = rest[len(rest) // 2] * 1000 if rest else first
+    print(f"{label:<28} first={first:>9.1f}ms  median(after first)={median:>9.1f}ms  total={sum(timings):.2f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print("=" * 80)
+        print(f"ConversationCacheManager setup, {REQUESTS} sequential requests")
+        print("=" * 80)
+        report("before (model per request)", bench_per_request_load(cache_dir))
+        report("after (shared provider)", bench_shared_provider(cache_dir))
@@ -0,0 +1,84 @@
+"""
+HTML-to-text extraction benchmark over the saved fixtures in
+tester/fixtures/html: pages/sec per backend and parity against the
+BeautifulSoup extractor used before. Parity is the Jaccard overlap of
+character 8-grams with whitespace removed, so the old extractor's duplicated
+nested text and words glued across block boundaries do not count as drift.
+A few small exact-output cases check that every backend agrees on where
+paragraphs break.
+"""
+
+import os
+import sys
+import time
+import glob
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from searching.htmlExtractor import EXTRACTORS
+from pipeline.config import MAX_TOTAL_SCRAPE_WORD_COUNT
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+ROUNDS = 20
+
+# Exact outputs every backend must agree on; inline tags must not split a paragraph
+PARITY_CASES = [
+    (b"<p>Hello <b>bold</b> world and <a>link</a> end.</p>", "Hello bold world and link end."),
+]
+
+
+def shingles(text: str, n: int = 8) -> set:
+    compact = "".join(text.lower().split()).rstrip(".")
+    return {compact[i:i + n] for i in range(max(0, len(compact) - n + 1))}
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = shingles(a), shingles(b)
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+if __name__ == "__main__":
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "rb") as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        sys.exit(f"No fixtures found in {fixture_dir}")
+
+    baseline = {name: EXTRACTORS["bs4"](html, MAX_TOTAL_SCRAPE_WORD_COUNT) for name, html in pages.items()}
+
+    print("=" * 96)
+    print(f"{len(pages)} fixtures x {ROUNDS} rounds, word limit {MAX_TOTAL_SCRAPE_WORD_COUNT}")
+    print("-" * 96)
+    print(f"{'backend':<12} | {'pages/s':>9} | {'speedup':>8} | {'min jaccard':>11} | {'mean jaccard':>12} | {'words out (bs4)':>18}")
+    print("-" * 96)
+    bs4_rate = None
+    for backend, extractor in EXTRACTORS.items():
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            outputs = {name: extractor(html, MAX_TOTAL_SCRAPE_WORD_COUNT) for name, html in pages.items()}
+        rate = ROUNDS * len(pages) / (time.perf_counter() - start)
+        bs4_rate = bs4_rate or rate
+        scores = [jaccard(outputs[name], baseline[name]) for name in pages]
+        words = sum(len(t.split()) for t in outputs.values())
+        base_words = sum(len(t.split()) for t in baseline.values())
+        print(f"{backend:<12} | {rate:>9.1f} | {rate / bs4_rate:>7.1f}x | {min(scores):>11.3f} | {sum(scores) / len(scores):>12.3f} | {words:>8} ({base_words})")
+    print("-" * 96)
+    for name in pages:
+        row = "  ".join(f"{b}={jaccard(EXTRACTORS[b](pages[name], MAX_TOTAL_SCRAPE_WORD_COUNT), baseline[name]):.3f}" for b in EXTRACTORS if b != "bs4")
+        print(f"{name:<24} {row}")
+    print("-" * 96)
+    mismatches = 0
+    for html, expected in PARITY_CASES:
+        for backend, extractor in EXTRACTORS.items():
+            got = extractor(html, MAX_TOTAL_SCRAPE_WORD_COUNT)
+            if got != expected:
+                mismatches += 1
+                print(f"{backend:<12} {html!r}: expected {expected!r}, got {got!r}")
+    total = len(PARITY_CASES) * len(EXTRACTORS)
+    print(f"parity cases: {total - mismatches}/{total} OK")
+    print("=" * 96)
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,177 @@
+"""
+IPC transport benchmark: the multiprocessing BaseManager proxy path the API
+used to take (blocking pickle round trips wrapped in asyncio.to_thread) vs the
+msgpack-over-Unix-socket RPCClient, both talking to a fake service hosted in a
+separate process.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import statistics
+import multiprocessing
+from multiprocessing.managers import BaseManager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ipcService.rpc import RPCServer, RPCClient
+
+MANAGER_ADDRESS = ("localhost", 5099)
+AUTHKEY = b"benchIPC"
+LATENCY_CALLS = 2000
+CONCURRENCY = [1, 8, 32, 128]
+WORK_MS = 20
+VECTOR = [0.01 * i for i in range(384)]
+
+
+class FakeService:
+    def ping(self):
+        return "pong"
+
+    def retrieve(self, query, top_k=3):
+        return {"query": query, "count": top_k,
+                "results": [{"score": 0.9, "metadata": {"text": "lorem ipsum " * 50, "url": "https://example.com"}}] * top_k}
+
+    def embed(self, vector):
+        return vector
+
+    def work(self, ms):
+        time.sleep(ms / 1000)
+        return ms
+
+
+class AsyncFakeService:
+    async def work(self, ms):
+        await asyncio.sleep(ms / 1000)
+        return ms
+
+
+class BenchManager(BaseManager):
+    pass
+
+
+def serve_manager():
+    service = FakeService()
+    BenchManager.register("FakeService", callable=lambda: service)
+    BenchManager(address=MANAGER_ADDRESS, authkey=AUTHKEY).get_server().serve_forever()
+
+
+def serve_rpc(path):
+    service, async_service = FakeService(), AsyncFakeService()
+
+    async def main():
+        server = RPCServer({"FakeService": {
+            "ping": service.ping, "retrieve": service.retrieve, "embed": service.embed,
+            "work": service.work, "async_work": async_service.work,
+        }}, path=path, executor_workers=max(CONCURRENCY))
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99) - 1] * 1e6
+
+
+def manager_latency(proxy, method, *args):
+    samples = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        getattr(proxy, method)(*args)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+async def manager_to_thread_latency(proxy, method, *args):
+    # How the API actually had to call the proxy without stalling its event loop
+    samples = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        await asyncio.to_thread(getattr(proxy, method), *args)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+async def rpc_latency(client, method, *args):
+    samples = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        await client.call("FakeService", method, *args)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+async def manager_throughput(proxy, concurrency, calls):
+    start = time.perf_counter()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await asyncio.to_thread(proxy.work, WORK_MS)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+async def rpc_throughput(client, method, concurrency, calls):
+    start = time.perf_counter()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await client.call("FakeService", method, WORK_MS)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+async def run(rpc_path):
+    BenchManager.register("FakeService")
+    manager = BenchManager(address=MANAGER_ADDRESS, authkey=AUTHKEY)
+    manager.connect()
+    proxy = manager.FakeService()
+    client = RPCClient(path=rpc_path)
+
+    print(f"Round-trip latency over {LATENCY_CALLS} sequential calls (us)")
+    print("(manager = blocking proxy call; manager+thread = proxy call via asyncio.to_thread, as the API used it)")
+    print(f"{'payload':<12}{'manager p50/p99':>18}{'manager+thread p50/p99':>25}{'rpc p50/p99':>16}")
+    for label, method, args in [("ping", "ping", ()), ("retrieve", "retrieve", ("what is rag", 3)), ("vector384", "embed", (VECTOR,))]:
+        m50, m99 = manager_latency(proxy, method, *args)
+        t50, t99 = await manager_to_thread_latency(proxy, method, *args)
+        r50, r99 = await rpc_latency(client, method, *args)
+        print(f"{label:<12}{f'{m50:.0f}/{m99:.0f}':>18}{f'{t50:.0f}/{t99:.0f}':>25}{f'{r50:.0f}/{r99:.0f}':>16}")
+
+    print(f"\nThroughput with {WORK_MS}ms of server-side work per call (calls/s)")
+    print(f"{'concurrency':<12}{'manager':>12}{'rpc (thread)':>14}{'rpc (async)':>14}")
+    for concurrency in CONCURRENCY:
+        calls = max(50, concurrency * 4)
+        m = await manager_throughput(proxy, concurrency, calls)
+        r = await rpc_throughput(client, "work", concurrency, calls)
+        a = await rpc_throughput(client, "async_work", concurrency, calls)
+        print(f"{concurrency:<12}{m:>12.0f}{r:>14.0f}{a:>14.0f}")
+    await client.close()
+
+
+def main():
+    rpc_path = os.path.join(tempfile.mkdtemp(), "bench-ipc.sock")
+    servers = [multiprocessing.Process(target=serve_manager, daemon=True),
+               multiprocessing.Process(target=serve_rpc, args=(rpc_path,), daemon=True)]
+    for server in servers:
+        server.start()
+    deadline = time.time() + 10
+    while not os.path.exists(rpc_path) and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.5)
+    try:
+        asyncio.run(run(rpc_path))
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test for the shared LLMClient against a local mock completion endpoint
+that injects latency and transient 503s: the old requests.post-in-a-thread
+pattern vs pooled async calls. Reports wall time, connections opened,
+success rate and the client's own metrics.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.llm_client import LLMClient
+
+CALLS = 64
+LATENCY_S = 0.15
+FAILURE_RATE = 0.2
+PAYLOAD = {"model": "mock", "messages": [{"role": "user", "content": "hello"}], "max_tokens": 50}
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with MockCompletionHandler.lock:
+            MockCompletionHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(LATENCY_S)
+        if random.random() < FAILURE_RATE:
+            body, status = b'{"error": "overloaded"}', 503
+        else:
+            body, status = json.dumps({"choices": [{"index": 0, "message": {"role": "assistant", "content": "hi"}, "finish_reason": "stop"}]}).encode(), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def old_call(endpoint):
+    try:
+        response = requests.post(endpoint, json=PAYLOAD, timeout=20)
+        response.raise_for_status()
+        return True
+    except requests.RequestException:
+        return False
+
+
+async def run_old(endpoint):
+    results = await asyncio.gather(*(asyncio.to_thread(old_call, endpoint) for _ in range(CALLS)))
+    return sum(results)
+
+
+async def run_new(llm):
+    async def one():
+        try:
+            await llm.complete(PAYLOAD, timeout=20)
+            return True
+        except Exception:
+            return False
+
+    results = await asyncio.gather(*(one() for _ in range(CALLS)))
+    return sum(results)
+
+
+async def main(endpoint):
+    print(f"{CALLS} concurrent calls, {LATENCY_S * 1000:.0f}ms latency, {FAILURE_RATE:.0%} transient 503s")
+    print(f"{'client':<26}{'wall (s)':>10}{'ok':>6}{'connections':>13}")
+
+    for label, runner in (("requests + to_thread", lambda: run_old(endpoint)), ("LLMClient (pooled)", None)):
+        if runner is None:
+            llm = LLMClient(endpoint=endpoint, backoff_seconds=0.05)
+            # Warm the pool once, then measure steady state
+            await run_new(llm)
+            runner = lambda: run_new(llm)
+        MockCompletionHandler.connections = 0
+        start = time.perf_counter()
+        ok = await runner()
+        wall = time.perf_counter() - start
+        print(f"{label:<26}{wall:>10.2f}{ok:>6}{MockCompletionHandler.connections:>13}")
+
+    stats = llm.get_stats()
+    print("\nLLMClient stats:")
+    print(json.dumps(stats, indent=2))
+    await llm.aclose()
+    return ok == CALLS and stats["in_flight"] == 0 and stats["retries"] > 0
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ok = asyncio.run(main(f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"))
+    server.shutdown()
+    print("=" * 60)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,142 @@
+"""
+Time-to-first-token benchmark against a local mock OpenAI-compatible server:
+the old stream=False request vs LLMClient.stream. Also checks that deltas
+survive the format_sse/parse_sse round trip byte for byte, that fragmented
+tool-call deltas are reassembled, and that the leak probe holds back drafts.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.llm_client import LLMClient, StreamGate
+from pipeline.utils import format_sse, parse_sse
+from pipeline.lixsearch import _looks_like_internal_reasoning
+
+TOKEN_DELAY_S = 0.02
+ANSWER = ("## Result\n\nStreaming lets the client render **tokens** as they arrive, "
+          "so the  first words show up long before the answer is complete.\n\n"
+          "- point one\n- point two  \n\nDone. ") * 4
+TOKENS = [ANSWER[i:i + 6] for i in range(0, len(ANSWER), 6)]
+LEAK = "The user wants to know about streaming. I should search first, then let me summarise. " * 4
+TOOL_ARGS = json.dumps({"query": "latest rust release notes", "max_results": 5})
+RUNS = 5
+
+
+def chunk(delta, finish=None):
+    return {"id": "chatcmpl-mock", "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        text = LEAK if prompt == "leak" else ANSWER
+        tokens = [text[i:i + 6] for i in range(0, len(text), 6)]
+
+        if not body.get("stream"):
+            time.sleep(TOKEN_DELAY_S * len(tokens))
+            payload = json.dumps({"choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        if prompt == "tools":
+            events = [chunk({"role": "assistant", "tool_calls": [{"index": 0, "id": "call_a", "type": "function", "function": {"name": "web_search", "arguments": ""}}]})]
+            events += [chunk({"tool_calls": [{"index": 0, "function": {"arguments": TOOL_ARGS[i:i + 7]}}]}) for i in range(0, len(TOOL_ARGS), 7)]
+            events += [chunk({"tool_calls": [{"index": 1, "id": "call_b", "type": "function", "function": {"name": "fetch_full_text", "arguments": '{"url": "https://example.com"}'}}]})]
+            events += [chunk({}, "tool_calls")]
+        else:
+            events = [chunk({"role": "assistant", "content": ""})] + [chunk({"content": t}) for t in tokens] + [chunk({}, "stop")]
+        for event in events:
+            time.sleep(TOKEN_DELAY_S)
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def blocking_request(endpoint):
+    start = time.perf_counter()
+    response = requests.post(endpoint, json={"messages": [{"role": "user", "content": "hi"}], "stream": False}, timeout=60)
+    text = response.json()["choices"][0]["message"]["content"]
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, text
+
+
+async def streamed_request(llm, prompt="hi"):
+    stream = llm.stream({"messages": [{"role": "user", "content": prompt}]}, deadline=60)
+    events = []
+    async for delta in stream:
+        events.append(format_sse("final-part", delta))
+    return stream, events
+
+
+async def run(endpoint):
+    llm = LLMClient(endpoint=endpoint)
+    checks = {}
+    old_ttft, new_ttft, old_total, new_total = [], [], [], []
+    for _ in range(RUNS):
+        ttft, total, _ = await asyncio.to_thread(blocking_request, endpoint)
+        old_ttft.append(ttft)
+        old_total.append(total)
+        stream, events = await streamed_request(llm)
+        new_ttft.append(stream.ttft)
+        new_total.append(stream.elapsed)
+
+    rebuilt = "".join(parse_sse(event)[1] for event in events)
+    checks["sse round trip preserves text"] = rebuilt == ANSWER and stream.message["content"] == ANSWER
+
+    tool_stream, _ = await streamed_request(llm, "tools")
+    calls = tool_stream.message.get("tool_calls", [])
+    checks["tool-call deltas reassembled"] = (
+        [c["function"]["name"] for c in calls] == ["web_search", "fetch_full_text"]
+        and json.loads(calls[0]["function"]["arguments"]) == json.loads(TOOL_ARGS)
+        and tool_stream.finish_reason == "tool_calls"
+    )
+
+    for prompt, expect_released in (("hi", True), ("leak", False)):
+        gate = StreamGate(_looks_like_internal_reasoning)
+        stream = llm.stream({"messages": [{"role": "user", "content": prompt}]}, deadline=60)
+        async for delta in stream:
+            gate.feed(delta, tool_calls_seen=bool(stream.tool_calls))
+        checks[f"leak probe {'releases' if expect_released else 'holds'} {prompt!r}"] = bool(gate.released) == expect_released
+    await llm.aclose()
+
+    avg = lambda xs: sum(xs) / len(xs)
+    print(f"{len(TOKENS)} tokens at {TOKEN_DELAY_S * 1000:.0f}ms each, {RUNS} runs")
+    print(f"{'mode':<22}{'ttft (s)':>10}{'total (s)':>11}")
+    print(f"{'stream=False':<22}{avg(old_ttft):>10.3f}{avg(old_total):>11.3f}")
+    print(f"{'LLMClient.stream':<22}{avg(new_ttft):>10.3f}{avg(new_total):>11.3f}")
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<40} {'OK' if ok else 'FAIL'}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    ok = asyncio.run(run(endpoint))
+    server.shutdown()
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,92 @@
+"""
+Wall-clock benchmark for the chunked whisper engine on a ~10 minute fixture
+built by tiling misc/synthesis.wav with short pauses. Compares a single
+whole-file transcribe (the old path) with the process pool at 1/2/4/8
+workers, and checks that the pause-based splitter only cuts inside silence.
+"""
+
+import os
+import sys
+import time
+import wave
+import asyncio
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from functionCalls.transcriptionEngine import TranscriptionEngine, split_on_silence, SAMPLE_RATE
+from pipeline.config import AUDIO_TRANSCRIBE_SIZE, TRANSCRIBE_MAX_CHUNK_SECONDS
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "misc", "synthesis.wav")
+TARGET_SECONDS = 600
+PAUSE_SECONDS = 0.6
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def build_fixture():
+    with wave.open(FIXTURE) as wav:
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    pcm = pcm.reshape(-1, channels).mean(axis=1)
+    clip = np.interp(np.arange(0, len(pcm), rate / SAMPLE_RATE), np.arange(len(pcm)), pcm).astype(np.float32)
+    unit = np.concatenate([clip, np.zeros(int(PAUSE_SECONDS * SAMPLE_RATE), dtype=np.float32)])
+    return np.tile(unit, int(np.ceil(TARGET_SECONDS * SAMPLE_RATE / len(unit))))[:TARGET_SECONDS * SAMPLE_RATE], len(unit)
+
+
+def check_splits(audio: np.ndarray) -> bool:
+    ranges = split_on_silence(audio)
+    lengths = [(end - start) / SAMPLE_RATE for start, end in ranges]
+    speech_rms = np.sqrt(np.mean(np.square(audio[np.abs(audio) > 0.05])))
+    cut_rms = [np.sqrt(np.mean(np.square(audio[end - 240:end + 240]))) for _, end in ranges[:-1]]
+    quiet = all(rms < 0.1 * speech_rms for rms in cut_rms)
+    print(f"splitter: {len(ranges)} chunks, {min(lengths):.1f}-{max(lengths):.1f}s, cuts in silence={quiet}")
+    return quiet and max(lengths) <= TRANSCRIBE_MAX_CHUNK_SECONDS and ranges[-1][1] == len(audio)
+
+
+async def time_engine(engine: TranscriptionEngine, audio: np.ndarray):
+    # Spawn every worker (each loads its model in the initializer) before timing
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(engine._pool(), time.sleep, 1.0) for _ in range(engine.workers)))
+    start = time.perf_counter()
+    first_chunk_at, segments = None, []
+    async for done, total, chunk_segments, _ in engine.stream_audio(audio):
+        first_chunk_at = first_chunk_at or time.perf_counter() - start
+        segments.extend(chunk_segments)
+    return time.perf_counter() - start, first_chunk_at, segments
+
+
+def time_whole_file(audio: np.ndarray):
+    from faster_whisper import WhisperModel
+    model = WhisperModel(AUDIO_TRANSCRIBE_SIZE, device="cpu", compute_type="auto")
+    start = time.perf_counter()
+    segments, _ = model.transcribe(audio, language="en", beam_size=5)
+    segments = list(segments)
+    return time.perf_counter() - start, segments
+
+
+if __name__ == "__main__":
+    audio, unit_len = build_fixture()
+    print(f"fixture: {len(audio) / SAMPLE_RATE:.0f}s, {os.cpu_count()} cores, model={AUDIO_TRANSCRIBE_SIZE}")
+    ok = check_splits(audio)
+
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        print("faster-whisper not installed; skipping timing runs")
+        print("=" * 60)
+        print("PASS" if ok else "FAIL")
+        sys.exit(0 if ok else 1)
+
+    baseline, whole_segments = time_whole_file(audio)
+    print(f"\n{'mode':<22}{'wall (s)':>10}{'first chunk (s)':>17}{'speedup':>9}{'segments':>10}")
+    print(f"{'whole file, 1 thread':<22}{baseline:>10.1f}{baseline:>17.1f}{1.0:>9.2f}{len(whole_segments):>10}")
+    for workers in WORKER_COUNTS:
+        engine = TranscriptionEngine(workers=workers)
+        wall, first, segments = asyncio.run(time_engine(engine, audio))
+        engine.shutdown()
+        print(f"{f'{workers} worker(s)':<22}{wall:>10.1f}{first:>17.1f}{baseline / wall:>9.2f}{len(segments):>10}")
+        ok = ok and bool(segments) and all(a[0] <= b[0] for a, b in zip(segments, segments[1:]))
+
+    print("=" * 60)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
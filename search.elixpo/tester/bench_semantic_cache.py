@@ -0,0 +1,69 @@
+"""
+SemanticCache lookup microbenchmark: the old per-entry dict walk vs the
+matrix-backed bucket, at 10/100/1000 cached queries for a single URL.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ragService.semanticCache import SemanticCache
+
+DIM = 384
+LOOKUPS = 200
+SIZES = [10, 100, 1000]
+
+
+def legacy_get(url_cache, query_embedding, ttl_seconds, threshold):
+    current_time = time.time()
+    best_match = None
+    best_similarity = 0.0
+    for cache_entry in url_cache.values():
+        if current_time - cache_entry["created_at"] > ttl_seconds:
+            continue
+        cached_emb = np.array(cache_entry["query_embedding"], dtype=np.float32)
+        query_emb = np.array(query_embedding, dtype=np.float32)
+        cached_emb = cached_emb / (np.linalg.norm(cached_emb) + 1e-8)
+        query_emb = query_emb / (np.linalg.norm(query_emb) + 1e-8)
+        similarity = float(np.dot(cached_emb, query_emb))
+        if similarity > best_similarity:
+            best_similarity = similarity
+            best_match = cache_entry
+    if best_similarity >= threshold and best_match:
+        return best_match["response"]
+    return None
+
+
+def time_lookups(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(7)
+    print("=" * 72)
+    print(f"{'entries/url':>12} | {'legacy (us)':>12} | {'matrix (us)':>12} | {'speedup':>8}")
+    print("-" * 72)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for size in SIZES:
+            embeddings = rng.standard_normal((size, DIM)).astype(np.float32)
+            queries = [embeddings[i % size] + 0.01 * rng.standard_normal(DIM).astype(np.float32) for i in range(LOOKUPS)]
+
+            legacy_cache = {
+                i: {"query_embedding": emb.tolist(), "response": {"i": i}, "created_at": time.time()}
+                for i, emb in enumerate(embeddings)
+            }
+            cache = SemanticCache(ttl_seconds=3600, cache_dir=cache_dir, max_entries_per_url=size)
+            for i, emb in enumerate(embeddings):
+                cache.set("https://example.com", emb, {"i": i})
+
+            legacy_us = time_lookups(lambda q: legacy_get(legacy_cache, q, 3600, 0.9), queries)
+            matrix_us = time_lookups(lambda q: cache.get("https://example.com", q), queries)
+            print(f"{size:>12} | {legacy_us:>12.1f} | {matrix_us:>12.1f} | {legacy_us / matrix_us:>7.1f}x")
+    print("=" * 72)
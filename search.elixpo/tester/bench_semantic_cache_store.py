@@ -0,0 +1,76 @@
+"""
+SemanticCache persistence throughput: full-snapshot pickle per request (old
+path) vs incremental appends to the shared SQLite store.
+"""
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ragService.semanticCache import SemanticCache
+
+DIM = 384
+REQUESTS = 300
+ENTRIES_PER_RUN = 5
+RUNS_PER_REQUEST = 4
+
+
+def bench_pickle(cache_dir, rng):
+    start = time.perf_counter()
+    for r in range(REQUESTS):
+        path = os.path.join(cache_dir, f"cache_req{r}.pkl")
+        for run in range(RUNS_PER_REQUEST):
+            cache = {}
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    cache = pickle.load(f)
+            for i in range(ENTRIES_PER_RUN):
+                cache.setdefault(f"https://example.com/{i}", {})[f"{run}_{i}"] = {
+                    "query_embedding": rng.standard_normal(DIM).astype(np.float32).tolist(),
+                    "response": {"run": run, "i": i},
+                    "created_at": time.time(),
+                }
+            with open(path, "wb") as f:
+                pickle.dump(cache, f)
+    elapsed = time.perf_counter() - start
+    glob_start = time.perf_counter()
+    files = [f for f in os.listdir(cache_dir) if f.startswith("cache_")]
+    for f in files:
+        os.path.getmtime(os.path.join(cache_dir, f))
+    return elapsed, time.perf_counter() - glob_start
+
+
+def bench_store(cache_dir, rng):
+    start = time.perf_counter()
+    for r in range(REQUESTS):
+        for run in range(RUNS_PER_REQUEST):
+            cache = SemanticCache(ttl_seconds=3600, cache_dir=cache_dir)
+            cache.load_for_request(f"req{r}")
+            for i in range(ENTRIES_PER_RUN):
+                cache.set(f"https://example.com/{i}", rng.standard_normal(DIM).astype(np.float32), {"run": run, "i": i})
+            cache.save_for_request(f"req{r}")
+    elapsed = time.perf_counter() - start
+    startup_start = time.perf_counter()
+    SemanticCache(ttl_seconds=3600, cache_dir=cache_dir, compaction_interval=0)
+    return elapsed, time.perf_counter() - startup_start
+
+
+if __name__ == "__main__":
+    from loguru import logger
+    logger.remove()
+    rng = np.random.default_rng(3)
+    runs = REQUESTS * RUNS_PER_REQUEST
+    with tempfile.TemporaryDirectory() as pickle_dir, tempfile.TemporaryDirectory() as store_dir:
+        pickle_time, pickle_startup = bench_pickle(pickle_dir, rng)
+        store_time, store_startup = bench_store(store_dir, rng)
+    print("=" * 72)
+    print(f"{REQUESTS} requests x {RUNS_PER_REQUEST} pipeline runs, {ENTRIES_PER_RUN} new entries per run")
+    print("-" * 72)
+    print(f"{'pickle snapshot':<20} {runs / pickle_time:>10.1f} runs/s   startup scan {pickle_startup * 1000:>8.2f}ms")
+    print(f"{'sqlite append':<20} {runs / store_time:>10.1f} runs/s   startup compact {store_startup * 1000:>8.2f}ms")
+    print("=" * 72)
@@ -0,0 +1,120 @@
+"""
+Session index benchmark: session creation rate, per-query top-k latency and
+spill/restore round trip for the in-memory numpy index that replaced the
+per-session Chroma PersistentClient. When chromadb is installed the old
+model (one PersistentClient + collection per session) is measured alongside.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_DIMENSION
+from sessions.sessionData import SessionData
+
+SESSIONS = 200
+URLS_PER_SESSION = 30
+QUERIES = 500
+
+
+def page_vectors(seed):
+    return np.random.default_rng(seed).standard_normal((URLS_PER_SESSION, EMBEDDING_DIMENSION)).astype(np.float32)
+
+
+def bench_index(vectors, queries):
+    start = time.perf_counter()
+    sessions = [SessionData(f"bench{i}", "benchmark query") for i in range(SESSIONS)]
+    created = SESSIONS / (time.perf_counter() - start)
+
+    for session, emb in zip(sessions, vectors):
+        for j in range(URLS_PER_SESSION):
+            session.add_fetched_url(f"https://example.com/{session.session_id}/{j}", f"content {j}", emb[j])
+
+    session = sessions[0]
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        session.get_top_content(k=5, query_embedding=q)
+        timings.append(time.perf_counter() - start)
+    return created, np.asarray(timings) * 1000, sessions
+
+
+def bench_chroma(vectors, queries):
+    import chromadb
+    root = tempfile.mkdtemp()
+    start = time.perf_counter()
+    collections = []
+    for i in range(SESSIONS):
+        client = chromadb.PersistentClient(path=os.path.join(root, f"bench{i}"),
+                                           settings=chromadb.config.Settings(anonymized_telemetry=False))
+        collections.append(client.get_or_create_collection(name=f"session_bench{i}", metadata={"hnsw:space": "cosine"}))
+    created = SESSIONS / (time.perf_counter() - start)
+
+    collection = collections[0]
+    collection.add(ids=[f"u{j}" for j in range(URLS_PER_SESSION)], embeddings=vectors[0].tolist(),
+                   documents=[f"content {j}" for j in range(URLS_PER_SESSION)])
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        collection.query(query_embeddings=[q.tolist()], n_results=5)
+        timings.append(time.perf_counter() - start)
+    shutil.rmtree(root, ignore_errors=True)
+    return created, np.asarray(timings) * 1000
+
+
+if __name__ == "__main__":
+    checks = {}
+    vectors = [page_vectors(i) for i in range(SESSIONS)]
+    queries = np.random.default_rng(12345).standard_normal((QUERIES, EMBEDDING_DIMENSION)).astype(np.float32)
+
+    results = {}
+    created, ms, sessions = bench_index(vectors, queries)
+    results["numpy index"] = (created, ms)
+    try:
+        results["chroma per session"] = bench_chroma(vectors, queries)
+    except ImportError:
+        print("chromadb not installed, skipping the PersistentClient baseline")
+
+    print(f"{SESSIONS} sessions x {URLS_PER_SESSION} urls, {QUERIES} queries, dim {EMBEDDING_DIMENSION}")
+    print(f"{'model':<22}{'sessions/s':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for label, (rate, lat) in results.items():
+        print(f"{label:<22}{rate:>12.0f}{np.percentile(lat, 50):>10.3f}{np.percentile(lat, 99):>10.3f}")
+
+    # Top-k must match a brute-force cosine ranking
+    session, emb, q = sessions[0], vectors[0], queries[0]
+    unit = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    expected = [f"https://example.com/{session.session_id}/{j}" for j in np.argsort(-(unit @ (q / np.linalg.norm(q))))[:5]]
+    got = session.get_top_content(k=5, query_embedding=q)
+    checks["top-k matches brute force"] = [url for url, _ in got] == expected
+
+    # Re-adding a URL overwrites its row instead of growing the index
+    session.add_fetched_url(expected[0], "updated", emb[0])
+    checks["re-add keeps index size"] = len(session.content_index) == URLS_PER_SESSION
+
+    # Spill an idle session to disk and query it again
+    spill_dir = tempfile.mkdtemp()
+    before = session.get_top_content(k=5, query_embedding=q)
+    freed = session.spill_index(spill_dir)
+    checks["spill releases matrix"] = freed > 0 and session.content_index.nbytes == 0
+    start = time.perf_counter()
+    after = session.get_top_content(k=5, query_embedding=q)
+    restore_ms = (time.perf_counter() - start) * 1000
+    checks["restore returns same top-k"] = before == after and not os.listdir(spill_dir)
+    print(f"spill freed {freed / 1024:.0f} KB, restore + first query {restore_ms:.2f} ms")
+
+    hit, cached = session.check_cache_relevance("q", query_embedding=emb[3])
+    checks["cache relevance hit"] = hit and cached["cached_metadata"]["url"].endswith("/3")
+    checks["query p99 under 5 ms"] = np.percentile(results["numpy index"][1], 99) < 5.0
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
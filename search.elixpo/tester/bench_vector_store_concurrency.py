@@ -0,0 +1,105 @@
+"""
+Mixed read/write load test for VectorStore: reader threads run searches while
+writer threads ingest 40-chunk pages. Compares retrieval latency idle vs under
+ingestion for the old model (one lock around every search and add) and the
+lock-free reads with the coalescing background writer.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_DIMENSION
+from ragService.vectorStore import VectorStore
+
+READERS = 8
+WRITERS = 4
+PAGES_PER_WRITER = 15
+CHUNKS_PER_PAGE = 40
+SEED_PAGES = 50
+
+
+class GlobalLockStore:
+    """The previous concurrency model: every search and add serialised on one lock."""
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.RLock()
+
+    def search(self, query, top_k=5):
+        with self.lock:
+            return self.store.search(query, top_k=top_k)
+
+    def add_chunks(self, chunks):
+        with self.lock:
+            return self.store.add_chunks(chunks)
+
+
+def make_page(tag, i):
+    vectors = np.random.default_rng(hash((tag, i)) & 0xFFFFFFFF).standard_normal((CHUNKS_PER_PAGE, EMBEDDING_DIMENSION)).astype(np.float32)
+    return [{"url": f"https://example.com/{tag}/{i}", "text": f"{tag} page {i} chunk {j}", "embedding": vectors[j]}
+            for j in range(CHUNKS_PER_PAGE)]
+
+
+def run(store, tag, with_writers):
+    latencies, stop = [], threading.Event()
+    lock = threading.Lock()
+
+    def reader():
+        local, rng = [], np.random.default_rng()
+        while not stop.is_set():
+            query = rng.standard_normal(EMBEDDING_DIMENSION).astype(np.float32)
+            start = time.perf_counter()
+            store.search(query, top_k=5)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def writer(n):
+        for i in range(PAGES_PER_WRITER):
+            store.add_chunks(make_page(f"{tag}-w{n}", i))
+
+    readers = [threading.Thread(target=reader) for _ in range(READERS)]
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)] if with_writers else []
+    start = time.perf_counter()
+    for t in readers + writers:
+        t.start()
+    if writers:
+        for t in writers:
+            t.join()
+    else:
+        time.sleep(3.0)
+    stop.set()
+    for t in readers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), len(ms) / elapsed, elapsed
+
+
+if __name__ == "__main__":
+    results = {}
+    for label in ("global lock", "lock-free reads"):
+        store = VectorStore(embeddings_dir=tempfile.mkdtemp())
+        for i in range(SEED_PAGES):
+            store.add_chunks(make_page("seed", i))
+        target = GlobalLockStore(store) if label == "global lock" else store
+        results[label] = (run(target, label, False), run(target, label.replace(" ", "-"), True))
+        store.close()
+
+    print(f"{READERS} readers, {WRITERS} writers x {PAGES_PER_WRITER} pages x {CHUNKS_PER_PAGE} chunks, "
+          f"{SEED_PAGES * CHUNKS_PER_PAGE} seed chunks")
+    print(f"{'model':<18}{'load':<10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'searches/s':>12}{'ingest (s)':>12}")
+    for label, (idle, loaded) in results.items():
+        print(f"{label:<18}{'idle':<10}{idle[0]:>10.2f}{idle[1]:>10.2f}{idle[2]:>12.0f}{'':>12}")
+        print(f"{label:<18}{'ingest':<10}{loaded[0]:>10.2f}{loaded[1]:>10.2f}{loaded[2]:>12.0f}{loaded[3]:>12.2f}")
+
+    ok = results["lock-free reads"][1][1] < results["global lock"][1][1]
+    print("=" * 60)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
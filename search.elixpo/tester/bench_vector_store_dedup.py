@@ -0,0 +1,81 @@
+"""
+Re-ingest benchmark for content-hash chunk ids: the same pages are ingested
+repeatedly (as the pipeline does on every search that fetches them), then one
+page changes. Reports embeddings computed vs skipped, index size and search
+latency, and checks that no duplicates or stale chunks are left behind.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_MODEL
+from ragService.embeddingService import get_embedding_service
+from ragService.vectorStore import VectorStore
+from ragService.retrievalPipeline import RetrievalPipeline
+
+PAGES = 20
+ROUNDS = 5
+WORDS = ("retrieval augmented generation indexes documents into dense vectors so that "
+         "queries can be matched semantically rather than lexically across the corpus").split()
+
+
+class CountingEmbedder:
+    def __init__(self, service):
+        self.service = service
+        self.texts = 0
+
+    def embed(self, texts, batch_size=32):
+        self.texts += len(texts)
+        return self.service.embed(texts, batch_size=batch_size)
+
+    def embed_single(self, text):
+        return self.service.embed_single(text)
+
+
+def page(i, revision=0):
+    return " ".join(f"{WORDS[(i * 7 + j + revision) % len(WORDS)]}{(i * 31 + j) % 97}" for j in range(1500))
+
+
+def search_ms(pipeline, runs=20):
+    start = time.perf_counter()
+    for _ in range(runs):
+        pipeline.retrieve("semantic matching of dense vectors", top_k=5)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+if __name__ == "__main__":
+    embedder = CountingEmbedder(get_embedding_service(EMBEDDING_MODEL))
+    store = VectorStore(embeddings_dir=tempfile.mkdtemp())
+    pipeline = RetrievalPipeline(embedder, store)
+    urls = [f"https://example.com/article/{i}" for i in range(PAGES)]
+
+    print(f"{'round':<8}{'embedded':>10}{'chunks':>9}{'search (ms)':>13}")
+    for round_no in range(ROUNDS):
+        before = embedder.texts
+        for i, url in enumerate(urls):
+            pipeline.ingest_text(url + ("?utm_source=x" if round_no % 2 else ""), page(i))
+        print(f"{round_no:<8}{embedder.texts - before:>10}{store.chunk_count:>9}{search_ms(pipeline):>13.2f}")
+    first_round_chunks = store.chunk_count
+
+    before = embedder.texts
+    pipeline.ingest_text(urls[0], page(0, revision=3))
+    changed_embedded = embedder.texts - before
+    fresh_skip = pipeline.ingest_url(urls[1]) > 0
+
+    stats = {**store.get_stats(), **pipeline.get_stats()}
+    print(f"\nchanged page re-embedded {changed_embedded} chunk(s); chunks now {store.chunk_count}")
+    print(stats)
+
+    ok = (
+        stats["embeddings_skipped"] >= (ROUNDS - 1) * first_round_chunks
+        and store.chunk_count == first_round_chunks
+        and stats["stale_chunks_removed"] > 0
+        and fresh_skip
+    )
+    print("=" * 60)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
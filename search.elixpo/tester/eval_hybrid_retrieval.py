@@ -0,0 +1,111 @@
+"""
+Offline retrieval eval on the local fixture set (tester/fixtures/retrieval):
+indexes the passages into a scratch VectorStore, then reports recall@k and
+MRR for dense-only, BM25-only, hybrid RRF and hybrid + cross-encoder rerank,
+split by exact-term and semantic queries, plus mean latency per stage.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_MODEL, RAG_RERANK_MODEL, RAG_RETRIEVAL_BUDGET_MS
+from ragService.embeddingService import get_embedding_service
+from ragService.vectorStore import VectorStore
+from ragService.hybridRetriever import HybridRetriever, CrossEncoderReranker
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "retrieval", "eval_set.json")
+KS = (1, 3, 5)
+REPEATS = 5
+
+
+def evaluate(name, search, queries):
+    rows = {"all": [], "exact": [], "semantic": []}
+    timings = []
+    for q in queries:
+        ranked, stage_ms = [], None
+        for _ in range(REPEATS):
+            ranked, stage_ms = search(q)
+            timings.append(stage_ms)
+        ids = [r["id"] for r in ranked]
+        relevant = set(q["relevant"])
+        recall = {k: len(relevant & set(ids[:k])) / len(relevant) for k in KS}
+        rr = next((1.0 / (i + 1) for i, doc_id in enumerate(ids) if doc_id in relevant), 0.0)
+        rows["all"].append((recall, rr))
+        rows[q["kind"]].append((recall, rr))
+    summary = {}
+    for split, values in rows.items():
+        summary[split] = {f"recall@{k}": float(np.mean([v[0][k] for v in values])) for k in KS}
+        summary[split]["mrr"] = float(np.mean([v[1] for v in values]))
+    stages = {stage: float(np.mean([t.get(stage, 0.0) for t in timings])) for stage in timings[0]}
+    stages["p95_total_ms"] = float(np.percentile([t["total_ms"] for t in timings], 95))
+    return name, summary, stages
+
+
+def timed(fn):
+    def run(q):
+        start = time.perf_counter()
+        results = fn(q)
+        return results, {"total_ms": (time.perf_counter() - start) * 1000}
+    return run
+
+
+if __name__ == "__main__":
+    with open(FIXTURE) as f:
+        fixture = json.load(f)
+    documents, queries = fixture["documents"], fixture["queries"]
+
+    embedder = get_embedding_service(EMBEDDING_MODEL)
+    store = VectorStore(embeddings_dir=tempfile.mkdtemp())
+    vectors = embedder.embed([d["text"] for d in documents])
+    store.add_chunks([{"id": d["id"], "url": d["url"], "text": d["text"], "embedding": v}
+                      for d, v in zip(documents, vectors)])
+    store.flush()
+    query_vectors = {q["query"]: embedder.embed_single(q["query"]) for q in queries}
+
+    max_k = max(KS)
+    hybrid = HybridRetriever(store)
+    hybrid.reranker = None  # RRF only, even when reranking is enabled in config
+    reranker = CrossEncoderReranker(RAG_RERANK_MODEL)
+
+    runs = [
+        evaluate("dense", timed(lambda q: store.search(query_vectors[q["query"]], top_k=max_k)), queries),
+        evaluate("bm25", timed(lambda q: store.lexical_search(q["query"], top_k=max_k)), queries),
+        evaluate("hybrid rrf", lambda q: hybrid.search(q["query"], query_vectors[q["query"]], top_k=max_k), queries),
+    ]
+    if reranker.wait_ready(timeout=300):
+        reranked = HybridRetriever(store, reranker=reranker)
+        runs.append(evaluate("hybrid + rerank", lambda q: reranked.search(q["query"], query_vectors[q["query"]], top_k=max_k), queries))
+    else:
+        print(f"cross-encoder {RAG_RERANK_MODEL} unavailable, skipping the rerank run")
+
+    print(f"{len(documents)} passages, {len(queries)} queries, budget {RAG_RETRIEVAL_BUDGET_MS} ms")
+    header = f"{'mode':<17}{'split':<10}" + "".join(f"{f'R@{k}':>7}" for k in KS) + f"{'MRR':>7}"
+    print(header)
+    for name, summary, _ in runs:
+        for split, metrics in summary.items():
+            print(f"{name:<17}{split:<10}" + "".join(f"{metrics[f'recall@{k}']:>7.2f}" for k in KS) + f"{metrics['mrr']:>7.2f}")
+    print()
+    print(f"{'mode':<17}" + "".join(f"{stage:>13}" for stage in ("dense_ms", "lexical_ms", "fusion_ms", "rerank_ms", "total_ms", "p95_total_ms")))
+    for name, _, stages in runs:
+        print(f"{name:<17}" + "".join(f"{stages.get(stage, 0.0):>13.2f}" for stage in ("dense_ms", "lexical_ms", "fusion_ms", "rerank_ms", "total_ms", "p95_total_ms")))
+    store.close()
+
+    results = {name: (summary, stages) for name, summary, stages in runs}
+    checks = {
+        "hybrid recall@5 >= dense": results["hybrid rrf"][0]["all"]["recall@5"] >= results["dense"][0]["all"]["recall@5"],
+        "hybrid exact MRR >= dense": results["hybrid rrf"][0]["exact"]["mrr"] >= results["dense"][0]["exact"]["mrr"],
+        "hybrid within budget (p95)": all(stages["p95_total_ms"] <= RAG_RETRIEVAL_BUDGET_MS * 1.2
+                                          for name, (_, stages) in results.items() if name.startswith("hybrid")),
+    }
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<32} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,81 @@
+"""
+Load test for SearchAgentPool: a local static HTML page stands in for the
+search engine and searches/sec is measured against pool size for the fast
+and human-like SERP modes. A small tab budget forces warm-standby swaps
+during the run.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ipcService.searchPortManager import SearchAgentPool, YahooSearchAgentText, serp_metrics
+
+POOL_SIZES = [1, 2, 4]
+MODES = ["fast", "human"]
+CONCURRENT_TABS = 4
+TAB_BUDGET = 15
+SEARCHES = 40
+
+SERP = ("<html><body>" + "".join(
+    f"<div class='compTitle'><a href='https://example.com/result/{i}'>Result {i}</a></div>" for i in range(10)
+) + "</body></html>").encode()
+
+
+class SerpHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(SERP)))
+        self.end_headers()
+        self.wfile.write(SERP)
+
+    def log_message(self, *args):
+        pass
+
+
+async def run(pool_size, mode):
+    pool = SearchAgentPool(pool_size=pool_size, max_tabs_per_agent=TAB_BUDGET, max_concurrent_tabs=CONCURRENT_TABS)
+    await pool.initialize_pool()
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        async with pool.lease("text") as agent:
+            links = await agent.search(f"load test query {i}", mode=mode)
+        latencies.append(time.perf_counter() - start)
+        return len(links)
+
+    start = time.perf_counter()
+    found = await asyncio.gather(*[one(i) for i in range(SEARCHES)])
+    elapsed = time.perf_counter() - start
+    status = await pool.get_status()
+    await pool.close_all()
+    latencies.sort()
+    return SEARCHES / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1], sum(1 for n in found if n), status["text_agents"]["restarts"]
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SerpHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    YahooSearchAgentText.SEARCH_URL = f"http://127.0.0.1:{server.server_address[1]}/search?p={{query}}"
+
+    print("=" * 84)
+    print(f"{SEARCHES} concurrent searches, {CONCURRENT_TABS} tabs per context, tab budget {TAB_BUDGET}")
+    print("-" * 84)
+    print(f"{'mode':<6} | {'pool size':>9} | {'searches/s':>10} | {'p50 s':>7} | {'p99 s':>7} | {'with links':>10} | {'swaps':>5}")
+    print("-" * 84)
+    for mode in MODES:
+        for pool_size in POOL_SIZES:
+            rate, p50, p99, ok, swaps = asyncio.run(run(pool_size, mode))
+            print(f"{mode:<6} | {pool_size:>9} | {rate:>10.2f} | {p50:>7.2f} | {p99:>7.2f} | {ok:>10} | {swaps:>5}")
+    print("-" * 84)
+    for mode, stats in serp_metrics.items():
+        print(f"{mode:<6} {stats.summary()}")
+    print("=" * 84)
+    server.shutdown()
@@ -1,20 +1,14 @@
-from multiprocessing.managers import BaseManager
-from utility import fetch_url_content_parallel
+import os
+import sys
+import asyncio
 import re
 
-class modelManager(BaseManager): pass
-modelManager.register("ipcService")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
 
-manager = modelManager(address=("localhost", 5010), authkey=b"ipcService")
-manager.connect()
-service = manager.Service()
+from ipcService.rpc import RPCClient
 
 # Example usage
-urls = [
-    "https://en.wikipedia.org/wiki/Eiffel_Tower",
-    "https://www.britannica.com/topic/Eiffel-Tower-Paris-France"
-]
-docs = fetch_url_content_parallel(urls, max_workers=2)
+url = "https://en.wikipedia.org/wiki/Eiffel_Tower"
 
 # Better text preprocessing
 def preprocess_text(text):
@@ -36,17 +30,24 @@ def preprocess_text(text):
     
     return meaningful_sentences[:15]  # Take more meaningful sentences
 
-sentences = preprocess_text(docs)
-print(f"Processing {len(sentences)} sentences...")
+async def main():
+    client = RPCClient()
+    service = client.service("CoreEmbeddingService")
+    try:
+        ingested = await service.ingest_url(url)
+        print(f"Ingested {url}: {ingested}")
 
-query = "Where is the Eiffel Tower located?"
-data_embed, query_embed = service.encodeSemantic(sentences, query)
-scores = service.cosineScore(query_embed, data_embed, k=5)
+        query = "Where is the Eiffel Tower located?"
+        retrieved = await service.retrieve(query, top_k=5)
+        print(f"\nQuery: {query}\n")
+        print("Top matches:")
+        for result in retrieved["results"]:
+            sentences = preprocess_text(result["metadata"]["text"])
+            print(f"Score: {result['score']:.4f}")
+            print(f"Text: {' '.join(sentences)[:200]}...")
+            print("-" * 50)
+    finally:
+        await client.close()
 
-print(f"\nQuery: {query}\n")
-print("Top matches:")
-for idx, score in scores:
-    if score > 0.8:  
-        print(f"Score: {score:.4f}")
-        print(f"Text: {sentences[idx][:200]}...")
-        print("-" * 50)
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
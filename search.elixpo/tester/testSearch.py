@@ -1,21 +1,20 @@
-from multiprocessing.managers import BaseManager
-from api.utility import fetch_url_content_parallel
-import re
+import os
+import sys
+import asyncio
 
-class modelManager(BaseManager): pass
-modelManager.register("accessSearchAgents")
-modelManager.register("ipcService")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
 
-manager = modelManager(address=("localhost", 5010), authkey=b"ipcService")
-manager.connect()
+from ipcService.rpc import RPCClient
 
-# Get the search service
-search_service = manager.accessSearchAgents()
 
-
-def main():
-    urls = search_service.web_search("elixpo_chapter")
-    print(urls)
+async def main():
+    client = RPCClient()
+    search_service = client.service("accessSearchAgents")
+    try:
+        urls = await search_service.web_search("elixpo_chapter")
+        print(urls)
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
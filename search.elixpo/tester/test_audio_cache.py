@@ -0,0 +1,80 @@
+"""
+Checks for the compact audio cache: LRU eviction keeps the directory under
+its byte budget and survives a restart in recency order, and (when ffmpeg is
+on PATH) misc/synthesis.wav decodes to 16 kHz mono PCM in the same pass that
+writes the Opus and FLAC cache copies. Prints the size of each against the
+old full-rate WAV.
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from functionCalls.audioCache import AudioCache, decode_to_pcm, SAMPLE_RATE
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "misc", "synthesis.wav")
+ENTRY_BYTES = 1000
+BUDGET = 3500
+
+
+def check_lru(checks):
+    cache_dir = tempfile.mkdtemp()
+    cache = AudioCache(cache_dir, max_bytes=BUDGET, fmt="opus")
+    for i in range(3):
+        part = os.path.join(cache_dir, f"vid{i}.opus.part")
+        with open(part, "wb") as f:
+            f.write(b"\0" * ENTRY_BYTES)
+        cache.put(f"vid{i}", part)
+        time.sleep(0.01)
+    checks["hit refreshes recency"] = cache.get("vid0") is not None
+
+    part = os.path.join(cache_dir, "vid3.opus.part")
+    with open(part, "wb") as f:
+        f.write(b"\0" * ENTRY_BYTES)
+    cache.put("vid3", part)
+    stats = cache.get_stats()
+    checks["evicts least recent"] = cache.get("vid1") is None and cache.get("vid0") is not None
+    checks["stays under budget"] = stats["bytes"] <= BUDGET and stats["evictions"] == 1
+
+    reopened = AudioCache(cache_dir, max_bytes=2 * ENTRY_BYTES, fmt="opus")
+    checks["restart keeps recency"] = reopened.get("vid2") is None and reopened.get("vid0") is not None
+    checks["no stray files"] = sorted(os.listdir(cache_dir)) == ["vid0.opus", "vid3.opus"]
+    print(f"lru: {stats}")
+
+
+async def check_decode(checks):
+    cache_dir = tempfile.mkdtemp()
+    wav_bytes = os.path.getsize(FIXTURE)
+    for fmt in ("opus", "flac"):
+        encoded = os.path.join(cache_dir, f"synthesis.{fmt}.part")
+        start = time.perf_counter()
+        audio = await decode_to_pcm(FIXTURE, encode_to=encoded, fmt=fmt)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(encoded)
+        print(f"{fmt:<5} decode+encode {elapsed * 1000:.0f}ms  {len(audio) / SAMPLE_RATE:.2f}s pcm  "
+              f"{size / 1024:.0f} KB vs {wav_bytes / 1024:.0f} KB wav ({wav_bytes / size:.1f}x)")
+        checks[f"{fmt} pcm is 16k mono"] = audio.ndim == 1 and abs(len(audio) / SAMPLE_RATE - 11.96) < 0.05
+        checks[f"{fmt} smaller than wav"] = size < wav_bytes
+        again = await decode_to_pcm(encoded)
+        checks[f"{fmt} cache copy decodes"] = abs(len(again) - len(audio)) < SAMPLE_RATE // 10
+
+
+if __name__ == "__main__":
+    checks = {}
+    check_lru(checks)
+    if shutil.which("ffmpeg"):
+        asyncio.run(check_decode(checks))
+    else:
+        print("ffmpeg not on PATH; skipping decode checks")
+
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
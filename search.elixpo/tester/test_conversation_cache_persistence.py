@@ -0,0 +1,95 @@
+"""
+Conversation cache persistence checks: a saved session reloads with its
+embeddings (float16 in the versioned .npz) and zero encoder forward passes,
+cache lookups still hit after the reload, responses stay compressed until
+a hit, a second load does not duplicate entries, and a legacy .pkl cache is
+migrated with a single batched re-encode covering entries outside the
+window too. Reports load time and file size.
+"""
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import CACHE_EMBEDDING_MODEL
+from sessions.conversation_cache import ConversationCacheManager
+
+ENTRIES = 50
+TOPICS = ["solar panels", "kubernetes autoscaling", "sourdough starters", "python packaging", "coral reefs",
+          "electric cars", "marathon training", "jazz history", "home networking", "rust lifetimes"]
+
+
+class CountingEmbedder:
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.forward_passes = 0
+
+    def embed(self, texts, batch_size=32):
+        self.forward_passes += 1
+        return self.embedder.embed(texts, batch_size=batch_size)
+
+    def embed_single(self, text):
+        self.forward_passes += 1
+        return self.embedder.embed_single(text)
+
+
+def new_manager(cache_dir):
+    manager = ConversationCacheManager(max_entries=ENTRIES, embedding_model=CACHE_EMBEDDING_MODEL, cache_dir=cache_dir)
+    manager.embedding_model = CountingEmbedder(manager.embedding_model)
+    return manager
+
+
+if __name__ == "__main__":
+    checks = {}
+    cache_dir = tempfile.mkdtemp()
+    queries = [f"what is the latest on {TOPICS[i % len(TOPICS)]} (question {i})" for i in range(ENTRIES)]
+
+    writer = new_manager(cache_dir)
+    for i, query in enumerate(queries):
+        writer.add_to_cache(query, f"answer {i} " * 200, metadata={"sources": [f"https://example.com/{i}"]})
+    checks["saved"] = writer.save_to_disk("persist")
+    size = os.path.getsize(os.path.join(cache_dir, "cache_persist.npz"))
+
+    reader = new_manager(cache_dir)
+    start = time.perf_counter()
+    checks["loaded"] = reader.load_from_disk("persist")
+    load_ms = (time.perf_counter() - start) * 1000
+    checks["no forward passes on load"] = reader.embedding_model.forward_passes == 0
+    checks["entries restored"] = len(reader.full_cache) == ENTRIES and len(reader.embeddings_cache) == ENTRIES
+    checks["window restored"] = [e["id"] for e in reader.cache_window] == [e["id"] for e in writer.cache_window]
+    checks["responses kept compressed"] = all("response" not in e for e in reader.full_cache.values())
+    reader.load_from_disk("persist")
+    checks["reload does not duplicate"] = (len(reader.cache_window) == len(writer.cache_window)
+                                           and len(reader.embeddings_cache) == ENTRIES)
+    match, score = reader.query_cache(queries[-1], use_window=True)
+    checks["window hit after reload"] = match is not None and match["query"] == queries[-1] and score > 0.99
+    match, score = reader.query_cache(queries[3], use_window=False, return_compressed=False)
+    checks["full cache hit decompressed"] = match is not None and match["response"] == "answer 3 " * 200
+
+    # Legacy pickle written by the previous save_to_disk
+    with open(os.path.join(cache_dir, "cache_legacy.pkl"), "wb") as f:
+        pickle.dump({"full_cache": writer.full_cache, "cache_entries": list(writer.cache_window), "metadata": {}}, f)
+    legacy = new_manager(cache_dir)
+    start = time.perf_counter()
+    checks["legacy loaded"] = legacy.load_from_disk("legacy")
+    legacy_ms = (time.perf_counter() - start) * 1000
+    checks["legacy re-encoded in one batch"] = legacy.embedding_model.forward_passes == 1 and len(legacy.cache_window) == len(writer.cache_window)
+    checks["legacy entries outside window"] = len(legacy.embeddings_cache) == ENTRIES
+    match, score = legacy.query_cache(queries[0], use_window=False, return_compressed=False)
+    checks["legacy full cache hit"] = match is not None and match["response"] == "answer 0 " * 200
+    legacy.save_to_disk("legacy")
+    checks["legacy migrated to npz"] = (os.path.exists(os.path.join(cache_dir, "cache_legacy.npz"))
+                                       and not os.path.exists(os.path.join(cache_dir, "cache_legacy.pkl")))
+
+    print(f"{ENTRIES} entries: npz {size / 1024:.1f} KB, load {load_ms:.1f} ms (0 passes); "
+          f"legacy pkl load {legacy_ms:.1f} ms (1 batched pass)")
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<32} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
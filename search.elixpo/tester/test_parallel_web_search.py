@@ -0,0 +1,77 @@
+"""
+Concurrency check for the web_search tool path: N searches against a fake
+search service with staggered latencies must finish in about max(latency),
+not sum(latency), and the API event loop must keep ticking while they run.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ipcService.rpc import RPCServer, RPCClient
+from commons import searching_based
+from pipeline import utils
+
+LATENCIES_S = [0.4, 0.6, 0.8, 1.0, 1.2, 1.5]
+MAX_OVERHEAD_S = 0.5
+MAX_LOOP_LAG_S = 0.1
+
+
+def serve(path):
+    async def web_search(query):
+        await asyncio.sleep(float(query.split(":")[1]))
+        return [f"https://example.com/{query}/{i}" for i in range(3)]
+
+    async def main():
+        await RPCServer({"accessSearchAgents": {"web_search": web_search}}, path=path).start()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def run(path):
+    utils._ipc_clients[asyncio.get_running_loop()] = RPCClient(path=path)
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.ensure_future(heartbeat(stop, lags))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(searching_based.webSearch(f"query-{i}:{latency}") for i, latency in enumerate(LATENCIES_S)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    return elapsed, results, max(lags) if lags else 0.0
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "test-ipc.sock")
+    server = multiprocessing.Process(target=serve, args=(path,), daemon=True)
+    server.start()
+    while not os.path.exists(path):
+        time.sleep(0.05)
+    try:
+        elapsed, results, max_lag = asyncio.run(run(path))
+    finally:
+        server.terminate()
+
+    all_answered = all(len(urls) == 3 for urls in results)
+    overlapped = elapsed <= max(LATENCIES_S) + MAX_OVERHEAD_S
+    responsive = max_lag <= MAX_LOOP_LAG_S
+    print(f"searches={len(LATENCIES_S)} max(latency)={max(LATENCIES_S):.2f}s sum(latency)={sum(LATENCIES_S):.2f}s")
+    print(f"elapsed={elapsed:.2f}s answered={all_answered} max_loop_lag={max_lag * 1000:.1f}ms")
+    print("=" * 60)
+    ok = all_answered and overlapped and responsive
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
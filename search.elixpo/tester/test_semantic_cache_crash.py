@@ -0,0 +1,65 @@
+"""
+Crash-safety check for the SemanticCache SQLite store: a writer process keeps
+appending batches and is SIGKILLed mid-write; afterwards the database must pass
+an integrity check and every request must hold only whole batches.
+"""
+
+import os
+import sys
+import time
+import random
+import signal
+import sqlite3
+import tempfile
+import multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from ragService.semanticCache import SemanticCache
+
+DIM = 384
+BATCH = 25
+ROUNDS = 10
+
+
+def writer(cache_dir, seed):
+    rng = np.random.default_rng(seed)
+    batch_no = 0
+    while True:
+        cache = SemanticCache(ttl_seconds=3600, cache_dir=cache_dir)
+        request_id = f"req-{seed}-{batch_no}"
+        for i in range(BATCH):
+            cache.set(f"https://example.com/{i}", rng.standard_normal(DIM).astype(np.float32), {"batch": batch_no, "i": i})
+        cache.save_for_request(request_id)
+        batch_no += 1
+
+
+def verify(cache_dir):
+    db_path = os.path.join(cache_dir, "semantic_cache.db")
+    conn = sqlite3.connect(db_path)
+    integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    counts = conn.execute("SELECT request_id, COUNT(*) FROM semantic_cache GROUP BY request_id").fetchall()
+    conn.close()
+    torn = [(rid, n) for rid, n in counts if n != BATCH]
+    cache = SemanticCache(ttl_seconds=3600, cache_dir=cache_dir)
+    loadable = all(cache.load_for_request(rid) for rid, _ in counts[-5:])
+    return integrity, len(counts), torn, loadable
+
+
+if __name__ == "__main__":
+    failures = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for round_no in range(ROUNDS):
+            proc = multiprocessing.Process(target=writer, args=(cache_dir, round_no))
+            proc.start()
+            time.sleep(random.uniform(0.3, 1.2))
+            os.kill(proc.pid, signal.SIGKILL)
+            proc.join()
+            integrity, requests, torn, loadable = verify(cache_dir)
+            ok = integrity == "ok" and not torn and loadable
+            failures += not ok
+            print(f"round {round_no:>2}: integrity={integrity} requests={requests} torn={len(torn)} loadable={loadable} -> {'OK' if ok else 'FAIL'}")
+    print("=" * 60)
+    print("PASS" if failures == 0 else f"FAIL ({failures} round(s))")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,93 @@
+"""
+Session reaper checks: sessions past the TTL are dropped, least recently
+used sessions are evicted to compressed snapshots once resident bytes exceed
+the budget, and an evicted session is rehydrated intact (content, history,
+index search) on its next access, and that a session used while its
+snapshot is written is not evicted. Prints the session stats /api/stats serves.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_DIMENSION
+from sessions.session_manager import SessionManager
+
+SESSIONS = 12
+URLS_PER_SESSION = 5
+PAGE_CHARS = 20_000
+
+
+def fill(manager, sid, seed):
+    vectors = np.random.default_rng(seed).standard_normal((URLS_PER_SESSION, EMBEDDING_DIMENSION)).astype(np.float32)
+    for j in range(URLS_PER_SESSION):
+        manager.add_content_to_session(sid, f"https://example.com/{sid}/{j}", f"{seed:03d}-{j} ".ljust(PAGE_CHARS, "x"), vectors[j])
+    manager.add_message_to_history(sid, "user", f"question {seed:03d}")
+    manager.add_message_to_history(sid, "assistant", f"answer {seed:03d}")
+    return vectors
+
+
+if __name__ == "__main__":
+    checks = {}
+    snapshot_dir = tempfile.mkdtemp()
+    manager = SessionManager(ttl_minutes=30, memory_budget_bytes=10**9, snapshot_dir=snapshot_dir, reaper_interval=3600)
+
+    ids, vectors = [], {}
+    for i in range(SESSIONS):
+        sid = manager.create_session(f"query {i}")
+        vectors[sid] = fill(manager, sid, i)
+        manager.sessions[sid].last_activity = datetime.now() - timedelta(minutes=SESSIONS - i)
+        ids.append(sid)
+
+    per_session = manager.sessions[ids[0]].memory_bytes()
+    checks["memory accounting"] = per_session >= URLS_PER_SESSION * PAGE_CHARS
+
+    # Two sessions went idle long ago
+    for sid in ids[:2]:
+        manager.sessions[sid].last_activity = datetime.now() - timedelta(hours=2)
+    manager.memory_budget_bytes = 5 * per_session
+    manager.reap()
+    stats = manager.get_stats()
+    checks["ttl expired"] = stats["expired"] == 2 and manager.get_session(ids[0]) is None
+    checks["budget enforced"] = stats["resident_bytes"] <= manager.memory_budget_bytes and stats["resident_sessions"] == 5
+    checks["lru order"] = ids[2] in manager.evicted and ids[-1] in manager.sessions
+    checks["snapshots written"] = len(os.listdir(snapshot_dir)) == stats["evicted_sessions"] == SESSIONS - 7
+
+    # Rehydrate the oldest evicted session
+    sid = ids[2]
+    session = manager.get_session(sid)
+    top = manager.get_top_content(sid, k=1, query_embedding=vectors[sid][3])
+    checks["rehydrated content"] = (session is not None and len(session.processed_content) == URLS_PER_SESSION
+                                    and [m["content"] for m in manager.get_conversation_history(sid)] == ["question 002", "answer 002"])
+    checks["rehydrated index"] = top and top[0][0] == f"https://example.com/{sid}/3" and abs(top[0][1] - 1.0) < 1e-4
+    checks["snapshot removed"] = not os.path.exists(os.path.join(snapshot_dir, f"{sid}.npz"))
+
+    # A session used while its snapshot is being written stays resident
+    victims = manager._pick_lru(count=1)
+    used = victims[0][0]
+    manager.add_message_to_history(used, "user", "still here")
+    manager._evict(victims)
+    checks["touched during write kept"] = (used in manager.sessions and used not in manager.evicted
+                                           and not os.path.exists(os.path.join(snapshot_dir, f"{used}.npz")))
+
+    manager.cleanup_session(ids[3])
+    checks["cleanup evicted"] = ids[3] not in manager.evicted and not os.path.exists(os.path.join(snapshot_dir, f"{ids[3]}.npz"))
+
+    stats = manager.get_stats()
+    print(json.dumps({k: v for k, v in stats.items() if k != "sessions"}, indent=2))
+    for sid_, entry in list(stats["sessions"].items())[:3]:
+        print(sid_, entry)
+    checks["stats counters"] = stats["evictions"] == SESSIONS - 7 and stats["rehydrations"] == 1
+    manager.close()
+
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
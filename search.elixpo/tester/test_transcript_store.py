@@ -0,0 +1,65 @@
+"""
+Checks for the transcript store: json3, srv3 and classic timedtext caption
+tracks parse to the same segments, transcripts round-trip through the
+compressed SQLite store across reopen, and cached lookups stay in the
+sub-millisecond range. Prints the stats block served under /api/stats.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from functionCalls.transcriptStore import TranscriptStore, parse_caption_track, segments_to_text
+
+LINES = [(i * 2.5, 2.4, f"caption line {i} &amp; more words about the topic") for i in range(600)]
+
+JSON3 = json.dumps({"events": [{"tStartMs": int(s * 1000), "dDurationMs": int(d * 1000),
+                                "segs": [{"utf8": t.replace("&amp;", "&")}]} for s, d, t in LINES] + [{"tStartMs": 0}]})
+SRV3 = "<timedtext format=\"3\"><body>" + "".join(
+    f'<p t="{int(s * 1000)}" d="{int(d * 1000)}">{t}</p>' for s, d, t in LINES) + "</body></timedtext>"
+CLASSIC = "<?xml version=\"1.0\" encoding=\"utf-8\" ?><transcript>" + "".join(
+    f'<text start="{s}" dur="{d}">{t}</text>' for s, d, t in LINES) + "</transcript>"
+LOOKUPS = 2000
+
+
+if __name__ == "__main__":
+    checks = {}
+    parsed = {name: parse_caption_track(body) for name, body in (("json3", JSON3), ("srv3", SRV3), ("classic", CLASSIC))}
+    expected = [(s, s + d, t.replace("&amp;", "&")) for s, d, t in LINES]
+    for name, segments in parsed.items():
+        checks[f"{name} parses"] = [(round(a, 2), round(b, 2), t) for a, b, t in segments] == expected
+
+    db_path = os.path.join(tempfile.mkdtemp(), "transcripts.db")
+    store = TranscriptStore(db_path)
+    checks["miss before put"] = store.get("vid00000001") is None
+    store.put("vid00000001", "captions", parsed["json3"])
+    store.close()
+
+    store = TranscriptStore(db_path)
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        entry = store.get("vid00000001")
+    per_lookup_ms = (time.perf_counter() - start) / LOOKUPS * 1000
+    store.record("cache", per_lookup_ms / 1000)
+
+    checks["survives reopen"] = entry is not None and entry["text"] == segments_to_text(expected)
+    checks["timestamps kept"] = entry["segments"][10][:2] == (25.0, 27.4) and entry["duration"] == expected[-1][1]
+
+    raw_bytes = len(entry["text"].encode()) + len(json.dumps(entry["segments"]).encode())
+    stats = store.get_stats()
+    print(f"segments={len(entry['segments'])} raw={raw_bytes}B stored={stats['stored_bytes']}B "
+          f"({raw_bytes / stats['stored_bytes']:.1f}x) lookup={per_lookup_ms:.3f}ms")
+    print(json.dumps(stats, indent=2))
+    checks["compressed"] = stats["stored_bytes"] < raw_bytes / 2
+    checks["hit rate reported"] = stats["hits"] == LOOKUPS and stats["hit_rate"] == 1.0
+
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
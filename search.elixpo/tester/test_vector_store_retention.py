@@ -0,0 +1,78 @@
+"""
+Retention checks for the global vector store: URLs past the max age are
+dropped, the least recently hit URLs are evicted when the chunk cap is
+exceeded (recently searched ones survive), and legacy chunks without a URL
+entry are swept by their timestamp. Prints the size history that
+/api/stats serves.
+"""
+
+import os
+import sys
+import time
+import json
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from pipeline.config import EMBEDDING_DIMENSION
+from ragService.vectorStore import VectorStore, content_hash
+from commons.minimal import normalize_url
+
+URLS = 30
+CHUNKS_PER_URL = 10
+DAY = 86400
+
+
+def vectors(seed, n):
+    return np.random.default_rng(seed).standard_normal((n, EMBEDDING_DIMENSION)).astype(np.float32)
+
+
+def ingest(store, i):
+    url = f"https://example.com/page/{i}"
+    emb = vectors(i, CHUNKS_PER_URL)
+    store.add_chunks([{"url": url, "text": f"page {i} chunk {j}", "embedding": emb[j]} for j in range(CHUNKS_PER_URL)])
+    store.record_url(url, content_hash(f"page {i}"), CHUNKS_PER_URL)
+    return url
+
+
+if __name__ == "__main__":
+    checks = {}
+    store = VectorStore(embeddings_dir=tempfile.mkdtemp())
+    urls = [ingest(store, i) for i in range(URLS)]
+
+    # Pages 0-4 were ingested two weeks ago
+    for url in urls[:5]:
+        store.url_index[normalize_url(url)]["ingested_at"] -= 14 * DAY
+    # A legacy chunk from before url_key/ingested_at existed
+    store.collection.add(ids=["legacy-0"], embeddings=[vectors(999, 1)[0].tolist()], documents=["legacy"],
+                         metadatas=[{"url": "https://old.example.com/", "chunk_id": 0, "timestamp": "2020-01-01T00:00:00"}])
+
+    report = store.run_maintenance(max_age_seconds=7 * DAY, max_chunks=10_000)
+    checks["expired urls dropped"] = report["expired_urls"] == 5 and store.get_url_entry(urls[0]) is None
+    checks["legacy chunk swept"] = report["swept_chunks"] == 1 and not store.collection.get(ids=["legacy-0"])["ids"]
+    checks["fresh urls kept"] = store.chunk_count == (URLS - 5) * CHUNKS_PER_URL
+
+    # Search page 5's vectors so it becomes the most recently hit URL, then cap the index
+    time.sleep(0.01)
+    store.search(vectors(5, CHUNKS_PER_URL)[0], top_k=1)
+    cap = 12 * CHUNKS_PER_URL
+    report = store.run_maintenance(max_age_seconds=7 * DAY, max_chunks=cap)
+    checks["lru evicts to cap"] = store.chunk_count <= cap and report["evicted_urls"] > 0
+    checks["recently hit url kept"] = store.get_url_entry(urls[5]) is not None
+    checks["oldest unhit url evicted"] = store.get_url_entry(urls[6]) is None
+
+    stats = store.get_stats()
+    print(json.dumps({k: stats[k] for k in ("total_chunks", "indexed_urls", "expired_urls", "evicted_urls",
+                                            "swept_chunks", "disk_bytes")}, indent=2))
+    for point in stats["size_history"]:
+        print(point)
+    checks["size history recorded"] = len(stats["size_history"]) == 3 and stats["size_history"][-1]["chunks"] == store.chunk_count
+    store.close()
+
+    print("=" * 60)
+    for name, ok in checks.items():
+        print(f"{name:<30} {'OK' if ok else 'FAIL'}")
+    ok = all(checks.values())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)